@@ -1,14 +1,17 @@
 import time
-import os
 import sys
-import subprocess
-from appium import webdriver
-from appium.options.android import UiAutomator2Options
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from appium.webdriver.common.appiumby import AppiumBy
 from datetime import datetime
+from config import create_appium_driver, DEVICE_UDID
+from package_inventory import PackageInventory
+from install_watcher import InstallWatcher
+from apk_cache import install_from_cache, pull_package
+from wait_utils import wait_for_clickable
+from screenshot_service import ScreenshotService
+from locators import compile_locator
 
 print("\nAny_App_Installation_From_GP_automation.py - GP installation starting!\n")
 
@@ -24,6 +27,9 @@ import argparse
 parser = argparse.ArgumentParser(description="Automate app installation from Google Play Store.")
 parser.add_argument("--extra-package", type=str, help="Extra package name to install (e.g., com.example.app)")
 parser.add_argument("--extra-app-name", type=str, help="App name for Play Store search (required if --extra-package is used)")
+parser.add_argument("--concurrent", action="store_true", help="Start all missing installs in one Play Store session and wait for them together")
+parser.add_argument("--apk-cache", type=str, help="Local APK cache directory: install from it first, Play Store only on a cache miss")
+parser.add_argument("--install-timeout", type=int, default=300, help="Seconds to wait for installs in --concurrent mode")
 args = parser.parse_args()
 
 if args.extra_package and args.extra_app_name:
@@ -35,49 +41,126 @@ elif args.extra_package and not args.extra_app_name:
 PLAY_STORE_PACKAGE = "com.android.vending"
 PLAY_STORE_ACTIVITY = "com.google.android.finsky.activities.MainActivity"
 
-def is_package_installed(package_name):
+# Play Store Install button; compiled from XPath to a native UiAutomator selector when possible
+INSTALL_BUTTON = compile_locator(AppiumBy.XPATH, "//*[contains(@text, 'Install') or contains(@text, 'INSTALL')]")
+
+# One adb shell session and package snapshot shared by all checks
+inventory = PackageInventory()
+
+def is_package_installed(package_name, refresh=False):
     """
     Check if a package is installed on the connected Android device using adb.
+    - Answered from the cached package snapshot unless refresh is True.
     """
-    result = subprocess.run(
-        ["adb", "shell", "pm", "list", "packages", package_name],
-        capture_output=True,
-        text=True
-    )
-    return f"package:{package_name}" in result.stdout
+    return inventory.is_installed(package_name, refresh=refresh)
+
+def install_from_apk_cache(package_name):
+    """Try to install a package from the local APK cache (--apk-cache)"""
+    if not args.apk_cache:
+        return False
+    result = install_from_cache(package_name, [DEVICE_UDID], args.apk_cache)
+    inventory.invalidate()
+    return result[DEVICE_UDID] and is_package_installed(package_name)
+
+def add_to_apk_cache(package_name):
+    """Store a package installed from Play Store in the local APK cache (--apk-cache)"""
+    if not args.apk_cache:
+        return
+    try:
+        pull_package(package_name, DEVICE_UDID, args.apk_cache)
+    except Exception as e:
+        print(f"Could not cache {package_name}: {e}")
+
+# Screenshots are encoded and written in the background while the installer continues
+screenshots = ScreenshotService()
 
 def save_screenshot(driver, filename_prefix, timestamp, failed=False):
     dirname = "screenshots_failed" if failed else "screenshots"
-    os.makedirs(dirname, exist_ok=True)
-    filename = f"{filename_prefix}_{timestamp}.png"
-    filepath = os.path.join(dirname, filename)
-    driver.save_screenshot(filepath)
-    print(f"Screenshot saved: {filepath}")
-    return filepath
+    return screenshots.capture(driver, f"{filename_prefix}_{timestamp}", dirname)
+
+def install_concurrently(timestamp):
+    """
+    Install all missing packages at once.
+    - Install is clicked for every missing package back to back in one Play Store session.
+    - Completion is detected from logcat events, so total time is that of the slowest install.
+    """
+    missing = inventory.missing([package for package, _ in FIXED_PACKAGES])
+    for PACKAGE_NAME, APP_NAME in FIXED_PACKAGES:
+        if PACKAGE_NAME not in missing:
+            print(f"{PACKAGE_NAME} is already installed. No installation needed.")
+        elif install_from_apk_cache(PACKAGE_NAME):
+            print(f"{PACKAGE_NAME} installed from APK cache.")
+            missing.remove(PACKAGE_NAME)
+    if not missing:
+        return True
+
+    print(f"Launching Play Store for installation of: {', '.join(missing)}")
+    watcher = InstallWatcher(inventory).start()
+    play_driver = create_appium_driver(PLAY_STORE_PACKAGE, PLAY_STORE_ACTIVITY)
+    try:
+        for PACKAGE_NAME in missing:
+            play_driver.execute_script('mobile: shell', {
+                'command': 'am',
+                'args': ['start', '-a', 'android.intent.action.VIEW', '-d', f'market://details?id={PACKAGE_NAME}'],
+                'includeStderr': True,
+                'timeout': 5000
+            })
+            install_button = wait_for_clickable(play_driver, *INSTALL_BUTTON, 15, f"Install button for {PACKAGE_NAME}")
+            if install_button is None:
+                print(f"Install button not found for {PACKAGE_NAME}.")
+                save_screenshot(play_driver, f"{PACKAGE_NAME}_install_button_not_found", timestamp, failed=True)
+                continue
+            install_button.click()
+            watcher.watch(PACKAGE_NAME)
+            print(f"Install clicked for {PACKAGE_NAME}.")
+
+        print("Waiting for installations to complete...")
+        installed = watcher.wait_all(args.install_timeout)
+        if installed:
+            save_screenshot(play_driver, "Concurrent_installs_completed", timestamp)
+    except Exception as e:
+        print(f"Unexpected exception: {e}")
+        save_screenshot(play_driver, "Unexpected_Error", timestamp, failed=True)
+        installed = {}
+    finally:
+        watcher.stop()
+        play_driver.quit()
+
+    for PACKAGE_NAME in installed:
+        add_to_apk_cache(PACKAGE_NAME)
+
+    print("\nTime to installed:")
+    for PACKAGE_NAME in missing:
+        if PACKAGE_NAME in installed:
+            print(f"  {PACKAGE_NAME}: {installed[PACKAGE_NAME]}s")
+        else:
+            print(f"  {PACKAGE_NAME}: NOT INSTALLED")
+    return all(PACKAGE_NAME in installed for PACKAGE_NAME in missing)
 
 def main():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     overall_passed = True
 
-    for PACKAGE_NAME, APP_NAME in FIXED_PACKAGES:
+    if args.concurrent:
+        overall_passed = install_concurrently(timestamp)
+        packages_to_check = []
+    else:
+        packages_to_check = FIXED_PACKAGES
+
+    for PACKAGE_NAME, APP_NAME in packages_to_check:
         print(f"\nChecking installation for: {PACKAGE_NAME} ({APP_NAME})")
         test_passed = False
         try:
             if is_package_installed(PACKAGE_NAME):
                 print(f"{PACKAGE_NAME} is already installed. No installation needed.")
                 test_passed = True
+            elif install_from_apk_cache(PACKAGE_NAME):
+                print(f"{PACKAGE_NAME} installed from APK cache.")
+                test_passed = True
             else:
                 print(f"{PACKAGE_NAME} not installed. Launching Play Store for installation...")
 
-                play_options = UiAutomator2Options()
-                play_options.platform_name = "Android"
-                play_options.device_name = "Android_test_device"
-                play_options.app_package = PLAY_STORE_PACKAGE
-                play_options.app_activity = PLAY_STORE_ACTIVITY
-                play_options.automation_name = "UiAutomator2"
-                play_options.no_reset = True
-
-                play_driver = webdriver.Remote("http://127.0.0.1:4723", options=play_options)
+                play_driver = create_appium_driver(PLAY_STORE_PACKAGE, PLAY_STORE_ACTIVITY)
                 time.sleep(5)
 
                 # Try direct Play Store intent first
@@ -92,20 +175,19 @@ def main():
 
                 try:
                     install_button = WebDriverWait(play_driver, 15).until(
-                        EC.element_to_be_clickable(
-                            (AppiumBy.XPATH, "//*[contains(@text, 'Install') or contains(@text, 'INSTALL')]")
-                        )
+                        EC.element_to_be_clickable(INSTALL_BUTTON)
                     )
                     install_button.click()
                     print("Install clicked. Waiting for installation to complete...")
 
                     for _ in range(30):
-                        if is_package_installed(PACKAGE_NAME):
+                        if is_package_installed(PACKAGE_NAME, refresh=True):
                             print(f"{PACKAGE_NAME} successfully installed!")
                             # always take a screenshot of a successful installation
                             save_screenshot(play_driver, f"{PACKAGE_NAME}_installed", timestamp)
                             print(f"Screenshot taken of the installation of package {PACKAGE_NAME}.")
                             test_passed = True
+                            add_to_apk_cache(PACKAGE_NAME)
                             break
                         time.sleep(3)
                     else:
@@ -114,7 +196,7 @@ def main():
 
                 except TimeoutException:
                     print("Install button not found. Installation may have failed.")
-                    if is_package_installed(PACKAGE_NAME):
+                    if is_package_installed(PACKAGE_NAME, refresh=True):
                         print(f"{PACKAGE_NAME} was installed successfully anyway!")
                         test_passed = True
                     else:
@@ -131,6 +213,9 @@ def main():
 
         overall_passed = overall_passed and test_passed
 
+    inventory.close()
+    screenshots.close()
+
     if overall_passed:
         print("\nAll installations completed successfully.")
         print("Exiting...")
@@ -1,14 +1,16 @@
-import time
-import os
 import sys
-from appium import webdriver
-from appium.options.android import UiAutomator2Options
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from datetime import datetime
 from appium.webdriver.common.appiumby import AppiumBy
+from config import create_appium_driver, DEVICE_UDID, WEATHER_DATA_TIMEOUT
+from page_snapshot import verify_elements
+from layout_cache import LayoutCache, SEARCH_FIELD_FOCUSED
+from command_metrics import RECORDER
+from render_profiler import RenderProfiler
+from screenshot_service import ScreenshotService, ScreenshotRingBuffer
+from wait_utils import (wait_for_element, wait_for_clickable, wait_for_app_state,
+                        wait_for_stable_screen, print_wait_summary, APP_NOT_RUNNING)
 
 # Create timestamp
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -25,44 +27,40 @@ else:
 # Default test result is false if tests not passed
 test_passed = True  # Initialize as True, set to False if any test fails
 
-options = UiAutomator2Options()
-options.platform_name = "Android"
-options.device_name = "Android_test_device"  
-options.app_package = "fi.sbweather.app"
-options.app_activity = "fi.sbweather.app.MainActivity"
-options.automation_name = "UiAutomator2"
-# Prevent app reset as this test is ran after installation test - optional in this case
-options.no_reset = True
-options.full_reset = False
+# Device, Appium server and app options come from config.py
+# App reset is prevented (no_reset) as this test is ran after installation test
+driver = create_appium_driver()
 
-driver = webdriver.Remote("http://127.0.0.1:4723", options=options)
+# Tap targets are resolved once per screen size and app version and cached on disk
+layout = LayoutCache()
+
+# Screenshots are encoded and written in the background while the test continues
+screenshots = ScreenshotService()
+# Latest successful steps are kept in memory and written only if a later step fails
+lead_up_screenshots = ScreenshotRingBuffer(screenshots, max_items=5)
+
+# Frame and memory stats per view, collected in the background when RENDER_PROFILE=1
+profiler = RenderProfiler(serial=DEVICE_UDID)
 
 def save_screenshot(driver, filename_prefix, timestamp, failed=False):
     """Save screenshot based on settings."""
-    if failed or not SAVE_ONLY_FAILED_SCREENSHOTS:
-        dirname = "screenshots_failed" if failed else "screenshots"
-        os.makedirs(dirname, exist_ok=True)
-        filename = f"{filename_prefix}_{timestamp}.png"
-        filepath = os.path.join(dirname, filename)
-        driver.save_screenshot(filepath)
-        print(f"Screenshot saved: {filepath}")
-        return filepath
+    name = f"{filename_prefix}_{timestamp}"
+    if failed:
+        lead_up_screenshots.persist("screenshots_failed")
+        return screenshots.capture(driver, name, "screenshots_failed")
+    if not SAVE_ONLY_FAILED_SCREENSHOTS:
+        return screenshots.capture(driver, name, "screenshots")
+    lead_up_screenshots.capture(driver, name)
     return None
 
 def check_element(driver, by, value, timeout=10):
     """Check if element exists and return True/False."""
-    try:
-        WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((by, value))
-        )
-        return True
-    except TimeoutException:
-        return False
+    return wait_for_element(driver, by, value, timeout) is not None
 
-def test_element(driver, by, value, element_name, screenshot_prefix, timeout=10):
-    """Test element existence, save screenshot and update test_passed variable."""
+def report_element(found, element_name, screenshot_prefix):
+    """Print the result of an element check, save screenshot and update test_passed variable."""
     global test_passed
-    if check_element(driver, by, value, timeout):
+    if found:
         print(f"{element_name} found.")
         save_screenshot(driver, f"{screenshot_prefix}_ok", timestamp, failed=False)
         return True
@@ -72,21 +70,36 @@ def test_element(driver, by, value, element_name, screenshot_prefix, timeout=10)
         test_passed = False
         return False
 
+def test_element(driver, by, value, element_name, screenshot_prefix, timeout=10):
+    """Test element existence, save screenshot and update test_passed variable."""
+    return report_element(check_element(driver, by, value, timeout), element_name, screenshot_prefix)
+
+def test_elements(driver, elements, screenshot_prefix, timeout=10):
+    """Test several elements of one screen from a single page source snapshot and update test_passed variable."""
+    global test_passed
+    results = verify_elements(driver, [(by, value) for by, value, _ in elements], timeout)
+    for by, value, element_name in elements:
+        print(f"{element_name} {'found' if results[(by, value)] else 'not found'}.")
+    if all(results.values()):
+        save_screenshot(driver, f"{screenshot_prefix}_ok", timestamp, failed=False)
+        return True
+    save_screenshot(driver, f"{screenshot_prefix}_fail", timestamp, failed=True)
+    test_passed = False
+    return False
+
 def tap_and_test_location(driver, accessibility_id, location_name, screenshot_prefix):
     """Tap location and test if temperature is visible. Save screenshot for success/failure."""
     global test_passed
     try:
-        element = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((AppiumBy.ACCESSIBILITY_ID, accessibility_id))
-        )
+        element = wait_for_clickable(driver, AppiumBy.ACCESSIBILITY_ID, accessibility_id, 10)
+        if element is None:
+            raise TimeoutException(f"{accessibility_id} not clickable")
         element.click()
         print(f"{location_name} - element found and clicked successfully.")
         
-        # Wait for weather data to load
-        time.sleep(10)
-        
-        # Check if "LÄMPÖTILA" is visible (NOTE: This is the actual element ID in the app)
-        if check_element(driver, AppiumBy.ACCESSIBILITY_ID, "LÄMPÖTILA", 10):
+        # Wait for weather data to load: check if "LÄMPÖTILA" is visible (NOTE: This is the actual element ID in the app)
+        # Polling replaces the earlier fixed 10 s sleep + 10 s check; budget from config (WEATHER_DATA_TIMEOUT)
+        if check_element(driver, AppiumBy.ACCESSIBILITY_ID, "LÄMPÖTILA", WEATHER_DATA_TIMEOUT):
             print("Temperature element found. Weather data loaded successfully.")
             save_screenshot(driver, f"{screenshot_prefix}_ok", timestamp, failed=False)
             return True
@@ -103,52 +116,55 @@ def tap_and_test_location(driver, accessibility_id, location_name, screenshot_pr
         return False
 
 print("\nTest_features_automation.py - Automation test starting...")
-time.sleep(2)
 
 try:
-    # Close app first to ensure initial view
-    driver.terminate_app("fi.sbweather.app")
-    print("App closed. Reopening...")
-    time.sleep(2)
+    # Commands are grouped by section in the latency summary
+    with RECORDER.step("Main view"):
+        # Close app first to ensure initial view
+        driver.terminate_app("fi.sbweather.app")
+        print("App closed. Reopening...")
+        wait_for_app_state(driver, "fi.sbweather.app", APP_NOT_RUNNING, 5)
+
+        # Reopen the app
+        driver.activate_app("fi.sbweather.app")
+        print("Opening app Main view...")   
+        wait_for_element(driver, AppiumBy.ACCESSIBILITY_ID, "KOTI\nTab 1 of 3", 15, "app start to HOME tab")
+
+        # Main view verification: check if HOME tab button is visible using accessibility id (JIRA-123)
+        test_element(driver, AppiumBy.ACCESSIBILITY_ID, "KOTI\nTab 1 of 3", 
+                    "HOME button", "HOME_button_main")
     
-    # Reopen the app
-    driver.activate_app("fi.sbweather.app")
-    print("Opening app Main view...")   
-    time.sleep(5)
-    
-    # Main view verification: check if HOME tab button is visible using accessibility id (JIRA-123)
-    test_element(driver, AppiumBy.ACCESSIBILITY_ID, "KOTI\nTab 1 of 3", 
-                "HOME button", "HOME_button_main")
-    
-    # Tap and input Oulu text to field
-    driver.tap([(400, 780)])  
-    time.sleep(3) 
-    driver.execute_script('mobile: shell', {
-        'command': 'input',
-        'args': ['text', 'Oulu'],
-        'includeStderr': True,
-        'timeout': 5000
-    })
-    save_screenshot(driver, "Oulu_weather_stations_list", timestamp, failed=False)
-    
-    # Test Oulu Vihreäsaari
-    tap_and_test_location(driver, "Oulu Vihreäsaari", "Oulu Vihreäsaari", "Weather_oulu_vihreasaari")
-    
-    # Test Oulu lentoasema
-    tap_and_test_location(driver, "Oulu lentoasema", "Oulu lentoasema", "Weather_oulu_airport")
-    
-    # Return to Main view
-    driver.back()
-    time.sleep(3)
-    driver.back()
-    print("Used Android back button x2 to return to the Main view.")
+    with RECORDER.step("Locations"):
+        # Tap and input Oulu text to field
+        layout.tap(driver, "search",
+                   lambda: check_element(driver, *SEARCH_FIELD_FOCUSED, 5))
+        driver.execute_script('mobile: shell', {
+            'command': 'input',
+            'args': ['text', 'Oulu'],
+            'includeStderr': True,
+            'timeout': 5000
+        })
+        save_screenshot(driver, "Oulu_weather_stations_list", timestamp, failed=False)
+
+        # Test Oulu Vihreäsaari
+        tap_and_test_location(driver, "Oulu Vihreäsaari", "Oulu Vihreäsaari", "Weather_oulu_vihreasaari")
+
+        # Test Oulu lentoasema
+        tap_and_test_location(driver, "Oulu lentoasema", "Oulu lentoasema", "Weather_oulu_airport")
+
+        # Return to Main view
+        driver.back()
+        wait_for_stable_screen(driver, 5, "back to station list")
+        driver.back()
+        print("Used Android back button x2 to return to the Main view.")
+        wait_for_element(driver, AppiumBy.ACCESSIBILITY_ID, "KOTI\nTab 1 of 3", 5, "back to Main view")
 
     # Check each view "Lämpimimmät", "Kylmimmät", "Sateisimmat", "Tuulisimmat"
-    view_coords = [
-        (300, 1150),
-        (790, 1150),
-        (300, 1480),
-        (790, 1480)
+    view_targets = [
+        "view_warmest",
+        "view_coldest",
+        "view_rainiest",
+        "view_windiest"
     ]
     view_accessibility_ids = [
         "Lämpimimmät",
@@ -163,47 +179,48 @@ try:
         "Most_Windy"
     ]
 
-    for idx, coords in enumerate(view_coords):
-        print(f"Opening {view_names[idx]} View...")
-        driver.tap([coords])
-        time.sleep(6)
-        
-        # Check if the view actually opened
-        test_element(driver, AppiumBy.ACCESSIBILITY_ID, view_accessibility_ids[idx],
-                    f"{view_accessibility_ids[idx]} element", view_names[idx])
-        
-        # Return to Main view    
-        driver.back()
-        print(f"Returned to Main view from {view_names[idx]}.")
-        time.sleep(3)
-
-    # Open RECORDS tab and check for widget view
-    try:
-        # Click RECORDS tab
-        records_tab = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((AppiumBy.ACCESSIBILITY_ID, "ENNÄTYKSET\nTab 2 of 3"))
-        )
-        records_tab.click()
-        print("RECORDS tab opened.")
-        time.sleep(3)
-        
-        # Check if widget view (ImageView) is visible
-        test_element(driver, AppiumBy.CLASS_NAME, "android.widget.ImageView",
-                    "Widget image (ImageView)", "Records_widget")
-        
-        time.sleep(3)     
-    except TimeoutException:
-        print("RECORDS tab not found.")
-        save_screenshot(driver, "Records_tab_not_found", timestamp, failed=True)
-        test_passed = False
+    for idx, target in enumerate(view_targets):
+        with RECORDER.step(f"View {view_names[idx]}"):
+            print(f"Opening {view_names[idx]} View...")
+            profiler.begin(view_accessibility_ids[idx])
+            # Check if the view actually opened (polls up to the earlier 6 s sleep + 10 s check);
+            # the check validates the tap, so a tap on stale bounds is re-resolved once
+            view_title = (AppiumBy.ACCESSIBILITY_ID, view_accessibility_ids[idx])
+            opened = layout.tap(driver, target, lambda: verify_elements(driver, [view_title], 16)[view_title])
+            report_element(opened, f"{view_accessibility_ids[idx]} element", view_names[idx])
+            profiler.end(view_accessibility_ids[idx])
+
+            # Return to Main view    
+            driver.back()
+            wait_for_element(driver, AppiumBy.ACCESSIBILITY_ID, "KOTI\nTab 1 of 3", 5, "back to Main view")
+            print(f"Returned to Main view from {view_names[idx]}.")
+
+    with RECORDER.step("Records"):
+        # Open RECORDS tab and check for widget view
+        try:
+            # Click RECORDS tab
+            records_tab = wait_for_clickable(driver, AppiumBy.ACCESSIBILITY_ID, "ENNÄTYKSET\nTab 2 of 3", 10)
+            if records_tab is None:
+                raise TimeoutException("RECORDS tab not clickable")
+            profiler.begin("ENNÄTYKSET")
+            records_tab.click()
+            print("RECORDS tab opened.")
+
+            # Check if widget view (ImageView) is visible
+            test_elements(driver, [(AppiumBy.CLASS_NAME, "android.widget.ImageView", "Widget image (ImageView)")],
+                          "Records_widget", timeout=13)
+            profiler.end("ENNÄTYKSET")
+        except TimeoutException:
+            print("RECORDS tab not found.")
+            save_screenshot(driver, "Records_tab_not_found", timestamp, failed=True)
+            test_passed = False
 
-    # Final view verification: check if HOME tab button is still visible
-    test_element(driver, AppiumBy.ACCESSIBILITY_ID, "KOTI\nTab 1 of 3",
-                "HOME button", "HOME_button_final")
+    with RECORDER.step("Final view"):
+        # Final view verification: check if HOME tab button is still visible
+        test_elements(driver, [(AppiumBy.ACCESSIBILITY_ID, "KOTI\nTab 1 of 3", "HOME button")], "HOME_button_final")
     
     # Closing the app - optional
     print("Test completed. Closing the app...")
-    time.sleep(3)
     driver.terminate_app("fi.sbweather.app")
 
 except Exception as e:
@@ -214,6 +231,10 @@ except Exception as e:
 finally:
     # Quit the driver
     driver.quit()
+    screenshots.close()
+    profiler.close()
+    print_wait_summary()
+    RECORDER.print_summary()
 
 # Print test results 
 if test_passed:
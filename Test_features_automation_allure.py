@@ -1,82 +1,188 @@
-import time
 import os
 import sys
+import json
 import pytest
 import allure
 from allure_commons.types import AttachmentType
-from appium import webdriver
-from appium.options.android import UiAutomator2Options
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from datetime import datetime
 from appium.webdriver.common.appiumby import AppiumBy
+from wait_utils import wait_for_element, wait_for_clickable, wait_timings, format_wait_summary, WAIT_LOG
+from driver_pool import DriverPool
+from config import DEVICE_UDID, WEATHER_DATA_TIMEOUT
+from page_snapshot import verify_elements
+from layout_cache import LayoutCache, SEARCH_FIELD_FOCUSED
+from command_metrics import RECORDER
+from render_profiler import RenderProfiler
+from screenshot_service import ScreenshotService, ScreenshotRingBuffer
 
 # Create timestamp
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-# Set to False if need to have screenshots from all tested views - not working as expected. Keep False -value to get any image
-SAVE_ONLY_FAILED_SCREENSHOTS = False
+# Save only failed screenshots (True) or all screenshots (False). Set SAVE_ALL_SCREENSHOTS=true to get images from all tested views.
+# With True, the latest screenshots of each test are kept in memory and attached only if the test fails.
+SAVE_ONLY_FAILED_SCREENSHOTS = os.environ.get("SAVE_ALL_SCREENSHOTS", "false").lower() != "true"
+
+# Tap targets are resolved once per screen size and app version and cached on disk
+layout = LayoutCache()
+
+# Screen checks are answered from page source snapshots (page_snapshot.verify_elements)
+HOME_TAB = (AppiumBy.ACCESSIBILITY_ID, "KOTI\nTab 1 of 3")
+RECORDS_WIDGET = (AppiumBy.CLASS_NAME, "android.widget.ImageView")
+
+# Screenshots are encoded in the background and attached when the test finishes
+screenshots = ScreenshotService()
+lead_up_screenshots = ScreenshotRingBuffer(screenshots, max_items=5)
+
+# Frame and memory stats per view, collected in the background when RENDER_PROFILE=1
+profiler = RenderProfiler(serial=DEVICE_UDID)
+PROFILED_VIEWS = {
+    'test_warmest_view': "Lämpimimmät",
+    'test_coldest_view': "Kylmimmät",
+    'test_rainiest_view': "Sateisimmat",
+    'test_windiest_view': "Tuulisimmat",
+    'test_records_tab': "ENNÄTYKSET",
+}
+
+# Appium sessions are created once and shared by all tests of the run
+@pytest.fixture(scope="session")
+def driver_pool():
+    pool = DriverPool()
+    yield pool
+    pool.close_all()
 
 # Pytest fixture for setup and teardown
 @pytest.fixture(scope="function")
-def driver():
-    options = UiAutomator2Options()
-    options.platform_name = "Android"
-    options.device_name = "Android_test_device"  
-    options.app_package = "fi.sbweather.app"
-    options.app_activity = "fi.sbweather.app.MainActivity"
-    options.automation_name = "UiAutomator2"
-    options.no_reset = True
-    options.full_reset = False
-
-    driver = webdriver.Remote("http://127.0.0.1:4723", options=options)
+def driver(driver_pool):
+    driver = driver_pool.checkout()
     yield driver
-    driver.quit()
+    driver_pool.release(driver)
 
 @pytest.fixture(scope="function")
-def app_setup(driver):
+def app_setup(driver, driver_pool):
     """Setup and teardown for each test function"""
-    driver.terminate_app("fi.sbweather.app")
-    time.sleep(2)
-    driver.activate_app("fi.sbweather.app")
-    time.sleep(5)
+    driver_pool.reset_app(driver)
+    yield
+
+@pytest.fixture(autouse=True)
+def flush_screenshots(request):
+    """
+    Attach the screenshots of each test once their background processing is done.
+    - Failed test: attach the buffered lead-up screenshots and the screen at failure.
+    - Passed test: drop the buffered screenshots.
+    """
     yield
+    reports = [getattr(request.node, f"rep_{phase}", None) for phase in ("setup", "call")]
+    if any(report is not None and report.failed for report in reports):
+        lead_up_screenshots.persist(attach=True)
+        driver = request.node.funcargs.get("driver")
+        if driver is not None:
+            try:
+                save_screenshot(driver, "At_failure", True)
+            except WebDriverException as e:
+                print(f"Could not take failure screenshot: {e.msg}")
+    else:
+        lead_up_screenshots.clear()
+    screenshots.flush()
+
+@pytest.fixture(scope="session", autouse=True)
+def close_screenshots():
+    yield
+    screenshots.close()
+
+@pytest.fixture(scope="function")
+def render_profile(request, app_setup):
+    """
+    Profile the test's view after the app reset and attach its frame and memory stats.
+    - The test calls the fixture value to end the window before it navigates away from the view.
+    - Collection runs on the profiler thread meanwhile; teardown only waits if it is still running.
+    """
+    view = PROFILED_VIEWS[request.node.name]
+    ended = []
+
+    def end():
+        if not ended:
+            profiler.end(view, request.node.name)
+            ended.append(view)
+
+    profiler.begin(view)
+    yield end
+    end()
+    entry = profiler.result(view)
+    if entry:
+        allure.attach(json.dumps(entry, indent=2, ensure_ascii=False), name=f"Rendering and memory - {view}",
+                      attachment_type=AttachmentType.JSON)
+
+@pytest.fixture(scope="session", autouse=True)
+def close_profiler():
+    yield
+    profiler.close()
+
+@pytest.fixture(autouse=True)
+def command_report(request):
+    """Time the Appium commands of each test and attach the breakdown to the Allure report"""
+    with RECORDER.step(request.node.name):
+        yield
+    if RECORDER.by_command(request.node.name):
+        allure.attach(RECORDER.report(request.node.name), name="Appium command latency",
+                      attachment_type=AttachmentType.TEXT)
+
+@pytest.fixture(scope="session", autouse=True)
+def command_summary():
+    """Print the run-wide command latency summary"""
+    yield
+    RECORDER.print_summary()
+
+@pytest.fixture(autouse=True)
+def wait_report():
+    """Attach the measured wait durations of each test to the Allure report"""
+    first_wait = len(WAIT_LOG)
+    yield
+    entries = wait_timings(first_wait)
+    if entries:
+        allure.attach(format_wait_summary(entries), name="Wait timings", attachment_type=AttachmentType.TEXT)
 
 def save_screenshot(driver, filename_prefix, failed=False):
     """
     Save screenshot based on settings.
     - Always save failed screenshots.
-    - Save successful screenshots only if SAVE_ONLY_FAILED_SCREENSHOTS is False.
+    - Save successful screenshots only if SAVE_ONLY_FAILED_SCREENSHOTS is False,
+      otherwise keep them in the lead-up buffer in case the test fails later.
     """
+    name = f"{filename_prefix}_{'failed' if failed else 'success'}"
     if failed or not SAVE_ONLY_FAILED_SCREENSHOTS:
-        allure.attach(
-            driver.get_screenshot_as_png(),
-            name=f"{filename_prefix}_{'failed' if failed else 'success'}",
-            attachment_type=AttachmentType.PNG
-        )
+        screenshots.capture(driver, name, attach=True)
+    else:
+        lead_up_screenshots.capture(driver, name)
 
 def check_element(driver, by, value, timeout=10):
     """Check if element exists and return True/False."""
-    try:
-        WebDriverWait(driver, timeout).until(EC.presence_of_element_located((by, value)))
-        return True
-    except TimeoutException:
-        return False
+    return wait_for_element(driver, by, value, timeout) is not None
+
+def view_opened(driver, title, timeout=16):
+    """Check from page source snapshots that the view with the title is shown."""
+    view = (AppiumBy.ACCESSIBILITY_ID, title)
+    return verify_elements(driver, [view], timeout)[view]
+
+def click_when_ready(driver, by, value, timeout=10):
+    """Wait until element is clickable and click it"""
+    element = wait_for_clickable(driver, by, value, timeout)
+    assert element is not None, f"{value} not clickable"
+    element.click()
 
 # Selkeät, erilliset testifunktiot jokaiselle testitapaukselle
 @allure.feature("Main View")
 def test_home_tab(driver, app_setup):
     """Test that home tab is visible"""
-    assert check_element(driver, AppiumBy.ACCESSIBILITY_ID, "KOTI\nTab 1 of 3", 10), "HOME button not found"
+    assert verify_elements(driver, [HOME_TAB], 10)[HOME_TAB], "HOME button not found"
     save_screenshot(driver, "HOME_button_main", False)
 
 @allure.feature("Search Functionality")
 def test_oulu_search(driver, app_setup):
     """Test search functionality for Oulu"""
-    driver.tap([(400, 780)])  
-    time.sleep(3) 
+    layout.tap(driver, "search",
+               lambda: check_element(driver, *SEARCH_FIELD_FOCUSED, 5))
     driver.execute_script('mobile: shell', {
         'command': 'input', 'args': ['text', 'Oulu'], 'includeStderr': True, 'timeout': 5000
     })
@@ -87,13 +193,9 @@ def test_oulu_vihreasaari(driver, app_setup):
     """Test Oulu Vihreäsaari location"""
     test_oulu_search(driver, app_setup)  # Kutsu hakutoiminnallisuus
     
-    element = WebDriverWait(driver, 10).until(
-        EC.element_to_be_clickable((AppiumBy.ACCESSIBILITY_ID, "Oulu Vihreäsaari"))
-    )
-    element.click()
-    time.sleep(10)
+    click_when_ready(driver, AppiumBy.ACCESSIBILITY_ID, "Oulu Vihreäsaari")
     
-    assert check_element(driver, AppiumBy.ACCESSIBILITY_ID, "LÄMPÖTILA", 10), "Weather data not loaded for Vihreäsaari"
+    assert check_element(driver, AppiumBy.ACCESSIBILITY_ID, "LÄMPÖTILA", WEATHER_DATA_TIMEOUT), "Weather data not loaded for Vihreäsaari"
     save_screenshot(driver, "Weather_oulu_vihreasaari", False)
 
 @allure.feature("Location Tests") 
@@ -101,79 +203,68 @@ def test_oulu_airport(driver, app_setup):
     """Test Oulu airport location"""
     test_oulu_search(driver, app_setup)  # Kutsu hakutoiminnallisuus
     
-    element = WebDriverWait(driver, 10).until(
-        EC.element_to_be_clickable((AppiumBy.ACCESSIBILITY_ID, "Oulu lentoasema"))
-    )
-    element.click()
-    time.sleep(10)
+    click_when_ready(driver, AppiumBy.ACCESSIBILITY_ID, "Oulu lentoasema")
     
-    assert check_element(driver, AppiumBy.ACCESSIBILITY_ID, "LÄMPÖTILA", 10), "Weather data not loaded for airport"
+    assert check_element(driver, AppiumBy.ACCESSIBILITY_ID, "LÄMPÖTILA", WEATHER_DATA_TIMEOUT), "Weather data not loaded for airport"
     save_screenshot(driver, "Weather_oulu_airport", False)
 
 @allure.feature("Weather Views")
-def test_warmest_view(driver, app_setup):
+def test_warmest_view(driver, app_setup, render_profile):
     """Test warmest weather view"""
-    driver.tap([(300, 1150)])
-    time.sleep(6)
-    
-    assert check_element(driver, AppiumBy.ACCESSIBILITY_ID, "Lämpimimmät", 10), "Warmest view not found"
+    # The tap's validation is the view check; a failed tap is re-resolved once
+    assert layout.tap(driver, "view_warmest", lambda: view_opened(driver, "Lämpimimmät")), "Warmest view not found"
     save_screenshot(driver, "Max_Temp", False)
+    render_profile()
     
     driver.back()
-    time.sleep(3)
+    wait_for_element(driver, AppiumBy.ACCESSIBILITY_ID, "KOTI\nTab 1 of 3", 5, "back to Main view")
 
 @allure.feature("Weather Views")
-def test_coldest_view(driver, app_setup):
+def test_coldest_view(driver, app_setup, render_profile):
     """Test coldest weather view"""
-    driver.tap([(790, 1150)])
-    time.sleep(6)
-    
-    assert check_element(driver, AppiumBy.ACCESSIBILITY_ID, "Kylmimmät", 10), "Coldest view not found"
+    # The tap's validation is the view check; a failed tap is re-resolved once
+    assert layout.tap(driver, "view_coldest", lambda: view_opened(driver, "Kylmimmät")), "Coldest view not found"
     save_screenshot(driver, "Low_Temp", False)
+    render_profile()
     
     driver.back()
-    time.sleep(3)
+    wait_for_element(driver, AppiumBy.ACCESSIBILITY_ID, "KOTI\nTab 1 of 3", 5, "back to Main view")
 
 @allure.feature("Weather Views")
-def test_rainiest_view(driver, app_setup):
+def test_rainiest_view(driver, app_setup, render_profile):
     """Test rainiest weather view"""
-    driver.tap([(300, 1480)])
-    time.sleep(6)
-    
-    assert check_element(driver, AppiumBy.ACCESSIBILITY_ID, "Sateisimmat", 10), "Rainiest view not found"
+    # The tap's validation is the view check; a failed tap is re-resolved once
+    assert layout.tap(driver, "view_rainiest", lambda: view_opened(driver, "Sateisimmat")), "Rainiest view not found"
     save_screenshot(driver, "Most_Rain", False)
+    render_profile()
     
     driver.back()
-    time.sleep(3)
+    wait_for_element(driver, AppiumBy.ACCESSIBILITY_ID, "KOTI\nTab 1 of 3", 5, "back to Main view")
 
 @allure.feature("Weather Views")
-def test_windiest_view(driver, app_setup):
+def test_windiest_view(driver, app_setup, render_profile):
     """Test windiest weather view"""
-    driver.tap([(790, 1480)])
-    time.sleep(6)
-    
-    assert check_element(driver, AppiumBy.ACCESSIBILITY_ID, "Tuulisimmat", 10), "Windiest view not found"
+    # The tap's validation is the view check; a failed tap is re-resolved once
+    assert layout.tap(driver, "view_windiest", lambda: view_opened(driver, "Tuulisimmat")), "Windiest view not found"
     save_screenshot(driver, "Most_Windy", False)
+    render_profile()
     
     driver.back()
-    time.sleep(3)
+    wait_for_element(driver, AppiumBy.ACCESSIBILITY_ID, "KOTI\nTab 1 of 3", 5, "back to Main view")
 
 @allure.feature("Records Tab")
-def test_records_tab(driver, app_setup):
+def test_records_tab(driver, app_setup, render_profile):
     """Test records tab functionality"""
-    records_tab = WebDriverWait(driver, 10).until(
-        EC.element_to_be_clickable((AppiumBy.ACCESSIBILITY_ID, "ENNÄTYKSET\nTab 2 of 3"))
-    )
-    records_tab.click()
-    time.sleep(3)
+    click_when_ready(driver, AppiumBy.ACCESSIBILITY_ID, "ENNÄTYKSET\nTab 2 of 3")
     
-    assert check_element(driver, AppiumBy.CLASS_NAME, "android.widget.ImageView", 10), "Records tab widget not found"
+    assert verify_elements(driver, [RECORDS_WIDGET], 13)[RECORDS_WIDGET], "Records tab widget not found"
     save_screenshot(driver, "Records_widget", False)
+    render_profile()
 
 @allure.feature("Final Verification")
 def test_final_home_check(driver, app_setup):
     """Final verification that home tab is still visible"""
-    assert check_element(driver, AppiumBy.ACCESSIBILITY_ID, "KOTI\nTab 1 of 3", 10), "Final HOME button check failed"
+    assert verify_elements(driver, [HOME_TAB], 10)[HOME_TAB], "Final HOME button check failed"
     save_screenshot(driver, "HOME_button_final", False)
     
     driver.terminate_app("fi.sbweather.app")
\ No newline at end of file
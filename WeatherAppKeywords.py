@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Weather App Keywords - Python keyword library for weather_app_tests.robot
+1. Tap Target, Type Text and Wait For Screen poll for readiness instead of sleeping a fixed time.
+2. Every check is one find_elements call per poll; locators are parsed and compiled once.
+3. Taps on named targets go through the layout cache shared with the Python suite.
+4. Each keyword logs its own duration; Log Keyword Timings writes p50/p95 per keyword to the Robot log.
+"""
+
+import functools
+import time
+from functools import lru_cache
+from appium.webdriver.common.appiumby import AppiumBy
+from robot.api import logger
+from robot.libraries.BuiltIn import BuiltIn
+from command_metrics import CommandRecorder
+from layout_cache import LayoutCache
+from locators import compile_locator
+from wait_utils import wait_for_element
+
+# AppiumLibrary locator prefixes
+STRATEGIES = {
+    'accessibility_id': AppiumBy.ACCESSIBILITY_ID,
+    'id': AppiumBy.ID,
+    'xpath': AppiumBy.XPATH,
+    'class': AppiumBy.CLASS_NAME,
+    'android': AppiumBy.ANDROID_UIAUTOMATOR,
+}
+
+@lru_cache(maxsize=None)
+def parse_locator(locator):
+    """(by, value) of an AppiumLibrary style locator ('accessibility_id=KOTI', '//...'), compiled once"""
+    strategy, separator, value = locator.partition("=")
+    if separator and strategy.strip() in STRATEGIES:
+        by = STRATEGIES[strategy.strip()]
+    elif locator.startswith("//"):
+        by, value = AppiumBy.XPATH, locator
+    else:
+        by, value = AppiumBy.ACCESSIBILITY_ID, locator
+    return compile_locator(by, value, verbose=False)
+
+def timed(method):
+    """Record the keyword duration and log it"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            name = method.__name__.replace("_", " ").title()
+            self.timings.record(name, seconds, step=BuiltIn().get_variable_value("${TEST NAME}", "suite"))
+            logger.info(f"{name} {' '.join(str(arg) for arg in args)}: {seconds:.2f}s")
+    return wrapper
+
+class WeatherAppKeywords:
+    """Keywords for the Sebitti Sää Robot suite, using the AppiumLibrary session"""
+
+    ROBOT_LIBRARY_SCOPE = 'GLOBAL'
+
+    def __init__(self):
+        self.layout = LayoutCache(verbose=False)
+        self.timings = CommandRecorder()
+
+    @property
+    def driver(self):
+        return BuiltIn().get_library_instance('AppiumLibrary')._current_application()
+
+    def _wait(self, locator, timeout):
+        element = wait_for_element(self.driver, *parse_locator(locator), timeout=float(timeout), description=locator)
+        if element is None:
+            raise AssertionError(f"'{locator}' did not appear in {timeout} seconds")
+        return element
+
+    @timed
+    def wait_for_screen(self, locator, timeout=10):
+        """Wait until the element identifying the screen is present"""
+        self._wait(locator, timeout)
+
+    @timed
+    def tap_target(self, target, expect=None, timeout=10):
+        """
+        Tap a layout cache target (e.g. search) or the element of a locator.
+        expect: locator of the element the tap should bring up; waited for after the tap.
+        """
+        if target in self.layout.targets:
+            validate = None
+            if expect:
+                validate = lambda: wait_for_element(self.driver, *parse_locator(expect), timeout=float(timeout),
+                                                    description=expect) is not None
+            if not self.layout.tap(self.driver, target, validate):
+                raise AssertionError(f"Tapping '{target}' did not bring up '{expect}'")
+            return
+        self._wait(target, timeout).click()
+        if expect:
+            self._wait(expect, timeout)
+
+    @timed
+    def type_text(self, text, expect=None, timeout=10):
+        """Type into the focused field with adb input (needs --allow-insecure adb_shell)"""
+        self.driver.execute_script('mobile: shell', {
+            'command': 'input',
+            'args': ['text', text.replace(" ", "%s")],
+            'includeStderr': True,
+            'timeout': 5000
+        })
+        if expect:
+            self._wait(expect, timeout)
+
+    def log_keyword_timings(self):
+        """Write count, total and p50/p95/p99 of every keyword to the log"""
+        logger.info(self.timings.report(title="Weather app keyword timings"))
+        logger.info(self.timings.step_report())
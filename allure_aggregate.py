@@ -0,0 +1,622 @@
+#!/usr/bin/env python3
+"""
+Allure Aggregate - Incremental Python report generation into an existing Allure report
+1. Keeps a cache of processed result and container files keyed by their content hash.
+2. Rebuilds data/test-cases/<uid>.json and copies attachments only for new or changed results.
+3. Recomputes the trees (suites, behaviors, packages, categories, timeline), widgets, history and
+   exports from the cached summaries and writes only the files whose content changed.
+4. Leaves the static viewer (index.html, app.js, styles.css, plugins) as it is; a report directory
+   without it has to be generated once with the allure CLI.
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from history_store import STATUSES, load_categories, match_categories
+
+CACHE_FILE = ".aggregate-cache.json"
+CACHE_VERSION = 1
+VIEWER_FILES = ("index.html", "app.js", "styles.css")
+HISTORY_ITEMS = 20
+
+def log_message(message, verbose=True):
+    """Print message for GitHub Actions UI"""
+    if verbose:
+        print(f"[ALLURE-AGGREGATE] {message}")
+        sys.stdout.flush()
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def text_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def short_uid(*parts):
+    """Stable 16-hex uid, like the ones Allure uses for test cases and attachments"""
+    return hashlib.md5("\x00".join(parts).encode('utf-8')).hexdigest()[:16]
+
+def group_uid(*parts):
+    return hashlib.md5("\x00".join(parts).encode('utf-8')).hexdigest()
+
+def empty_statistic():
+    return {**dict.fromkeys(STATUSES, 0), 'total': 0}
+
+def add_status(statistic, status):
+    statistic[status if status in STATUSES else 'unknown'] += 1
+    statistic['total'] += 1
+
+def time_of(item):
+    start, stop = item.get('start'), item.get('stop')
+    result = {'start': start, 'stop': stop}
+    if start is not None and stop is not None:
+        result['duration'] = stop - start
+    return result
+
+def label_values(labels, name):
+    return [label['value'] for label in labels if label.get('name') == name and label.get('value')]
+
+def first_label(labels, name, default=None):
+    values = label_values(labels, name)
+    return values[0] if values else default
+
+def dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+class ReportWriter:
+    """Writes report files, skipping those whose content hash is unchanged"""
+
+    def __init__(self, report_dir, outputs):
+        self.report_dir = Path(report_dir)
+        self.outputs = outputs
+        self.written = 0
+        self.skipped = 0
+
+    def write(self, relative_path, text):
+        path = self.report_dir / relative_path
+        digest = text_hash(text)
+        if self.outputs.get(relative_path) == digest and path.exists():
+            self.skipped += 1
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        self.outputs[relative_path] = digest
+        self.written += 1
+        return True
+
+    def write_json(self, relative_path, data):
+        return self.write(relative_path, dumps(data))
+
+class AllureAggregator:
+    """Incremental aggregation of one results directory into one report directory"""
+
+    def __init__(self, results_dir="allure-results", report_dir="allure-report", verbose=True):
+        self.results_dir = Path(results_dir)
+        self.report_dir = Path(report_dir)
+        self.verbose = verbose
+        self.cache_path = self.report_dir / CACHE_FILE
+        self.cache = self._load_cache()
+        self.writer = ReportWriter(self.report_dir, self.cache['outputs'])
+        self.rebuilt = 0
+        self.attachments_copied = 0
+
+    def _load_cache(self):
+        empty = {'version': CACHE_VERSION, 'results': {}, 'containers': {}, 'outputs': {}}
+        if not self.cache_path.exists():
+            return empty
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            log_message(f"Ignoring unreadable cache {self.cache_path}: {e}", self.verbose)
+            return empty
+        return cache if cache.get('version') == CACHE_VERSION else empty
+
+    def _save_cache(self):
+        temp_path = self.cache_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.cache, f, ensure_ascii=False)
+        os.replace(temp_path, self.cache_path)
+
+    def has_viewer(self):
+        return all((self.report_dir / name).exists() for name in VIEWER_FILES)
+
+    def _read_json(self, name):
+        with open(self.results_dir / name, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    # --- scanning ---------------------------------------------------------
+    def _scan(self, pattern, section, summarize):
+        """Hash the files of a kind; parse only new or changed ones. Returns {name: entry}"""
+        cached = self.cache[section]
+        current = {}
+        for path in self.results_dir.glob(pattern):
+            digest = file_hash(path)
+            entry = cached.get(path.name)
+            if entry is None or entry['hash'] != digest:
+                try:
+                    entry = {'hash': digest, 'summary': summarize(self._read_json(path.name))}
+                except (json.JSONDecodeError, OSError, KeyError, TypeError) as e:
+                    log_message(f"Skipping unreadable {path.name}: {e}", self.verbose)
+                    continue
+            current[path.name] = entry
+        return current
+
+    @staticmethod
+    def summarize_result(result):
+        details = result.get('statusDetails') or {}
+        return {
+            'uuid': result['uuid'],
+            'historyId': result.get('historyId') or result['uuid'],
+            'name': result.get('name') or result.get('fullName') or result['uuid'],
+            'fullName': result.get('fullName'),
+            'status': result.get('status') if result.get('status') in STATUSES else 'unknown',
+            'message': details.get('message'),
+            'trace': details.get('trace'),
+            'flaky': bool(details.get('flaky')),
+            'time': time_of(result),
+            'labels': result.get('labels', []),
+            'parameters': result.get('parameters', []),
+            'description': result.get('description')
+        }
+
+    @staticmethod
+    def summarize_container(container):
+        return {
+            'children': container.get('children', []),
+            'befores': container.get('befores', []),
+            'afters': container.get('afters', [])
+        }
+
+    # --- test cases -------------------------------------------------------
+    def _attachment(self, attachment, copied):
+        source = attachment.get('source', '')
+        extension = os.path.splitext(source)[1]
+        uid = short_uid(source)
+        target = self.report_dir / 'data' / 'attachments' / f"{uid}{extension}"
+        source_path = self.results_dir / source
+        size = source_path.stat().st_size if source_path.exists() else 0
+        # Attachment files are immutable by name, so an existing copy is never rewritten
+        if source_path.exists() and not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source_path, target)
+            self.attachments_copied += 1
+        copied.append(target.name)
+        return {'uid': uid, 'name': attachment.get('name'), 'source': target.name,
+                'type': attachment.get('type'), 'size': size}
+
+    def _stage(self, item, copied, name=None):
+        steps = [self._stage(step, copied) for step in item.get('steps', [])]
+        attachments = [self._attachment(a, copied) for a in item.get('attachments', [])]
+        details = item.get('statusDetails') or {}
+        parameters = item.get('parameters', [])
+        stage = {
+            'name': name if name is not None else item.get('name'),
+            'time': time_of(item),
+            'status': item.get('status', 'unknown'),
+            'steps': steps,
+            'attachments': attachments,
+            'parameters': parameters,
+            'shouldDisplayMessage': bool(details.get('message')) and not any(s.get('statusMessage') for s in steps),
+            'attachmentsCount': len(attachments) + sum(s['attachmentsCount'] for s in steps),
+            'hasContent': bool(steps or attachments or parameters or details.get('message')),
+            'attachmentStep': False,
+            'stepsCount': len(steps) + sum(s['stepsCount'] for s in steps)
+        }
+        if details.get('message'):
+            stage['statusMessage'] = details['message']
+        if details.get('trace'):
+            stage['statusTrace'] = details['trace']
+        return stage
+
+    def _fixtures(self, uuid, containers, kind):
+        return [fixture for container in containers.values()
+                if uuid in container['summary']['children']
+                for fixture in container['summary'][kind]]
+
+    def _build_test_case(self, name, entry, containers, case):
+        """Write data/test-cases/<uid>.json of one result; returns the attachment files it uses"""
+        result = self._read_json(name)
+        copied = []
+        test_stage = self._stage(result, copied)
+        test_stage.pop('name')
+        test_stage.pop('time')
+        test_stage['description'] = result.get('description')
+        before_stages = [self._stage(f, copied) for f in self._fixtures(result['uuid'], containers, 'befores')]
+        after_stages = [self._stage(f, copied) for f in self._fixtures(result['uuid'], containers, 'afters')]
+        summary = entry['summary']
+        labels = summary['labels']
+        test_case = {
+            'uid': case['uid'],
+            'name': summary['name'],
+            'fullName': summary['fullName'],
+            'historyId': summary['historyId'],
+            'time': summary['time'],
+            'description': result.get('description'),
+            'descriptionHtml': result.get('descriptionHtml'),
+            'status': summary['status'],
+            'flaky': case['flaky'],
+            'newFailed': case['newFailed'],
+            'newBroken': case['newBroken'],
+            'newPassed': case['newPassed'],
+            'retriesCount': len(case['retries']),
+            'retriesStatusChange': case['retriesStatusChange'],
+            'beforeStages': before_stages,
+            'testStage': test_stage,
+            'afterStages': after_stages,
+            'labels': labels,
+            'parameters': summary['parameters'],
+            'links': result.get('links', []),
+            'hidden': case['retry'],
+            'retry': case['retry'],
+            'extra': {
+                'severity': first_label(labels, 'severity', 'normal'),
+                'retries': case['retries'],
+                'categories': [{'name': category, 'matchedStatuses': []} for category in case['categories']],
+                'history': case['history'],
+                'tags': label_values(labels, 'tag')
+            },
+            'source': f"{case['uid']}.json",
+            'parameterValues': [parameter.get('value') for parameter in summary['parameters']]
+        }
+        if summary['message']:
+            test_case['statusMessage'] = summary['message']
+        if summary['trace']:
+            test_case['statusTrace'] = summary['trace']
+        self.writer.write_json(f"data/test-cases/{case['uid']}.json", test_case)
+        return copied
+
+    # --- trees and widgets ------------------------------------------------
+    @staticmethod
+    def build_tree(name, items, paths_of):
+        """Allure tree: groups from the label paths of each item, leaves at the end of each path"""
+        root = {'uid': group_uid(name), 'name': name, 'children': []}
+        groups = {}
+        for case, leaf in items:
+            for path in paths_of(case):
+                node, key = root, ()
+                for part in path:
+                    key += (part,)
+                    child = groups.get(key)
+                    if child is None:
+                        child = {'name': part, 'children': [], 'uid': group_uid(name, *key)}
+                        groups[key] = child
+                        node['children'].append(child)
+                    node = child
+                node['children'].append({**leaf, 'parentUid': node['uid']})
+        return root
+
+    @staticmethod
+    def tree_widget(tree):
+        """Top-level groups of a tree with their status statistics"""
+        def collect(node, statistic):
+            for child in node['children']:
+                if 'children' in child:
+                    collect(child, statistic)
+                else:
+                    add_status(statistic, child['status'])
+            return statistic
+
+        items = [{'uid': group['uid'], 'name': group['name'], 'statistic': collect(group, empty_statistic())}
+                 for group in tree['children'] if 'children' in group]
+        return {'total': len(items), 'items': items}
+
+    @staticmethod
+    def csv_text(header, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL, lineterminator="\n")
+        writer.writerow(header)
+        writer.writerows(rows)
+        return buffer.getvalue()
+
+    def _read_history(self, name, default):
+        path = self.results_dir / 'history' / name
+        if not path.exists():
+            return default
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            log_message(f"Ignoring unreadable {path}: {e}", self.verbose)
+            return default
+
+    # --- main -------------------------------------------------------------
+    def aggregate(self):
+        """Update the report; returns a summary dict, or None when the report has no viewer yet"""
+        if not self.has_viewer():
+            log_message(f"No Allure viewer in {self.report_dir}, generate it once with the allure CLI", self.verbose)
+            return None
+        start = time.monotonic()
+
+        results = self._scan('*-result.json', 'results', self.summarize_result)
+        containers = self._scan('*-container.json', 'containers', self.summarize_container)
+        categories_config = load_categories(self.results_dir)
+        previous_history = self._read_history('history.json', {})
+
+        # Latest result of each historyId is the test case, older ones are its retries
+        groups = {}
+        for name, entry in results.items():
+            groups.setdefault(entry['summary']['historyId'], []).append(name)
+        cases = {}
+        for history_id, names in groups.items():
+            names.sort(key=lambda n: results[n]['summary']['time'].get('stop') or 0, reverse=True)
+            main = results[names[0]]['summary']
+            history = previous_history.get(history_id)
+            previous_status = history['items'][0]['status'] if history and history.get('items') else None
+            retries = [{
+                'uid': short_uid(results[n]['summary']['uuid']),
+                'status': results[n]['summary']['status'],
+                'statusDetails': results[n]['summary']['message'],
+                'time': results[n]['summary']['time']
+            } for n in names[1:]]
+            categories = match_categories({'status': main['status'],
+                                           'statusDetails': {'message': main['message'], 'trace': main['trace']}},
+                                          categories_config)
+            for position, name in enumerate(names):
+                summary = results[name]['summary']
+                cases[name] = {
+                    'uid': short_uid(summary['uuid']),
+                    'retry': position > 0,
+                    'retries': retries if position == 0 else [],
+                    'retriesStatusChange': any(r['status'] != main['status'] for r in retries),
+                    'flaky': summary['flaky'],
+                    'newFailed': summary['status'] == 'failed' and previous_status not in (None, 'failed'),
+                    'newBroken': summary['status'] == 'broken' and previous_status not in (None, 'broken'),
+                    'newPassed': summary['status'] == 'passed' and previous_status not in (None, 'passed'),
+                    'categories': categories if position == 0 else [],
+                    'history': history
+                }
+
+        # Rebuild only the test cases whose inputs changed
+        for name, entry in results.items():
+            case = cases[name]
+            container_hashes = sorted(c['hash'] for c in containers.values()
+                                      if entry['summary']['uuid'] in c['summary']['children'])
+            key = text_hash(dumps([entry['hash'], container_hashes, case]))
+            cached = self.cache['results'].get(name)
+            if (cached and cached.get('key') == key
+                    and (self.report_dir / 'data' / 'test-cases' / f"{case['uid']}.json").exists()):
+                entry['key'], entry['attachments'] = key, cached.get('attachments', [])
+                continue
+            entry['key'] = key
+            entry['attachments'] = self._build_test_case(name, entry, containers, case)
+            self.rebuilt += 1
+
+        # Results that disappeared: remove their test cases and attachments
+        removed = 0
+        for name, cached in self.cache['results'].items():
+            if name in results:
+                continue
+            uid = short_uid(cached['summary']['uuid'])
+            (self.report_dir / 'data' / 'test-cases' / f"{uid}.json").unlink(missing_ok=True)
+            self.writer.outputs.pop(f"data/test-cases/{uid}.json", None)
+            for attachment in cached.get('attachments', []):
+                (self.report_dir / 'data' / 'attachments' / attachment).unlink(missing_ok=True)
+            removed += 1
+
+        statistic = self._write_aggregates(results, cases, previous_history)
+
+        self.cache['results'] = results
+        self.cache['containers'] = containers
+        self._save_cache()
+        summary = {
+            'results': len(results),
+            'rebuilt': self.rebuilt,
+            'removed': removed,
+            'attachments_copied': self.attachments_copied,
+            'files_written': self.writer.written,
+            'files_unchanged': self.writer.skipped,
+            'statistic': statistic,
+            'seconds': round(time.monotonic() - start, 3)
+        }
+        log_message(f"{summary['results']} results: {summary['rebuilt']} test cases rebuilt, {removed} removed, "
+                    f"{summary['attachments_copied']} attachments copied, {summary['files_written']} files written, "
+                    f"{summary['files_unchanged']} unchanged in {summary['seconds']}s", self.verbose)
+        return summary
+
+    def _write_aggregates(self, results, cases, previous_history):
+        """Trees, widgets, history and exports from the cached summaries"""
+        mains, everything = [], []
+        for name, entry in results.items():
+            summary, case = entry['summary'], cases[name]
+            leaf = {
+                'name': summary['name'], 'uid': case['uid'], 'status': summary['status'], 'time': summary['time'],
+                'flaky': case['flaky'], 'newFailed': case['newFailed'], 'newPassed': case['newPassed'],
+                'newBroken': case['newBroken'], 'retriesCount': len(case['retries']),
+                'retriesStatusChange': case['retriesStatusChange'],
+                'parameters': [p.get('value') for p in summary['parameters']],
+                'tags': label_values(summary['labels'], 'tag')
+            }
+            everything.append(((summary, case), leaf))
+            if not case['retry']:
+                mains.append(((summary, case), leaf))
+        mains.sort(key=lambda item: item[0][0]['time'].get('start') or 0)
+        everything.sort(key=lambda item: item[0][0]['time'].get('start') or 0)
+
+        def label_path(*names):
+            def paths(item):
+                labels = item[0]['labels']
+                return [[value for value in (first_label(labels, n) for n in names) if value]]
+            return paths
+
+        def package_path(item):
+            package = first_label(item[0]['labels'], 'package')
+            return [package.split('.') if package else []]
+
+        def category_paths(item):
+            summary, case = item
+            message = (summary['message'] or '').strip() or summary['status']
+            return [[category, message] for category in case['categories']]
+
+        trees = {
+            'suites': self.build_tree('suites', mains, label_path('parentSuite', 'suite', 'subSuite')),
+            'behaviors': self.build_tree('behaviors', mains, label_path('epic', 'feature', 'story')),
+            'packages': self.build_tree('packages', mains, package_path),
+            'categories': self.build_tree('categories', mains, category_paths),
+            'timeline': self.build_tree('timeline', everything, label_path('host', 'thread')),
+        }
+        for name, tree in trees.items():
+            self.writer.write_json(f"data/{name}.json", tree)
+        for name in ('suites', 'behaviors', 'categories'):
+            self.writer.write_json(f"widgets/{name}.json", self.tree_widget(trees[name]))
+
+        statistic = empty_statistic()
+        durations, starts, stops = [], [], []
+        duration_items = []
+        for (summary, case), leaf in mains:
+            add_status(statistic, summary['status'])
+            timing = summary['time']
+            if timing.get('duration') is not None:
+                durations.append(timing['duration'])
+            if timing.get('start') is not None:
+                starts.append(timing['start'])
+            if timing.get('stop') is not None:
+                stops.append(timing['stop'])
+            duration_items.append({'uid': case['uid'], 'name': summary['name'], 'time': timing,
+                                   'status': summary['status'],
+                                   'severity': first_label(summary['labels'], 'severity', 'normal')})
+        launch_time = {
+            'start': min(starts) if starts else None,
+            'stop': max(stops) if stops else None,
+            'duration': max(stops) - min(starts) if starts and stops else None,
+            'minDuration': min(durations) if durations else None,
+            'maxDuration': max(durations) if durations else None,
+            'sumDuration': sum(durations)
+        }
+        self.writer.write_json('widgets/summary.json', {'reportName': 'Allure Report', 'testRuns': [],
+                                                        'statistic': statistic, 'time': launch_time})
+        for name in ('duration', 'severity', 'status-chart'):
+            self.writer.write_json(f"widgets/{name}.json", duration_items)
+        self.writer.write_json('widgets/environment.json', self._environment())
+        executor = self._read_optional_json('executor.json')
+        self.writer.write_json('widgets/executors.json', [executor] if executor else [])
+        self.writer.write_json('widgets/launch.json', [])
+
+        self._write_history(mains, everything, statistic, launch_time, previous_history)
+        self._write_exports(mains, statistic, launch_time)
+        return statistic
+
+    def _read_optional_json(self, name):
+        path = self.results_dir / name
+        if not path.exists():
+            return None
+        try:
+            return self._read_json(name)
+        except (json.JSONDecodeError, OSError):
+            return None
+
+    def _environment(self):
+        path = self.results_dir / 'environment.properties'
+        if not path.exists():
+            return []
+        entries = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#') and '=' in line:
+                    key, value = line.split('=', 1)
+                    entries.append({'name': key.strip(), 'values': [value.strip()]})
+        return entries
+
+    def _write_history(self, mains, everything, statistic, launch_time, previous_history):
+        """history/*.json and the trend widgets; this run's entry takes the latest buildOrder of the trend"""
+        history = dict(previous_history)
+        for (summary, case), _ in mains:
+            entry = history.get(summary['historyId']) or {'statistic': empty_statistic(), 'items': []}
+            entry_statistic = dict(entry['statistic'])
+            add_status(entry_statistic, summary['status'])
+            item = {'uid': case['uid'], 'reportUrl': None, 'status': summary['status'], 'time': summary['time']}
+            if summary['message']:
+                item['statusDetails'] = summary['message']
+            history[summary['historyId']] = {'statistic': entry_statistic,
+                                             'items': ([item] + entry['items'])[:HISTORY_ITEMS]}
+        self.writer.write_json('history/history.json', history)
+
+        # update_allure_history.py writes an entry with buildOrder for this run; fill it with the real data
+        history_trend = self._read_history('history-trend.json', [])
+        current = max((e for e in history_trend if isinstance(e, dict) and 'buildOrder' in e),
+                      key=lambda e: e['buildOrder'], default=None)
+        build = {key: current[key] for key in ('buildOrder', 'reportName', 'reportUrl') if key in current} if current else {}
+        if current:
+            current['data'] = statistic
+        else:
+            history_trend.append({'data': statistic})
+
+        categories = {}
+        for (summary, case), _ in mains:
+            for category in case['categories']:
+                categories[category] = categories.get(category, 0) + 1
+        retries = sum(1 for (summary, case), _ in everything if case['retry'])
+        trends = {
+            'history-trend': history_trend,
+            'duration-trend': self._read_history('duration-trend.json', []) + [{**build, 'data': {'duration': launch_time['duration'] or 0}}],
+            'categories-trend': self._read_history('categories-trend.json', []) + [{**build, 'data': categories}],
+            'retry-trend': self._read_history('retry-trend.json', []) + [{**build, 'data': {'run': len(mains), 'retry': retries}}],
+        }
+        for name, trend in trends.items():
+            self.writer.write_json(f"history/{name}.json", trend)
+            self.writer.write_json(f"widgets/{name}.json", trend)
+
+    def _write_exports(self, mains, statistic, launch_time):
+        def date(ms):
+            return time.strftime("%a %b %d %H:%M:%S %Z %Y", time.localtime(ms / 1000)) if ms else ""
+
+        suite_rows, behaviors, categories = [], {}, {}
+        for (summary, case), _ in mains:
+            labels = summary['labels']
+            timing = summary['time']
+            suite_rows.append([summary['description'] or "", timing.get('duration', ""), summary['name'],
+                               first_label(labels, 'parentSuite', ""), date(timing.get('start')), summary['status'],
+                               date(timing.get('stop')), first_label(labels, 'subSuite', ""), first_label(labels, 'suite', ""),
+                               first_label(labels, 'testClass', ""), first_label(labels, 'testMethod', "")])
+            key = (first_label(labels, 'epic', ""), first_label(labels, 'feature', ""), first_label(labels, 'story', ""))
+            add_status(behaviors.setdefault(key, empty_statistic()), summary['status'])
+            for category in case['categories']:
+                add_status(categories.setdefault(category, empty_statistic()), summary['status'])
+
+        self.writer.write('data/suites.csv', self.csv_text(
+            ["DESCRIPTION", "DURATION IN MS", "NAME", "PARENT SUITE", "START TIME", "STATUS", "STOP TIME",
+             "SUB SUITE", "SUITE", "TEST CLASS", "TEST METHOD"], suite_rows))
+        self.writer.write('data/behaviors.csv', self.csv_text(
+            ["BROKEN", "EPIC", "FAILED", "FEATURE", "PASSED", "SKIPPED", "STORY", "UNKNOWN"],
+            [[s['broken'], epic, s['failed'], feature, s['passed'], s['skipped'], story, s['unknown']]
+             for (epic, feature, story), s in behaviors.items()]))
+        self.writer.write('data/categories.csv', self.csv_text(
+            ["BROKEN", "CATEGORY", "FAILED", "PASSED", "SKIPPED", "UNKNOWN"],
+            [[s['broken'], name, s['failed'], s['passed'], s['skipped'], s['unknown']] for name, s in categories.items()]))
+
+        timestamp = (launch_time['stop'] or 0) * 1000000
+        influx = [f"launch_status {status}={statistic[status]} {timestamp}" for status in STATUSES]
+        prometheus = [f"launch_status_{status} {statistic[status]}" for status in STATUSES]
+        for name in ('duration', 'minDuration', 'maxDuration', 'sumDuration'):
+            metric = "launch_time_" + "".join("_" + c.lower() if c.isupper() else c for c in name)
+            value = launch_time[name] if launch_time[name] is not None else 0
+            influx.append(f"launch_time {name.lower()}={value} {timestamp}")
+            prometheus.append(f"{metric} {value}")
+        self.writer.write('export/influxDbData.txt', "\n".join(influx) + "\n")
+        self.writer.write('export/prometheusData.txt', "\n".join(prometheus) + "\n")
+
+def aggregate_report(results_dir="allure-results", report_dir="allure-report", verbose=True):
+    """Update report_dir from results_dir incrementally; None when the report has no viewer yet"""
+    return AllureAggregator(results_dir, report_dir, verbose).aggregate()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Incrementally aggregate Allure results into an existing report')
+    parser.add_argument('--results-dir', default='allure-results', help='Allure results directory')
+    parser.add_argument('--report-dir', default='allure-report', help='Allure report directory (with the viewer)')
+    parser.add_argument('--verbose', action='store_true', help='Enable verbose output')
+    args = parser.parse_args()
+
+    summary = aggregate_report(args.results_dir, args.report_dir, verbose=True)
+    sys.exit(0 if summary is not None else 1)
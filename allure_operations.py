@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 """
 Allure Operations Handler - Complete Allure report generation and history management
+Report engines: 'cli' runs allure generate --clean, 'python' updates an existing report incrementally
+(allure_aggregate.py) and falls back to the CLI when the report has no viewer yet.
+The python engine pays off where allure-results, allure-report and .aggregate-cache.json stay between
+runs (local runs). CI starts every run with fresh results and no cache, so the workflow keeps the CLI.
 """
 
 import json
@@ -10,6 +14,12 @@ import subprocess
 import shutil
 import argparse
 from pathlib import Path
+from allure_aggregate import aggregate_report
+from process_runner import run_process
+
+# Seconds before a hung npm/allure command is stopped: in total and without any output
+COMMAND_TIMEOUT = 1800
+IDLE_TIMEOUT = 600
 
 def log_message(message, verbose=True):
     """Print message for GitHub Actions UI"""
@@ -17,36 +27,30 @@ def log_message(message, verbose=True):
         print(f"[ALLURE-OPS] {message}")
         sys.stdout.flush()
 
-def run_command(command, check=True, verbose=True):
-    """Run shell command with proper error handling"""
+def run_command(command, check=True, verbose=True, timeout=COMMAND_TIMEOUT, idle_timeout=IDLE_TIMEOUT):
+    """Run shell command with live output, timeouts and proper error handling"""
     log_message(f"Executing: {command}", verbose)
-    try:
-        result = subprocess.run(
-            command, 
-            shell=True, 
-            capture_output=True, 
-            text=True, 
-            check=check
-        )
-        if result.stdout:
-            log_message(f"Output: {result.stdout}", verbose)
-        if result.stderr:
-            log_message(f"Errors: {result.stderr}", verbose)
-        return result.returncode == 0
-    except subprocess.CalledProcessError as e:
-        log_message(f"Command failed: {e}", verbose)
-        if check:
-            raise
-        return False
+    result = run_process(command, name=command.split()[0], timeout=timeout, idle_timeout=idle_timeout,
+                         shell=True, echo=verbose)
+    log_message(f"{command.split()[0]} {result['status']} in {result['duration']:.1f}s", verbose)
+    if result['status'] == "passed":
+        return True
+    # Failures are always reported, with the last output lines
+    log_message(f"Command failed ({result['status']}, exit code {result['return_code']}): {command}", True)
+    for line in result['tail'][-50:]:
+        log_message(f"  {line}", True)
+    if check:
+        raise subprocess.CalledProcessError(result['return_code'], command, output="\n".join(result['tail']))
+    return False
 
 def install_allure_commandline(verbose=True):
     """Install Allure commandline tool"""
     log_message("Installing Allure commandline...", verbose)
     return run_command("npm install -g allure-commandline", verbose=verbose)
 
-def generate_allure_report(results_dir="allure-results", report_dir="allure-report", verbose=True):
+def generate_allure_report(results_dir="allure-results", report_dir="allure-report", verbose=True, engine="cli"):
     """Generate Allure report with proper error handling"""
-    log_message(f"Generating Allure report from {results_dir} to {report_dir}", verbose)
+    log_message(f"Generating Allure report from {results_dir} to {report_dir} ({engine} engine)", verbose)
     
     # Check if results directory exists and has files
     results_path = Path(results_dir)
@@ -54,11 +58,21 @@ def generate_allure_report(results_dir="allure-results", report_dir="allure-repo
         log_message(f"Warning: {results_dir} is empty or doesn't exist", verbose)
         return False
     
+    success = False
+    if engine == "python":
+        # Incremental update; None means there is no report viewer yet to update
+        summary = aggregate_report(results_dir, report_dir, verbose)
+        if summary is None:
+            log_message("No existing report to update, generating it with the allure CLI", verbose)
+        else:
+            success = True
+    
     # Generate report
-    success = run_command(
-        f"allure generate {results_dir} --clean -o {report_dir}",
-        verbose=verbose
-    )
+    if not success:
+        success = run_command(
+            f"allure generate {results_dir} --clean -o {report_dir}",
+            verbose=verbose
+        )
     
     if success:
         log_message(f"Allure report generated successfully in {report_dir}", verbose)
@@ -94,6 +108,7 @@ def main():
     parser.add_argument('--generate', action='store_true', help='Generate Allure report')
     parser.add_argument('--results-dir', default='allure-results', help='Allure results directory')
     parser.add_argument('--report-dir', default='allure-report', help='Allure report directory')
+    parser.add_argument('--engine', choices=['cli', 'python'], default='cli', help='Report engine: allure CLI or incremental Python aggregation')
     parser.add_argument('--verbose', action='store_true', help='Enable verbose output')
     
     args = parser.parse_args()
@@ -105,7 +120,7 @@ def main():
         success &= install_allure_commandline(verbose)
     
     if args.generate:
-        success &= generate_allure_report(args.results_dir, args.report_dir, verbose)
+        success &= generate_allure_report(args.results_dir, args.report_dir, verbose, args.engine)
         success &= handle_history_artifacts(args.report_dir, verbose=verbose)
     
     if success:
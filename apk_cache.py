@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+APK Cache - Provision devices from local split APKs instead of the Play Store UI
+1. Pulls the installed (split) APKs of a package from a provisioned device.
+2. Stores them under apk-cache/<package>/<versionCode>/.
+3. Installs them onto several devices at once with adb install-multiple.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from devices import list_devices
+from package_inventory import PackageInventory, adb_command
+
+CACHE_DIR = "apk-cache"
+
+def log_message(message, verbose=True):
+    """Print message for GitHub Actions UI"""
+    if verbose:
+        print(f"[APK-CACHE] {message}")
+        sys.stdout.flush()
+
+def device_apk_paths(package_name, serial=None):
+    """Return on-device paths of the base and split APKs of an installed package"""
+    result = subprocess.run(
+        adb_command(serial) + ["shell", "pm", "path", package_name],
+        capture_output=True, text=True
+    )
+    return [line.strip()[len("package:"):] for line in result.stdout.splitlines() if line.startswith("package:")]
+
+def cached_apks(package_name, cache_dir=CACHE_DIR, version_code=None):
+    """
+    Return (versionCode, [apk paths]) from the cache, or (None, []) on a cache miss.
+    - Without version_code the newest cached version is used.
+    """
+    package_dir = Path(cache_dir) / package_name
+    if not package_dir.exists():
+        return None, []
+    versions = sorted((int(p.name) for p in package_dir.iterdir() if p.is_dir() and p.name.isdigit()), reverse=True)
+    if version_code is not None:
+        versions = [v for v in versions if v == version_code]
+    for version in versions:
+        apks = sorted(str(p) for p in (package_dir / str(version)).glob("*.apk"))
+        if apks:
+            return version, apks
+    return None, []
+
+def pull_package(package_name, serial=None, cache_dir=CACHE_DIR, verbose=True):
+    """Copy an installed package's APKs from a device into the cache; returns the cache directory"""
+    inventory = PackageInventory(serial)
+    try:
+        version_code = inventory.version_code(package_name)
+    finally:
+        inventory.close()
+    if version_code is None:
+        raise RuntimeError(f"{package_name} is not installed (or versionCode unavailable) on {serial or 'device'}")
+
+    target = Path(cache_dir) / package_name / str(version_code)
+    if cached_apks(package_name, cache_dir, version_code)[1]:
+        log_message(f"{package_name} versionCode {version_code} already cached", verbose)
+        return target
+
+    # Pull into a temporary directory and rename, so an interrupted pull never looks like a cache hit
+    partial = target.with_name(f"{version_code}.partial")
+    shutil.rmtree(partial, ignore_errors=True)
+    partial.mkdir(parents=True)
+    start = time.monotonic()
+    for device_path in device_apk_paths(package_name, serial):
+        subprocess.run(adb_command(serial) + ["pull", device_path, str(partial / os.path.basename(device_path))],
+                       check=True, capture_output=True)
+    shutil.rmtree(target, ignore_errors=True)
+    partial.rename(target)
+    log_message(f"Cached {package_name} versionCode {version_code} in {time.monotonic() - start:.1f}s", verbose)
+    return target
+
+def install_from_cache(package_name, serials, cache_dir=CACHE_DIR, max_workers=4, verbose=True):
+    """
+    Install a cached package onto the given devices in parallel.
+    Returns {serial: True/False}; all False on a cache miss.
+    """
+    version_code, apks = cached_apks(package_name, cache_dir)
+    if not apks:
+        log_message(f"Cache miss for {package_name}", verbose)
+        return {serial: False for serial in serials}
+
+    def install(serial):
+        start = time.monotonic()
+        result = subprocess.run(
+            adb_command(serial) + ["install-multiple", "-r"] + apks,
+            capture_output=True, text=True
+        )
+        ok = result.returncode == 0 and "Success" in result.stdout
+        status = "installed" if ok else f"FAILED: {result.stdout.strip()} {result.stderr.strip()}"
+        log_message(f"{serial or 'device'}: {package_name} ({version_code}) {status} in {time.monotonic() - start:.1f}s", verbose)
+        return ok
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(serials, executor.map(install, serials)))
+
+def main():
+    """Main function to pull packages into the cache or install them from it"""
+    parser = argparse.ArgumentParser(description='Local APK cache for fast device provisioning')
+    parser.add_argument('--pull', nargs='+', metavar='PACKAGE', help='Pull packages from a provisioned device into the cache')
+    parser.add_argument('--install', nargs='+', metavar='PACKAGE', help='Install cached packages onto devices')
+    parser.add_argument('--source', help='Serial of the provisioned device for --pull')
+    parser.add_argument('--targets', nargs='*', help='Device serials for --install (default: all attached devices)')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='APK cache directory')
+    parser.add_argument('--max-workers', type=int, default=4, help='Devices installed at the same time')
+    parser.add_argument('--verbose', action='store_true', help='Enable verbose output')
+    args = parser.parse_args()
+
+    success = True
+    for package_name in args.pull or []:
+        try:
+            pull_package(package_name, args.source, args.cache_dir, args.verbose)
+        except (RuntimeError, subprocess.CalledProcessError) as e:
+            print(f"Failed to cache {package_name}: {e}")
+            success = False
+
+    if args.install:
+        targets = args.targets or list_devices()
+        for package_name in args.install:
+            results = install_from_cache(package_name, targets, args.cache_dir, args.max_workers, args.verbose)
+            success &= all(results.values())
+
+    sys.exit(0 if success else 1)
+
+if __name__ == '__main__':
+    main()
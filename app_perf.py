@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+App Performance - Startup and screen transition times of fi.sbweather.app
+1. Cold start: am force-stop + am start -W (TotalTime, WaitTime, LaunchState) and time until the KOTI tab is shown.
+2. Warm start: app sent to the background with HOME, then am start -W again.
+3. terminate_app/activate_app to KOTI, the way the suites restart the app, and every Top 10 view open and back.
+4. Repeated samples summarized with p50/p95 into a per-run JSON, appended to a history file and compared
+   with the earlier runs; the result is also written into allure-results so it shows up in the report.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sys
+import time
+import uuid
+from appium.webdriver.common.appiumby import AppiumBy
+from layout_cache import LayoutCache
+from package_inventory import AdbShell, PackageInventory
+from perf_stats import percentile, summarize
+from trend_builder import MIN_REGRESSION_MS, REGRESSION_THRESHOLD
+from wait_utils import wait_until
+
+APP_PACKAGE = "fi.sbweather.app"
+APP_ACTIVITY = "fi.sbweather.app.MainActivity"
+HOME_TAB = (AppiumBy.ACCESSIBILITY_ID, "KOTI\nTab 1 of 3")
+
+# Layout cache target -> title shown on the opened view
+VIEWS = {
+    'view_warmest': "Lämpimimmät",
+    'view_coldest': "Kylmimmät",
+    'view_rainiest': "Sateisimmat",
+    'view_windiest': "Tuulisimmat",
+}
+
+PERF_DIR = "app-perf"
+HISTORY_FILE = "app-perf-history.jsonl"
+BASELINE_RUNS = 10
+
+# Fine polling so time-to-screen is not rounded up to the default backoff interval
+POLL_INTERVAL = 0.05
+
+def log_message(message, verbose=True):
+    """Print message for GitHub Actions UI"""
+    if verbose:
+        print(f"[APP-PERF] {message}")
+        sys.stdout.flush()
+
+def parse_am_start(lines):
+    """TotalTime, WaitTime (ms) and LaunchState from am start -W output"""
+    result = {}
+    for line in lines:
+        name, _, value = line.partition(":")
+        name, value = name.strip(), value.strip()
+        if name in ("TotalTime", "WaitTime", "ThisTime") and value.isdigit():
+            result[name] = int(value)
+        elif name == "LaunchState":
+            result[name] = value
+    return result
+
+class AppPerfProbe:
+    """Takes startup and transition samples on one driver/device"""
+
+    def __init__(self, driver, serial=None, package=APP_PACKAGE, activity=APP_ACTIVITY, layout=None, verbose=True):
+        self.driver = driver
+        self.serial = serial
+        self.package = package
+        self.activity = activity
+        self.layout = layout or LayoutCache(verbose=verbose)
+        self.verbose = verbose
+        self.shell = AdbShell(serial)
+        self.samples = {}
+        self.launch_states = {}
+
+    def record(self, metric, milliseconds):
+        self.samples.setdefault(metric, []).append(round(milliseconds, 1))
+
+    def _visible(self, by, value, description, timeout=30):
+        """First matching element, or None when it is not shown within the timeout"""
+        return wait_until(lambda: (self.driver.find_elements(by, value) or [None])[0], timeout, description,
+                          poll_interval=POLL_INTERVAL, backoff=1.0)
+
+    def _wait_visible(self, by, value, description, timeout=30):
+        if self._visible(by, value, description, timeout) is None:
+            raise TimeoutError(f"{description} not shown within {timeout}s")
+
+    def _am_start(self, metric):
+        """am start -W and the time until KOTI is on screen, measured from the start command"""
+        start = time.monotonic()
+        code, lines = self.shell.run(f"am start -W -n {self.package}/{self.activity}")
+        launch = parse_am_start(lines)
+        if code != 0 or "TotalTime" not in launch:
+            raise RuntimeError(f"am start failed: {' '.join(lines)}")
+        self._wait_visible(*HOME_TAB, f"{metric} to KOTI")
+        self.record(f"{metric}_total_time", launch['TotalTime'])
+        if "WaitTime" in launch:
+            self.record(f"{metric}_wait_time", launch['WaitTime'])
+        self.record(f"{metric}_to_home", (time.monotonic() - start) * 1000)
+        self.launch_states.setdefault(metric, set()).add(launch.get('LaunchState', 'unknown'))
+
+    def cold_start(self):
+        self.shell.run(f"am force-stop {self.package}")
+        self._am_start("cold_start")
+
+    def warm_start(self):
+        """Process stays alive: HOME, then start the activity again"""
+        self.shell.run("input keyevent KEYCODE_HOME")
+        self._am_start("warm_start")
+
+    def activate(self):
+        """terminate_app/activate_app until KOTI, as the suites restart the app"""
+        self.driver.terminate_app(self.package)
+        start = time.monotonic()
+        self.driver.activate_app(self.package)
+        self._wait_visible(*HOME_TAB, "activate_app to KOTI")
+        self.record("activate_to_home", (time.monotonic() - start) * 1000)
+
+    def view_transitions(self):
+        """Open every Top 10 view from KOTI and go back"""
+        for target, title in VIEWS.items():
+            # The tile on KOTI also contains the title; only the opened view has it as its exact description
+            start = time.monotonic()
+            opened = self.layout.tap(self.driver, target,
+                                     lambda: self._visible(AppiumBy.ACCESSIBILITY_ID, title, f"view {title}") is not None)
+            if not opened:
+                raise RuntimeError(f"Tapping {target} did not open view {title}")
+            self.record(f"view_{title}", (time.monotonic() - start) * 1000)
+
+            start = time.monotonic()
+            self.driver.back()
+            self._wait_visible(*HOME_TAB, "back to KOTI")
+            self.record("back_to_home", (time.monotonic() - start) * 1000)
+
+    def run(self, samples=5, views=True):
+        for index in range(samples):
+            self.cold_start()
+            self.warm_start()
+            self.activate()
+            if views:
+                self.view_transitions()
+            log_message(f"Sample {index + 1}/{samples} done", self.verbose)
+        return self.samples
+
+    def report(self):
+        """Per-run metrics: p50/p95/p99 and raw samples of every metric, in milliseconds"""
+        inventory = PackageInventory(self.serial)
+        try:
+            version_code = inventory.version_code(self.package)
+        finally:
+            inventory.close()
+        size = self.driver.get_window_size()
+        return {
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'package': self.package,
+            'versionCode': version_code,
+            'device': self.serial or os.environ.get("ANDROID_SERIAL") or "default",
+            'screen': f"{size['width']}x{size['height']}",
+            'launchStates': {metric: sorted(states) for metric, states in self.launch_states.items()},
+            'metrics': {metric: dict(summarize(values), samples=values) for metric, values in self.samples.items()}
+        }
+
+    def close(self):
+        self.shell.close()
+
+def load_history(path, limit=BASELINE_RUNS):
+    """Latest runs from the history file (JSON lines), oldest first"""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    return runs[-limit:]
+
+def find_regressions(report, history, threshold=REGRESSION_THRESHOLD, min_regression_ms=MIN_REGRESSION_MS):
+    """Metrics whose p50 grew over the median p50 of earlier runs of the same device and screen"""
+    regressions = []
+    earlier = [run for run in history if run.get('device') == report['device'] and run.get('screen') == report['screen']]
+    for metric, stats in report['metrics'].items():
+        baseline = percentile([run['metrics'][metric]['p50'] for run in earlier if metric in run['metrics']], 50)
+        if baseline is None:
+            continue
+        if stats['p50'] > baseline * (1 + threshold) and stats['p50'] - baseline > min_regression_ms:
+            regressions.append({'metric': metric, 'p50': stats['p50'], 'baselineP50': baseline})
+    return regressions
+
+def format_report(report, regressions=()):
+    """Text table of all metrics"""
+    flagged = {regression['metric'] for regression in regressions}
+    lines = [f"{report['package']} versionCode {report['versionCode']} on {report['device']} ({report['screen']})",
+             f"{'Metric':<36} {'Count':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}"]
+    for metric, stats in report['metrics'].items():
+        lines.append(f"{metric[:36]:<36} {stats['count']:>6} {stats['p50']:>8.0f} {stats['p95']:>8.0f} "
+                     f"{stats['max']:>8.0f}{'  REGRESSION' if metric in flagged else ''}")
+    for metric, states in report['launchStates'].items():
+        lines.append(f"{metric} LaunchState: {', '.join(states)}")
+    return "\n".join(lines)
+
+def write_allure_result(report, regressions, results_dir="allure-results"):
+    """Add the run as an Allure test result with the metrics attached"""
+    os.makedirs(results_dir, exist_ok=True)
+    result_uuid = str(uuid.uuid4())
+    attachments = []
+    for name, content, mime, extension in (("App performance", format_report(report, regressions), "text/plain", "txt"),
+                                           ("App performance metrics", json.dumps(report, indent=2, ensure_ascii=False),
+                                            "application/json", "json")):
+        source = f"{uuid.uuid4()}-attachment.{extension}"
+        with open(os.path.join(results_dir, source), 'w', encoding='utf-8') as f:
+            f.write(content)
+        attachments.append({'name': name, 'source': source, 'type': mime})
+
+    full_name = "app_perf.App startup and transition performance"
+    now = int(time.time() * 1000)
+    result = {
+        'uuid': result_uuid,
+        'historyId': hashlib.md5(f"{full_name}:{report['device']}".encode('utf-8')).hexdigest(),
+        'name': "App startup and transition performance",
+        'fullName': full_name,
+        'status': "failed" if regressions else "passed",
+        'statusDetails': {'message': "; ".join(f"{r['metric']} p50 {r['p50']:.0f} ms vs {r['baselineP50']:.0f} ms"
+                                               for r in regressions)} if regressions else {},
+        'stage': "finished",
+        'start': now,
+        'stop': now,
+        'attachments': attachments,
+        'parameters': [{'name': 'device', 'value': report['device']}, {'name': 'versionCode', 'value': str(report['versionCode'])}],
+        'labels': [{'name': 'feature', 'value': "Performance"}, {'name': 'suite', 'value': "App performance"},
+                   {'name': 'host', 'value': socket.gethostname()}, {'name': 'framework', 'value': "app_perf"}]
+    }
+    with open(os.path.join(results_dir, f"{result_uuid}-result.json"), 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False)
+    return result_uuid
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure app startup and screen transition times')
+    parser.add_argument('--samples', type=int, default=5, help='Repetitions of the whole measurement')
+    parser.add_argument('--no-views', action='store_true', help='Skip the Top 10 view transitions')
+    parser.add_argument('--output-dir', default=PERF_DIR, help='Directory for the per-run JSON')
+    parser.add_argument('--history', default=HISTORY_FILE, help='History file (JSON lines) for regression checks')
+    parser.add_argument('--allure-results', default='allure-results', help='Allure results directory ("" to skip)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit 1 when a metric has regressed')
+    args = parser.parse_args()
+
+    from config import DEVICE_UDID, create_appium_driver
+    driver = create_appium_driver()
+    probe = AppPerfProbe(driver, DEVICE_UDID)
+    try:
+        probe.run(args.samples, views=not args.no_views)
+        report = probe.report()
+    finally:
+        probe.close()
+        driver.quit()
+
+    regressions = find_regressions(report, load_history(args.history))
+    os.makedirs(args.output_dir, exist_ok=True)
+    run_file = os.path.join(args.output_dir, f"app-perf-{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(run_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    with open(args.history, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(report, ensure_ascii=False) + "\n")
+    if args.allure_results:
+        write_allure_result(report, regressions, args.allure_results)
+
+    print(format_report(report, regressions))
+    log_message(f"Metrics written to {run_file} and {args.history}")
+    sys.exit(1 if regressions and args.fail_on_regression else 0)
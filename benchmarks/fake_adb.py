@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Fake adb - Command line stand-in for adb, backed by the fake Appium server
+1. Answers the adb invocations of the harness: devices, shell (one-shot and persistent),
+   exec-out sh (screencap), logcat, pull and install-multiple.
+2. Shell commands are executed by the fake device of the server (POST /fake/shell), so
+   adb and the WebDriver session see the same packages and screens.
+Select it with ADB="python benchmarks/fake_adb.py" and FAKE_APPIUM_URL=http://127.0.0.1:<port>.
+"""
+
+import json
+import os
+import shlex
+import struct
+import sys
+import time
+import urllib.request
+
+SERVER_URL = os.environ.get("FAKE_APPIUM_URL", "http://127.0.0.1:4723")
+SERIAL = "fake-device-1"
+FRAME_SIZE = (108, 240)
+
+def device_shell(command):
+    """Run a shell command line on the fake device; returns (exit code, output)"""
+    request = urllib.request.Request(
+        f"{SERVER_URL}/fake/shell",
+        data=json.dumps({"argv": shlex.split(command)}).encode("utf-8"),
+        headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        result = json.loads(response.read())
+    return result["exit_code"], result["output"]
+
+def write_line(text=""):
+    sys.stdout.write(text + "\n")
+    sys.stdout.flush()
+
+def interactive_shell():
+    """Persistent 'adb shell': one command line per stdin line, e.g. '<command>; echo <marker> $?'"""
+    for line in sys.stdin:
+        line = line.strip()
+        if line == "exit":
+            return 0
+        command, _, echo = line.partition("; echo ")
+        exit_code, output = device_shell(command)
+        if output:
+            write_line(output)
+        if echo:
+            write_line(echo.replace("$?", str(exit_code)))
+    return 0
+
+def exec_out_shell():
+    """Binary 'adb exec-out sh' answering 'screencap; echo <marker>' with raw RGBA frames"""
+    width, height = FRAME_SIZE
+    frame = struct.pack("<IIII", width, height, 1, 0) + b"\x30\x80\xc0\xff" * (width * height)
+    for line in sys.stdin.buffer:
+        line = line.strip()
+        if line == b"exit":
+            return 0
+        command, _, echo = line.partition(b"; echo ")
+        if command == b"screencap":
+            sys.stdout.buffer.write(frame)
+        if echo:
+            sys.stdout.buffer.write(echo + b"\n")
+        sys.stdout.buffer.flush()
+    return 0
+
+def logcat():
+    """Stream a PackageManager line whenever a package appears on the fake device"""
+    _, output = device_shell("pm list packages")
+    known = set(output.split())
+    while True:
+        _, output = device_shell("pm list packages")
+        current = set(output.split())
+        for package in sorted(current - known):
+            write_line(f"I/PackageManager( 1234): Package added: {package.split(':', 1)[1]}")
+        known = current
+        time.sleep(0.5)
+
+def main(argv):
+    while argv[:1] in (["-s"], ["-P"], ["-H"]):
+        argv = argv[2:]
+    if not argv:
+        write_line("fake adb: no command")
+        return 1
+    command, args = argv[0], argv[1:]
+
+    if command == "devices":
+        write_line("List of devices attached")
+        write_line(f"{SERIAL}\tdevice")
+        write_line()
+        return 0
+    if command == "shell" and not args:
+        return interactive_shell()
+    if command == "shell":
+        exit_code, output = device_shell(" ".join(shlex.quote(a) for a in args) if len(args) > 1 else args[0])
+        if output:
+            write_line(output)
+        return exit_code
+    if command == "exec-out" and args == ["sh"]:
+        return exec_out_shell()
+    if command == "logcat":
+        try:
+            return logcat()
+        except KeyboardInterrupt:
+            return 0
+    if command == "pull" and len(args) == 2:
+        with open(args[1], "wb") as f:
+            f.write(b"PK fake apk " + args[0].encode())
+        write_line(f"{args[0]}: 1 file pulled")
+        return 0
+    if command == "install-multiple":
+        write_line("Success")
+        return 0
+    if command == "reverse" or command == "wait-for-device":
+        return 0
+    write_line(f"fake adb: unsupported command {' '.join(argv)}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""
+Fake Appium Server - Local WebDriver stand-in for measuring harness overhead without a phone
+1. Speaks the W3C/Appium HTTP endpoints the suites use (sessions, find, click, tap, back,
+   source, screenshot, mobile: scripts).
+2. Plays scripted UI states of the Sebitti Sää screens and of the Play Store install flow.
+3. Adds configurable per-command latency and counts commands and bytes moved.
+Extra endpoints for the benchmark runner: GET /fake/stats, POST /fake/reset, POST /fake/shell.
+"""
+
+import argparse
+import base64
+import json
+import os
+import re
+import shlex
+import struct
+import sys
+import threading
+import time
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import quoteattr
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from locators import compile_xpath
+
+APP_PACKAGE = "fi.sbweather.app"
+PLAY_STORE_PACKAGE = "com.android.vending"
+WINDOW_SIZE = (1080, 2400)
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+HOME_TAB = "KOTI\nTab 1 of 3"
+RECORDS_TAB = "ENNÄTYKSET\nTab 2 of 3"
+VIEWS = ["Lämpimimmät", "Kylmimmät", "Sateisimmat", "Tuulisimmat"]
+STATIONS = ["Oulu Vihreäsaari", "Oulu lentoasema"]
+
+def element(cls, bounds, desc="", text="", action=None, focused=False):
+    """UI node of a scripted screen; action is the screen opened by clicking it"""
+    return {'class': cls, 'bounds': bounds, 'content-desc': desc, 'text': text, 'action': action, 'focused': focused}
+
+def tabs():
+    return [
+        element("android.view.View", (0, 2250, 360, 150), desc=HOME_TAB, action="home"),
+        element("android.view.View", (360, 2250, 360, 150), desc=RECORDS_TAB, action="records"),
+    ]
+
+def screen_elements(screen, search_text=""):
+    """Scripted UI nodes of each screen"""
+    if screen == "home":
+        tiles = [(100, 1050), (590, 1050), (100, 1380), (590, 1380)]
+        return ([element("android.widget.EditText", (100, 730, 600, 100), desc="Hae asemaa", action="search")]
+                + [element("android.view.View", (x, y, 400, 200), desc=f"{view}\nTop 10", action=f"view:{view}")
+                   for view, (x, y) in zip(VIEWS, tiles)]
+                + tabs())
+    if screen in ("search", "results", "weather"):
+        nodes = [element("android.widget.EditText", (100, 200, 880, 100), text=search_text, focused=True)]
+        if screen != "search":
+            nodes += [element("android.view.View", (0, 400 + 150 * i, 1080, 150), desc=name, action="weather")
+                      for i, name in enumerate(STATIONS)]
+        if screen == "weather":
+            nodes += [element("android.view.View", (0, 800, 1080, 200), desc="LÄMPÖTILA"),
+                      element("android.widget.ImageView", (0, 1000, 1080, 600))]
+        return nodes
+    if screen.startswith("view:"):
+        return [element("android.view.View", (0, 100, 1080, 150), desc=screen[5:]),
+                element("android.widget.ImageView", (0, 300, 1080, 1200))]
+    if screen == "records":
+        return [element("android.widget.ImageView", (0, 200, 1080, 1600))] + tabs()
+    if screen.startswith("play:"):
+        package = screen[5:]
+        return [element("android.widget.TextView", (50, 300, 980, 100), text=package),
+                element("android.widget.Button", (50, 500, 980, 120), text="Install", action=f"install:{package}")]
+    return [element("android.widget.FrameLayout", (0, 0) + WINDOW_SIZE)]
+
+def solid_png(width, height):
+    """Valid PNG of one color, used as the screenshot payload"""
+    row = b"\x00" + b"\x30\x80\xc0" * width
+    data = zlib.compress(row * height, 6)
+
+    def chunk(kind, payload):
+        return struct.pack(">I", len(payload)) + kind + payload + struct.pack(">I", zlib.crc32(kind + payload))
+
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", data) + chunk(b"IEND", b""))
+
+SCREENSHOT_BASE64 = base64.b64encode(solid_png(*WINDOW_SIZE)).decode()
+
+class FakeDevice:
+    """State of the simulated phone, shared by all sessions"""
+
+    def __init__(self, installed=None, install_delay=2.0):
+        self.lock = threading.RLock()
+        self.installed = dict(installed if installed is not None else {APP_PACKAGE: 100, "fi.reportronic.app": 200})
+        self.pending_installs = {}
+        self.install_delay = install_delay
+        self.running = set()
+        self.foreground = None
+        self.stack = ["launcher"]
+        self.search_text = ""
+        self.elements = {}
+
+    # --- packages -------------------------------------------------------
+    def packages(self):
+        with self.lock:
+            now = time.monotonic()
+            for package, ready_at in list(self.pending_installs.items()):
+                if now >= ready_at:
+                    self.installed[package] = 1
+                    del self.pending_installs[package]
+            return dict(self.installed)
+
+    # --- navigation -----------------------------------------------------
+    @property
+    def screen(self):
+        return self.stack[-1]
+
+    def launch(self, package):
+        with self.lock:
+            self.running.add(package)
+            self.foreground = package
+            if package == APP_PACKAGE:
+                self.stack = ["home"]
+                self.search_text = ""
+            elif package == PLAY_STORE_PACKAGE:
+                self.stack = ["play:home"]
+
+    def terminate(self, package):
+        with self.lock:
+            was_running = package in self.running
+            self.running.discard(package)
+            if self.foreground == package:
+                self.foreground = None
+                self.stack = ["launcher"]
+            return was_running
+
+    def open(self, target):
+        """Apply the action of a clicked or tapped node"""
+        with self.lock:
+            if target.startswith("install:"):
+                package = target[8:]
+                if package not in self.installed:
+                    self.pending_installs[package] = time.monotonic() + self.install_delay
+                return
+            if target == "weather" and self.screen == "weather":
+                return
+            if target in ("home", "records"):
+                self.stack = [target]
+            elif target == "weather" and self.screen == "results":
+                self.stack.append("weather")
+            else:
+                self.stack.append(target)
+
+    def back(self):
+        with self.lock:
+            if len(self.stack) > 1:
+                self.stack.pop()
+                if self.screen == "home":
+                    self.search_text = ""
+
+    def type_text(self, text):
+        with self.lock:
+            if self.screen in ("search", "results"):
+                self.search_text += text
+                self.stack[-1] = "results"
+
+    def app_state(self, package):
+        with self.lock:
+            if package == self.foreground:
+                return 4
+            if package in self.running:
+                return 3
+            return 1 if package in self.packages() else 0
+
+    # --- elements -------------------------------------------------------
+    def current_elements(self):
+        """Nodes of the current screen with ids that turn stale when the screen changes"""
+        with self.lock:
+            key = f"{self.screen}|{self.search_text}"
+            nodes = screen_elements(self.screen, self.search_text)
+            result = []
+            for index, node in enumerate(nodes):
+                element_id = f"{uuid.uuid5(uuid.NAMESPACE_OID, key)}-{index}"
+                self.elements[element_id] = (key, node)
+                result.append((element_id, node))
+            return result
+
+    def lookup(self, element_id):
+        """Return the node of an element id, None if the screen has changed since it was found"""
+        with self.lock:
+            key, node = self.elements.get(element_id, (None, None))
+            if key != f"{self.screen}|{self.search_text}":
+                return None
+            return node
+
+    def hit(self, x, y):
+        """Topmost node with an action at the tapped point"""
+        for _, node in reversed(self.current_elements()):
+            left, top, width, height = node['bounds']
+            if node['action'] and left <= x < left + width and top <= y < top + height:
+                return node
+        return None
+
+    def page_source(self):
+        nodes = []
+        for _, node in self.current_elements():
+            left, top, width, height = node['bounds']
+            nodes.append(
+                f"<{node['class']} class={quoteattr(node['class'])} text={quoteattr(node['text'])} "
+                f"content-desc={quoteattr(node['content-desc'], {chr(10): '&#10;'})} "
+                f"package=\"{self.foreground or ''}\" displayed=\"true\" enabled=\"true\" "
+                f"focused=\"{str(node['focused']).lower()}\" "
+                f"bounds=\"[{left},{top}][{left + width},{top + height}]\"/>"
+            )
+        return ('<?xml version="1.0" encoding="UTF-8"?><hierarchy rotation="0">'
+                f'<android.widget.FrameLayout class="android.widget.FrameLayout">{"".join(nodes)}'
+                '</android.widget.FrameLayout></hierarchy>')
+
+    # --- shell ----------------------------------------------------------
+    def shell(self, argv):
+        """Emulate the adb shell commands used by the harness; returns (exit code, output)"""
+        if not argv:
+            return 0, ""
+        command, args = argv[0], argv[1:]
+        if command == "pm" and args[:2] == ["list", "packages"]:
+            show_version = "--show-versioncode" in args
+            filters = [a for a in args[2:] if not a.startswith("-")]
+            lines = [f"package:{name}" + (f" versionCode:{code}" if show_version else "")
+                     for name, code in sorted(self.packages().items())
+                     if not filters or any(f in name for f in filters)]
+            return 0, "\n".join(lines)
+        if command == "pm" and args[:1] == ["path"] and len(args) > 1:
+            if args[1] not in self.packages():
+                return 1, ""
+            return 0, f"package:/data/app/{args[1]}/base.apk"
+        if command == "am" and args[:1] == ["start"]:
+            if "-d" in args and args[args.index("-d") + 1].startswith("market://details?id="):
+                self.launch(PLAY_STORE_PACKAGE)
+                with self.lock:
+                    self.stack = [f"play:{args[args.index('-d') + 1].split('=', 1)[1]}"]
+                return 0, "Starting: Intent { act=android.intent.action.VIEW }"
+            if "-n" in args:
+                package = args[args.index("-n") + 1].split("/")[0]
+                if "-S" in args:
+                    self.terminate(package)
+                self.launch(package)
+                wait_output = "\nStatus: ok\nLaunchState: COLD\nTotalTime: 420\nWaitTime: 430\nComplete" if "-W" in args else ""
+                return 0, f"Starting: Intent {{ cmp={args[args.index('-n') + 1]} }}{wait_output}"
+            return 1, "Error: unsupported am start"
+        if command == "am" and args[:1] == ["force-stop"] and len(args) > 1:
+            self.terminate(args[1])
+            return 0, ""
+        if command == "input" and args[:1] == ["text"]:
+            self.type_text(" ".join(args[1:]))
+            return 0, ""
+        if command == "input" and args[:1] == ["keyevent"]:
+            if args[1:] in (["4"], ["KEYCODE_BACK"]):
+                self.back()
+            elif args[1:] in (["3"], ["KEYCODE_HOME"]):
+                with self.lock:
+                    self.foreground = None
+                    self.stack = ["launcher"]
+            return 0, ""
+        if command == "dumpsys" and args[:1] == ["gfxinfo"]:
+            return 0, ("Total frames rendered: 120\nJanky frames: 6 (5.00%)\n50th percentile: 8ms\n"
+                       "90th percentile: 12ms\n95th percentile: 16ms\n99th percentile: 28ms")
+        if command == "dumpsys" and args[:1] == ["meminfo"]:
+            return 0, "        TOTAL PSS:    84512            TOTAL RSS:   150000"
+        if command in ("echo", "true", "getprop", "settings", "screencap"):
+            return 0, " ".join(args) if command == "echo" else ""
+        return 127, f"/system/bin/sh: {command}: not found"
+
+UISELECTOR_CALL = re.compile(r'\.(\w+)\((?:"((?:[^"\\]|\\.)*)"|(true|false))\)')
+
+def match_uiselector(expression, node):
+    """Evaluate a 'new UiSelector().method("arg")...' chain against a node"""
+    if not expression.strip().startswith("new UiSelector()"):
+        return False
+    fields = {'text': node['text'], 'description': node['content-desc'], 'className': node['class'], 'resourceId': ''}
+    for method, raw, flag in UISELECTOR_CALL.findall(expression):
+        if flag:
+            if method != "focused" or node['focused'] != (flag == "true"):
+                return False
+            continue
+        value = raw.replace('\\"', '"').replace('\\\\', '\\')
+        field = next((name for name in fields if method.startswith(name)), None)
+        if field is None:
+            return False
+        actual, operation = fields[field], method[len(field):]
+        if operation == "" and actual != value:
+            return False
+        if operation == "Contains" and value not in actual:
+            return False
+        if operation == "StartsWith" and not actual.startswith(value):
+            return False
+        if operation == "Matches" and not re.fullmatch(value, actual):
+            return False
+    return True
+
+def find_nodes(device, using, value):
+    """Element ids on the current screen matching a locator"""
+    if using == "xpath":
+        value, using = compile_xpath(value), "-android uiautomator"
+        if value is None:
+            return []
+    found = []
+    for element_id, node in device.current_elements():
+        if using == "accessibility id":
+            match = node['content-desc'] == value
+        elif using == "class name":
+            match = node['class'] == value
+        elif using == "-android uiautomator":
+            match = match_uiselector(value, node)
+        else:
+            match = False
+        if match:
+            found.append(element_id)
+    return found
+
+class FakeAppiumServer:
+    """Routes, latency injection and statistics of the fake server"""
+
+    def __init__(self, latency_ms=0.0, command_latency_ms=None, device=None):
+        self.latency_ms = latency_ms
+        self.command_latency_ms = command_latency_ms or {}
+        self.device = device or FakeDevice()
+        self.sessions = {}
+        self.stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.stats = {'commands': 0, 'bytes_in': 0, 'bytes_out': 0, 'by_command': {}}
+
+    def count(self, command, bytes_in, bytes_out):
+        with self.stats_lock:
+            self.stats['commands'] += 1
+            self.stats['bytes_in'] += bytes_in
+            self.stats['bytes_out'] += bytes_out
+            self.stats['by_command'][command] = self.stats['by_command'].get(command, 0) + 1
+
+    def delay(self, command):
+        latency = self.command_latency_ms.get(command, self.latency_ms)
+        if latency:
+            time.sleep(latency / 1000)
+
+    # --- W3C command handlers; return (status, value) -------------------
+    def handle(self, method, parts, body):
+        device = self.device
+        if parts == ["status"]:
+            return "status", 200, {"ready": True, "message": "Fake Appium server ready"}
+        if parts == ["session"] and method == "POST":
+            capabilities = body.get("capabilities", {}).get("alwaysMatch", {})
+            package = capabilities.get("appium:appPackage", APP_PACKAGE)
+            session_id = uuid.uuid4().hex
+            self.sessions[session_id] = capabilities
+            device.launch(package)
+            return "newSession", 200, {"sessionId": session_id, "capabilities": capabilities}
+        if len(parts) < 2 or parts[0] != "session" or parts[1] not in self.sessions:
+            return "unknown", 404, {"error": "invalid session id", "message": "No such session", "stacktrace": ""}
+
+        command_parts = parts[2:]
+        if not command_parts and method == "DELETE":
+            del self.sessions[parts[1]]
+            return "deleteSession", 200, None
+        if not command_parts:
+            return "getSession", 200, self.sessions[parts[1]]
+        head = command_parts[0]
+
+        if head == "timeouts":
+            return "timeouts", 200, None
+        if head in ("element", "elements") and len(command_parts) == 1:
+            found = find_nodes(device, body.get("using"), body.get("value"))
+            if head == "elements":
+                return "findElements", 200, [{ELEMENT_KEY: e, "ELEMENT": e} for e in found]
+            if not found:
+                return "findElement", 404, {"error": "no such element", "message": "not found", "stacktrace": ""}
+            return "findElement", 200, {ELEMENT_KEY: found[0], "ELEMENT": found[0]}
+        if head == "element" and len(command_parts) >= 3:
+            node = device.lookup(command_parts[1])
+            action = command_parts[2]
+            if node is None:
+                return f"element/{action}", 404, {"error": "stale element reference", "message": "stale", "stacktrace": ""}
+            left, top, width, height = node['bounds']
+            if action == "click":
+                if node['action']:
+                    device.open(node['action'])
+                return "click", 200, None
+            if action in ("displayed", "enabled"):
+                return action, 200, True
+            if action == "rect":
+                return "rect", 200, {"x": left, "y": top, "width": width, "height": height}
+            if action == "text":
+                return "text", 200, node['text']
+            if action == "attribute":
+                name = command_parts[3] if len(command_parts) > 3 else ""
+                return "attribute", 200, node.get(name, node['content-desc'] if name == "content-desc" else None)
+            return f"element/{action}", 200, None
+        if head == "source":
+            return "source", 200, device.page_source()
+        if head == "screenshot":
+            return "screenshot", 200, SCREENSHOT_BASE64
+        if head == "window" and command_parts[1:] in (["rect"], ["current", "size"]):
+            return "windowRect", 200, {"x": 0, "y": 0, "width": WINDOW_SIZE[0], "height": WINDOW_SIZE[1]}
+        if head == "back":
+            device.back()
+            return "back", 200, None
+        if head == "actions":
+            if method == "POST":
+                for source in body.get("actions", []):
+                    for step in source.get("actions", []):
+                        if step.get("type") == "pointerMove":
+                            node = device.hit(step.get("x", 0), step.get("y", 0))
+                            if node:
+                                device.open(node['action'])
+            return "actions", 200, None
+        if head == "execute":
+            script = body.get("script", "")
+            args = (body.get("args") or [{}])[0] if body.get("args") else {}
+            return self.mobile(script, args)
+        return "unknown", 404, {"error": "unknown command", "message": "/".join(parts), "stacktrace": ""}
+
+    def mobile(self, script, args):
+        """mobile: extension commands"""
+        device = self.device
+        package = args.get("appId") or args.get("bundleId")
+        if script == "mobile: shell":
+            argv = [args.get("command", "")] + [str(a) for a in args.get("args", [])]
+            exit_code, output = device.shell(argv)
+            return "mobile: shell", 200, output
+        if script == "mobile: terminateApp":
+            return script, 200, device.terminate(package)
+        if script == "mobile: activateApp":
+            device.launch(package)
+            return script, 200, None
+        if script == "mobile: queryAppState":
+            return script, 200, device.app_state(package)
+        if script == "mobile: getCurrentPackage":
+            return script, 200, device.foreground or "com.android.launcher"
+        return script, 200, None
+
+def make_handler(server_state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Header and body are written separately; without this every command waits for a delayed ACK
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status, payload):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return len(data)
+
+        def _dispatch(self, method):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            body = json.loads(raw) if raw else {}
+            parts = [part for part in self.path.split("?")[0].split("/") if part]
+
+            if parts[:1] == ["fake"]:
+                return self._fake(method, parts[1:], body)
+
+            command, status, value = server_state.handle(method, parts, body)
+            server_state.delay(command)
+            sent = self._reply(status, {"value": value})
+            if command != "status":
+                server_state.count(command, len(raw), sent)
+
+        def _fake(self, method, parts, body):
+            """Control endpoints for the benchmark runner and the fake adb"""
+            if parts == ["stats"]:
+                with server_state.stats_lock:
+                    return self._reply(200, server_state.stats)
+            if parts == ["reset"] and method == "POST":
+                server_state.device = FakeDevice(body.get("installed"), body.get("install_delay", 2.0))
+                server_state.sessions.clear()
+                server_state.reset_stats()
+                return self._reply(200, {"ok": True})
+            if parts == ["shell"] and method == "POST":
+                argv = body.get("argv") or shlex.split(body.get("command", ""))
+                exit_code, output = server_state.device.shell(argv)
+                return self._reply(200, {"exit_code": exit_code, "output": output})
+            return self._reply(404, {"error": "unknown fake endpoint"})
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_DELETE(self):
+            self._dispatch("DELETE")
+
+    return Handler
+
+def start_server(port=0, latency_ms=0.0, command_latency_ms=None):
+    """Start the fake server in a background thread; returns (http server, state, url)"""
+    state = FakeAppiumServer(latency_ms, command_latency_ms)
+    httpd = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd, state, f"http://127.0.0.1:{httpd.server_address[1]}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Appium/WebDriver server with scripted Sebitti Sää screens")
+    parser.add_argument("--port", type=int, default=4723, help="Port to listen on")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency for every command")
+    parser.add_argument("--command-latency", type=str, help='Per-command latency JSON, e.g. {"screenshot": 300}')
+    args = parser.parse_args()
+
+    httpd, _, url = start_server(args.port, args.latency_ms, json.loads(args.command_latency) if args.command_latency else None)
+    print(f"Fake Appium server listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        httpd.shutdown()
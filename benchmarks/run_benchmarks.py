@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Harness Benchmarks - Run the suites end to end against the fake Appium server
+1. Starts the fake Appium/WebDriver server and points the suites and adb at it (no phone needed).
+2. Runs Test_features_automation.py, the pytest/Allure suite and the installer in a clean directory.
+3. Records wall time, WebDriver command count and bytes moved per scenario.
+4. Compares against benchmarks/baseline.json; exits 1 on failures or regressions.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+from fake_appium_server import APP_PACKAGE, FakeDevice, start_server
+
+# Name -> command and the packages installed on the fake device when the scenario starts
+SCENARIOS = {
+    'features_script': {
+        'command': [sys.executable, "-u", os.path.join(REPO_DIR, "Test_features_automation.py")],
+        'installed': {APP_PACKAGE: 100, "fi.reportronic.app": 200}
+    },
+    'features_pytest_allure': {
+        'command': [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "--rootdir", REPO_DIR,
+                    os.path.join(REPO_DIR, "Test_features_automation_allure.py"), "--alluredir", "allure-results"],
+        'installed': {APP_PACKAGE: 100, "fi.reportronic.app": 200}
+    },
+    'installer_sequential': {
+        'command': [sys.executable, "-u", os.path.join(REPO_DIR, "Any_App_Installation_From_GP_automation.py")],
+        'installed': {APP_PACKAGE: 100}
+    },
+    'installer_concurrent': {
+        'command': [sys.executable, "-u", os.path.join(REPO_DIR, "Any_App_Installation_From_GP_automation.py"), "--concurrent"],
+        'installed': {APP_PACKAGE: 100}
+    },
+}
+
+# Allowed growth over the baseline before a metric counts as a regression
+WALL_TOLERANCE = 0.25
+WALL_SLACK_SECONDS = 0.5
+COUNT_TOLERANCE = 0.10
+
+def log_message(message, verbose=True):
+    """Print message for GitHub Actions UI"""
+    if verbose:
+        print(f"[BENCHMARK] {message}")
+        sys.stdout.flush()
+
+def run_scenario(name, scenario, state, server_url, install_delay, timeout, verbose):
+    """Run one scenario in a fresh directory against a freshly reset fake device"""
+    state.device = FakeDevice(scenario['installed'], install_delay)
+    state.sessions.clear()
+    state.reset_stats()
+
+    env = dict(os.environ)
+    env.update({
+        'APPIUM_SERVER_URL': server_url,
+        'FAKE_APPIUM_URL': server_url,
+        'ADB': f'"{sys.executable}" "{os.path.join(BENCHMARK_DIR, "fake_adb.py")}"',
+        'PYTHONPATH': REPO_DIR + os.pathsep + env.get('PYTHONPATH', ''),
+        'PYTHONIOENCODING': 'utf-8',
+    })
+    env.pop('ANDROID_SERIAL', None)
+
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as workdir:
+        start = time.monotonic()
+        try:
+            result = subprocess.run(scenario['command'], cwd=workdir, env=env, timeout=timeout,
+                                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace")
+            return_code, output = result.returncode, result.stdout
+        except subprocess.TimeoutExpired as e:
+            return_code, output = -1, f"Timed out after {timeout}s\n{e.stdout or ''}"
+        wall = time.monotonic() - start
+
+    with state.stats_lock:
+        stats = dict(state.stats)
+    if return_code != 0:
+        log_message(f"{name} failed with exit code {return_code}, last output:\n" + "\n".join(output.splitlines()[-20:]), verbose)
+    return {
+        'wall_seconds': round(wall, 3),
+        'commands': stats['commands'],
+        'bytes_in': stats['bytes_in'],
+        'bytes_out': stats['bytes_out'],
+        'by_command': stats['by_command'],
+        'return_code': return_code
+    }
+
+def run_benchmarks(names, repeat=1, latency_ms=0.0, command_latency_ms=None, install_delay=1.0, timeout=600, verbose=True):
+    """Run the scenarios; wall time is the median of the repeats, counts are from the last run"""
+    httpd, state, server_url = start_server(0, latency_ms, command_latency_ms)
+    log_message(f"Fake Appium server on {server_url} (latency {latency_ms} ms/command)", verbose)
+    results = {}
+    try:
+        for name in names:
+            runs = [run_scenario(name, SCENARIOS[name], state, server_url, install_delay, timeout, verbose)
+                    for _ in range(repeat)]
+            result = runs[-1]
+            result['wall_seconds'] = round(statistics.median(run['wall_seconds'] for run in runs), 3)
+            result['return_code'] = next((run['return_code'] for run in runs if run['return_code'] != 0), 0)
+            results[name] = result
+            log_message(f"{name}: {result['wall_seconds']}s, {result['commands']} commands, "
+                        f"{result['bytes_in'] + result['bytes_out']} bytes, exit code {result['return_code']}", verbose)
+    finally:
+        httpd.shutdown()
+    return results
+
+def compare(results, baseline):
+    """Return a list of regression messages of the results against the baseline"""
+    regressions = []
+    for name, result in results.items():
+        if result['return_code'] != 0:
+            regressions.append(f"{name}: failed with exit code {result['return_code']}")
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        wall_limit = reference['wall_seconds'] * (1 + WALL_TOLERANCE) + WALL_SLACK_SECONDS
+        if result['wall_seconds'] > wall_limit:
+            regressions.append(f"{name}: wall time {result['wall_seconds']}s > {wall_limit:.2f}s "
+                               f"(baseline {reference['wall_seconds']}s)")
+        for metric in ('commands', 'bytes_in', 'bytes_out'):
+            limit = reference[metric] * (1 + COUNT_TOLERANCE)
+            if result[metric] > limit:
+                regressions.append(f"{name}: {metric} {result[metric]} > {limit:.0f} (baseline {reference[metric]})")
+    return regressions
+
+def print_report(results, baseline):
+    print(f"\n{'=' * 80}\nHARNESS BENCHMARKS\n{'=' * 80}")
+    print(f"{'Scenario':<26}{'Wall s':>9}{'Base s':>9}{'Commands':>10}{'Base':>7}{'KB moved':>10}{'Base KB':>9}")
+    for name, result in results.items():
+        reference = baseline.get(name, {})
+        moved = (result['bytes_in'] + result['bytes_out']) / 1024
+        base_moved = (reference['bytes_in'] + reference['bytes_out']) / 1024 if reference else None
+        print(f"{name:<26}{result['wall_seconds']:>9.2f}{reference.get('wall_seconds', float('nan')):>9.2f}"
+              f"{result['commands']:>10}{reference.get('commands', '-'):>7}{moved:>10.1f}"
+              f"{base_moved if base_moved is not None else float('nan'):>9.1f}")
+    print("=" * 80)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the test harness against a fake Appium server')
+    parser.add_argument('scenarios', nargs='*', help=f"Scenarios to run (default all): {', '.join(SCENARIOS)}")
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per scenario, wall time is the median')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Simulated device latency per command')
+    parser.add_argument('--command-latency', type=str, help='Per-command latency JSON, e.g. {"screenshot": 300}')
+    parser.add_argument('--install-delay', type=float, default=1.0, help='Seconds the fake Play Store install takes')
+    parser.add_argument('--baseline', type=str, default=BASELINE_FILE, help='Baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--output', type=str, help='Write the results as JSON')
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    results = run_benchmarks(args.scenarios or list(SCENARIOS), args.repeat, args.latency_ms,
+                             json.loads(args.command_latency) if args.command_latency else None, args.install_delay)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        baseline.update({name: {key: value for key, value in result.items() if key not in ('by_command', 'return_code')}
+                         for name, result in results.items() if result['return_code'] == 0})
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        log_message(f"Baseline updated: {args.baseline}")
+
+    regressions = compare(results, {} if args.update_baseline else baseline)
+    for message in regressions:
+        log_message(f"REGRESSION {message}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Command Metrics - Time every WebDriver command sent to Appium
+1. Wraps driver.execute of a webdriver.Remote instance; every command goes through it.
+2. Groups durations by command type and by test step.
+3. Reports counts, totals and p50/p95/p99 per command, per step and for the whole run.
+Overhead is two perf_counter calls and a list append per command, so it can stay on in CI.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from perf_stats import summarize
+
+class CommandRecorder:
+    """Collects command durations, keyed by (step, command)"""
+
+    def __init__(self):
+        self.durations = {}
+        self.current_step = "run"
+        self._lock = threading.Lock()
+
+    def record(self, command, seconds, step=None):
+        key = (step or self.current_step, command)
+        with self._lock:
+            self.durations.setdefault(key, []).append(seconds)
+
+    @contextmanager
+    def step(self, name):
+        """Attribute all commands inside the block to the named step"""
+        previous, self.current_step = self.current_step, name
+        try:
+            yield
+        finally:
+            self.current_step = previous
+
+    def by_command(self, step=None):
+        """{command: [durations]} for one step or the whole run"""
+        grouped = {}
+        with self._lock:
+            for (entry_step, command), durations in self.durations.items():
+                if step is None or entry_step == step:
+                    grouped.setdefault(command, []).extend(durations)
+        return grouped
+
+    def by_step(self):
+        """{step: [durations]} of all commands"""
+        grouped = {}
+        with self._lock:
+            for (step, _), durations in self.durations.items():
+                grouped.setdefault(step, []).extend(durations)
+        return grouped
+
+    def report(self, step=None, title=None):
+        """Text table of command latencies, slowest total first"""
+        rows = [(name, summarize(durations)) for name, durations in self.by_command(step).items()]
+        rows.sort(key=lambda row: row[1]['total'], reverse=True)
+        lines = [title or f"WebDriver commands{f' in {step}' if step else ''}",
+                 f"{'Command':<45} {'Count':>6} {'Total s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"]
+        for name, stats in rows:
+            lines.append(f"{name[:45]:<45} {stats['count']:>6} {stats['total']:>8.2f} "
+                         f"{stats['p50'] * 1000:>8.0f} {stats['p95'] * 1000:>8.0f} {stats['p99'] * 1000:>8.0f}")
+        total = sum(stats['total'] for _, stats in rows)
+        count = sum(stats['count'] for _, stats in rows)
+        lines.append(f"Total: {count} commands, {total:.2f}s")
+        return "\n".join(lines)
+
+    def step_report(self):
+        """Text table of time spent in commands per step"""
+        lines = [f"{'Step':<45} {'Commands':>8} {'Total s':>8}"]
+        for step, durations in self.by_step().items():
+            lines.append(f"{step[:45]:<45} {len(durations):>8} {sum(durations):>8.2f}")
+        return "\n".join(lines)
+
+    def print_summary(self):
+        """Print the run summary for the CI log"""
+        print("\n" + "="*70)
+        print("APPIUM COMMAND LATENCY")
+        print("="*70)
+        print(self.report(title="All steps"))
+        print()
+        print(self.step_report())
+        print("="*70)
+
+# Shared recorder for the whole process
+RECORDER = CommandRecorder()
+
+def command_name(driver_command, params):
+    """Command name with the detail that matters: script name for execute, strategy for find"""
+    if params:
+        if "script" in params and driver_command.lower().endswith("executescript"):
+            return f"{driver_command}[{params['script']}]"
+        if "using" in params and driver_command.startswith("find"):
+            return f"{driver_command}[{params['using']}]"
+    return driver_command
+
+def instrument_driver(driver, recorder=RECORDER):
+    """Time every command of this driver instance"""
+    original_execute = driver.execute
+
+    def execute(driver_command, params=None):
+        start = time.perf_counter()
+        try:
+            return original_execute(driver_command, params)
+        finally:
+            recorder.record(command_name(driver_command, params), time.perf_counter() - start)
+
+    driver.execute = execute
+    return driver
@@ -1,15 +1,39 @@
 # config.py
+import os
+import time
 from appium import webdriver
 from appium.options.android import UiAutomator2Options
+from command_metrics import RECORDER, instrument_driver
 
-def create_appium_driver():
+# Device and server can be overridden per run, e.g. by run_parallel_devices.py
+# ANDROID_SERIAL is also honoured by adb itself, so adb calls follow the same device
+APPIUM_SERVER_URL = os.environ.get("APPIUM_SERVER_URL", "http://127.0.0.1:4723")
+DEVICE_UDID = os.environ.get("ANDROID_SERIAL")
+SYSTEM_PORT = os.environ.get("APPIUM_SYSTEM_PORT")
+# Time every WebDriver command (see command_metrics.py); APPIUM_METRICS=0 turns it off
+COMMAND_METRICS = os.environ.get("APPIUM_METRICS", "1") != "0"
+# Seconds to wait for weather data (LÄMPÖTILA) after opening a station; with the replay proxy
+# (weather_replay_proxy.py) responses come from disk and a few seconds is enough
+WEATHER_DATA_TIMEOUT = float(os.environ.get("WEATHER_DATA_TIMEOUT", "20"))
+
+def create_appium_driver(app_package="fi.sbweather.app", app_activity="fi.sbweather.app.MainActivity"):
     options = UiAutomator2Options()
     options.platform_name = "Android"
-    options.device_name = "Android_test_device"  
-    options.app_package = "fi.sbweather.app"
-    options.app_activity = "fi.sbweather.app.MainActivity"
+    options.device_name = DEVICE_UDID or "Android_test_device"
+    if DEVICE_UDID:
+        options.udid = DEVICE_UDID
+    if SYSTEM_PORT:
+        options.system_port = int(SYSTEM_PORT)
+    options.app_package = app_package
+    options.app_activity = app_activity
     options.automation_name = "UiAutomator2"
     options.no_reset = True
     options.full_reset = False
     
-    return webdriver.Remote("http://127.0.0.1:4723", options=options)
\ No newline at end of file
+    # Session creation is timed here, all later commands by the instrumented driver
+    start = time.perf_counter()
+    driver = webdriver.Remote(APPIUM_SERVER_URL, options=options)
+    if COMMAND_METRICS:
+        RECORDER.record("newSession", time.perf_counter() - start)
+        instrument_driver(driver)
+    return driver
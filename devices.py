@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Device Helpers - Discover attached Android devices and give each its own ports
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import time
+import urllib.request
+import urllib.error
+from package_inventory import adb_command
+from process_runner import stop_process_tree
+
+BASE_APPIUM_PORT = 4723
+BASE_SYSTEM_PORT = 8200
+
+def list_devices():
+    """Return serials of attached devices that are ready (state 'device') according to adb devices"""
+    result = subprocess.run(adb_command() + ["devices"], capture_output=True, text=True)
+    serials = []
+    for line in result.stdout.splitlines()[1:]:
+        parts = line.split()
+        if len(parts) >= 2 and parts[1] == "device":
+            serials.append(parts[0])
+    return serials
+
+def assign_ports(serials, base_appium_port=BASE_APPIUM_PORT, base_system_port=BASE_SYSTEM_PORT):
+    """Give every device its own Appium server port and UiAutomator2 systemPort"""
+    return [
+        {
+            'serial': serial,
+            'appium_port': base_appium_port + index,
+            'system_port': base_system_port + index,
+            'server_url': f"http://127.0.0.1:{base_appium_port + index}"
+        }
+        for index, serial in enumerate(serials)
+    ]
+
+def device_env(device, base_env):
+    """Environment for a child process bound to one device (read by config.py and adb)"""
+    env = dict(base_env)
+    env["ANDROID_SERIAL"] = device['serial']
+    env["APPIUM_SERVER_URL"] = device['server_url']
+    env["APPIUM_SYSTEM_PORT"] = str(device['system_port'])
+    return env
+
+def is_appium_ready(server_url):
+    """Check Appium /status endpoint"""
+    try:
+        with urllib.request.urlopen(f"{server_url}/status", timeout=2) as response:
+            return response.status == 200
+    except (urllib.error.URLError, OSError):
+        return False
+
+def start_appium_server(port, appium_command="appium", log_file=None, timeout=60):
+    """Start an Appium server on the given port and wait until /status answers"""
+    command = appium_command.split() + ["-p", str(port), "--allow-insecure", "*:adb_shell"]
+    # which() finds Windows .cmd shims such as appium.cmd without a shell
+    command[0] = shutil.which(command[0]) or command[0]
+    stdout = open(log_file, "w", encoding="utf-8") if log_file else subprocess.DEVNULL
+    # Own process group so that stop_process_tree also stops the node process started by the shim
+    process = subprocess.Popen(command, stdout=stdout, stderr=subprocess.STDOUT,
+                               start_new_session=(os.name != "nt"))
+    if log_file:
+        stdout.close()
+
+    server_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if is_appium_ready(server_url):
+            return process
+        if process.poll() is not None:
+            break
+        time.sleep(0.5)
+    stop_process_tree(process)
+    raise RuntimeError(f"Appium server did not start on port {port} within {timeout}s")
+
+if __name__ == "__main__":
+    for device in assign_ports(list_devices()):
+        print(f"{device['serial']}: appium port {device['appium_port']}, systemPort {device['system_port']}")
+    sys.exit(0)
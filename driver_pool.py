@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Driver Pool - Reuse Appium sessions across tests instead of creating one per test
+1. Keeps idle webdriver.Remote sessions and hands them out on checkout.
+2. Health-checks every session on checkout and replaces dead ones.
+3. Resets the app to its home screen with an activity restart instead of a new session.
+"""
+
+import os
+import sys
+import time
+import threading
+from selenium.common.exceptions import WebDriverException
+from appium.webdriver.common.appiumby import AppiumBy
+from config import create_appium_driver
+from wait_utils import wait_until, wait_for_app_state, APP_NOT_RUNNING
+
+APP_PACKAGE = "fi.sbweather.app"
+APP_ACTIVITY = "fi.sbweather.app.MainActivity"
+HOME_LOCATOR = (AppiumBy.ACCESSIBILITY_ID, "KOTI\nTab 1 of 3")
+# KOTI is also shown on the records tab; a Top 10 tile is only on the home screen itself
+HOME_TILE_LOCATOR = (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().descriptionContains("Lämpimimmät")')
+
+def log_message(message, verbose=True):
+    """Print message for GitHub Actions UI"""
+    if verbose:
+        print(f"[DRIVER-POOL] {message}")
+        sys.stdout.flush()
+
+class DriverPool:
+    """Thread-safe pool of Appium sessions shared by the tests of one run"""
+
+    def __init__(self, factory=create_appium_driver, max_size=None, verbose=True):
+        self.factory = factory
+        self.max_size = max_size or int(os.environ.get("DRIVER_POOL_SIZE", "1"))
+        self.verbose = verbose
+        self._idle = []
+        self._all = []
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def _create(self):
+        """Open a new Appium session and log how long it took"""
+        start = time.monotonic()
+        driver = self.factory()
+        log_message(f"Created session {driver.session_id} in {time.monotonic() - start:.2f}s", self.verbose)
+        return driver
+
+    def _discard(self, driver):
+        """Quit a session and forget it"""
+        if driver in self._all:
+            self._all.remove(driver)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    def is_healthy(self, driver):
+        """Cheap liveness check: a dead session fails any command"""
+        try:
+            driver.current_package
+            return True
+        except WebDriverException as e:
+            log_message(f"Session {driver.session_id} failed health check: {e.msg}", self.verbose)
+            return False
+
+    def checkout(self, timeout=300):
+        """Get a healthy session from the pool, creating one if the pool is not full"""
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+                while self._idle:
+                    driver = self._idle.pop()
+                    if self.is_healthy(driver):
+                        return driver
+                    self._discard(driver)
+                if len(self._all) < self.max_size:
+                    # Reserve the slot before releasing the lock for the slow session creation
+                    self._all.append(None)
+                    break
+                if not self._condition.wait(timeout):
+                    raise TimeoutError(f"No Appium session available within {timeout}s")
+
+        try:
+            driver = self._create()
+        except Exception:
+            # Free the reserved slot and let a waiting test try again
+            with self._condition:
+                self._all.remove(None)
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._all.remove(None)
+            # close_all waits for reserved slots, wake it up
+            self._condition.notify_all()
+            if not self._closed:
+                self._all.append(driver)
+                return driver
+        # The pool was closed while the session was being created
+        self._discard(driver)
+        raise RuntimeError("Driver pool closed while the session was being created")
+
+    def release(self, driver):
+        """Return a session to the pool for the next test"""
+        with self._condition:
+            self._idle.append(driver)
+            self._condition.notify()
+
+    @staticmethod
+    def _home_screen_ready(driver):
+        """Home screen of the app: KOTI tab and a Top 10 tile (the tile view itself has no tabs)"""
+        return bool(driver.find_elements(*HOME_LOCATOR)) and bool(driver.find_elements(*HOME_TILE_LOCATOR))
+
+    def reset_app(self, driver, timeout=15):
+        """
+        Bring the app back to its home screen.
+        - Fast path: restart the main activity with a cleared task in the running session.
+        - Fallback: terminate and activate the app if the home screen does not appear.
+        """
+        start = time.monotonic()
+        try:
+            # -W returns only after the restarted activity has been launched, so the wait below
+            # cannot be satisfied by the hierarchy of the screen that was open before
+            driver.execute_script('mobile: shell', {
+                'command': 'am',
+                'args': ['start', '-W', '-n', f'{APP_PACKAGE}/{APP_ACTIVITY}', '--activity-clear-task'],
+                'includeStderr': True,
+                'timeout': timeout * 1000
+            })
+            if wait_until(lambda: self._home_screen_ready(driver), timeout, "activity restart to home screen"):
+                log_message(f"App reset by activity restart in {time.monotonic() - start:.2f}s", self.verbose)
+                return True
+        except WebDriverException as e:
+            log_message(f"Activity restart failed, falling back to app restart: {e.msg}", self.verbose)
+
+        driver.terminate_app(APP_PACKAGE)
+        wait_for_app_state(driver, APP_PACKAGE, APP_NOT_RUNNING, 5)
+        driver.activate_app(APP_PACKAGE)
+        ready = bool(wait_until(lambda: self._home_screen_ready(driver), timeout, "app restart to home screen"))
+        log_message(f"App reset by terminate/activate in {time.monotonic() - start:.2f}s", self.verbose)
+        return ready
+
+    def close_all(self, timeout=60):
+        """Quit every session of the pool, waiting for sessions that are still being created"""
+        with self._condition:
+            self._closed = True
+            deadline = time.monotonic() + timeout
+            # None is a slot reserved by checkout while its session is created
+            while None in self._all:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    break
+            for driver in list(self._all):
+                if driver is not None:
+                    self._discard(driver)
+            self._idle.clear()
+        log_message("All pooled sessions closed", self.verbose)
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Allure History Store - Persistent run history in SQLite instead of a rewritten 10-entry JSON file
+1. Records every run's buildOrder, status totals and per-test results from allure-results.
+2. Keeps a configurable number of runs (retention) and prunes older ones.
+3. Generates the Allure history files (history-trend.json, history.json) on demand.
+4. Answers per-test queries like "last 500 runs of test X" from an index.
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+DEFAULT_DB = "allure-history.db"
+DEFAULT_RETENTION = 1000
+STATUSES = ('failed', 'broken', 'skipped', 'passed', 'unknown')
+
+# Allure's built-in categories, used when no custom category matches
+DEFAULT_CATEGORIES = [
+    {'name': 'Product defects', 'matchedStatuses': ['failed']},
+    {'name': 'Test defects', 'matchedStatuses': ['broken']},
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    build_order INTEGER PRIMARY KEY,
+    report_name TEXT,
+    report_url TEXT,
+    start INTEGER,
+    stop INTEGER,
+    failed INTEGER NOT NULL DEFAULT 0,
+    broken INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    passed INTEGER NOT NULL DEFAULT 0,
+    unknown INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS test_results (
+    history_id TEXT NOT NULL,
+    build_order INTEGER NOT NULL,
+    uid TEXT,
+    name TEXT,
+    full_name TEXT,
+    status TEXT,
+    status_message TEXT,
+    start INTEGER,
+    stop INTEGER,
+    duration INTEGER,
+    PRIMARY KEY (history_id, build_order)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS run_categories (
+    build_order INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (build_order, category)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS test_results_by_run ON test_results (build_order);
+CREATE INDEX IF NOT EXISTS test_results_by_name ON test_results (name);
+"""
+
+def log_message(message, verbose=True):
+    """Print message for GitHub Actions UI"""
+    if verbose:
+        print(f"[HISTORY-STORE] {message}")
+        sys.stdout.flush()
+
+def read_results(results_dir):
+    """Yield the parsed *-result.json files of an allure-results directory, one at a time"""
+    for path in sorted(Path(results_dir).glob('*-result.json')):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            log_message(f"Skipping unreadable result {path.name}: {e}")
+            continue
+        if isinstance(result, dict) and result.get('historyId'):
+            yield result
+
+def load_categories(results_dir):
+    """Custom categories from categories.json of the results directory"""
+    path = Path(results_dir) / 'categories.json'
+    if not path.exists():
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        log_message(f"Ignoring unreadable {path}: {e}")
+        return []
+
+def match_categories(result, categories):
+    """Names of the categories a result belongs to, the Allure way: custom matches, else the default"""
+    status = result.get('status')
+    details = result.get('statusDetails') or {}
+    matched = []
+    for category in categories:
+        if status not in category.get('matchedStatuses', ['failed', 'broken']):
+            continue
+        if category.get('messageRegex') and not re.fullmatch(category['messageRegex'], details.get('message') or '', re.DOTALL):
+            continue
+        if category.get('traceRegex') and not re.fullmatch(category['traceRegex'], details.get('trace') or '', re.DOTALL):
+            continue
+        matched.append(category['name'])
+    if matched:
+        return matched
+    return [category['name'] for category in DEFAULT_CATEGORIES if status in category['matchedStatuses']]
+
+class HistoryStore:
+    """Run history of one project in a SQLite database"""
+
+    def __init__(self, path=DEFAULT_DB, verbose=True):
+        self.path = path
+        self.verbose = verbose
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def run_count(self):
+        return self.db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def last_build_order(self):
+        return self.db.execute("SELECT COALESCE(MAX(build_order), 0) FROM runs").fetchone()[0]
+
+    def import_trend(self, trend_file):
+        """Seed an empty store from an existing history-trend.json (totals only); returns entries imported"""
+        if self.run_count() or not Path(trend_file).exists():
+            return 0
+        try:
+            with open(trend_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            log_message(f"Could not import {trend_file}: {e}", self.verbose)
+            return 0
+        imported = 0
+        with self.db:
+            for entry in entries:
+                if not isinstance(entry, dict) or 'buildOrder' not in entry or 'data' not in entry:
+                    continue
+                data = entry['data']
+                self.db.execute(
+                    "INSERT OR IGNORE INTO runs (build_order, report_name, report_url, failed, broken, skipped, passed, unknown, total) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (entry['buildOrder'], entry.get('reportName'), entry.get('reportUrl'))
+                    + tuple(data.get(status, 0) for status in STATUSES) + (data.get('total', 0),)
+                )
+                imported += 1
+        log_message(f"Imported {imported} runs from {trend_file}", self.verbose)
+        return imported
+
+    def record_run(self, results_dir, build_order=None, report_name=None, report_url=None):
+        """Store the totals and per-test results of allure-results as one run; returns its buildOrder"""
+        build_order = build_order or self.last_build_order() + 1
+        counts = dict.fromkeys(STATUSES, 0)
+        start, stop = None, None
+        categories = load_categories(results_dir)
+        # A retried test counts once, with its latest result
+        latest, result_categories = {}, {}
+        for result in read_results(results_dir):
+            previous = latest.get(result['historyId'])
+            if previous is None or (result.get('stop') or 0) >= (previous[8] or 0):
+                result_start, result_stop = result.get('start'), result.get('stop')
+                duration = result_stop - result_start if result_start is not None and result_stop is not None else None
+                status = result.get('status') if result.get('status') in STATUSES else 'unknown'
+                latest[result['historyId']] = (
+                    result['historyId'], build_order, result.get('uuid'), result.get('name'), result.get('fullName'),
+                    status, (result.get('statusDetails') or {}).get('message'), result_start, result_stop, duration
+                )
+                result_categories[result['historyId']] = match_categories(result, categories)
+        category_counts = {}
+        for names in result_categories.values():
+            for name in names:
+                category_counts[name] = category_counts.get(name, 0) + 1
+        for row in latest.values():
+            counts[row[5]] += 1
+            if row[7] is not None:
+                start = row[7] if start is None else min(start, row[7])
+            if row[8] is not None:
+                stop = row[8] if stop is None else max(stop, row[8])
+        with self.db:
+            self.db.execute("DELETE FROM test_results WHERE build_order = ?", (build_order,))
+            self.db.executemany("INSERT INTO test_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", latest.values())
+            self.db.execute("DELETE FROM run_categories WHERE build_order = ?", (build_order,))
+            self.db.executemany("INSERT INTO run_categories VALUES (?, ?, ?)",
+                                [(build_order, name, count) for name, count in category_counts.items()])
+            self.db.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (build_order, report_name or f"Run #{build_order}", report_url, start, stop)
+                + tuple(counts[status] for status in STATUSES) + (sum(counts.values()),)
+            )
+        log_message(f"Recorded run {build_order}: {sum(counts.values())} tests "
+                    f"({counts['passed']} passed, {counts['failed']} failed, {counts['broken']} broken)", self.verbose)
+        return build_order
+
+    def prune(self, retention=DEFAULT_RETENTION):
+        """Delete all but the newest `retention` runs (0 keeps everything); returns runs deleted"""
+        if not retention:
+            return 0
+        cutoff = self.last_build_order() - retention
+        with self.db:
+            self.db.execute("DELETE FROM test_results WHERE build_order <= ?", (cutoff,))
+            self.db.execute("DELETE FROM run_categories WHERE build_order <= ?", (cutoff,))
+            deleted = self.db.execute("DELETE FROM runs WHERE build_order <= ?", (cutoff,)).rowcount
+        if deleted:
+            log_message(f"Pruned {deleted} runs older than buildOrder {cutoff + 1}", self.verbose)
+        return deleted
+
+    def runs(self, limit=None):
+        """Newest runs first, as sqlite3.Row"""
+        query = "SELECT * FROM runs ORDER BY build_order DESC"
+        if limit:
+            return self.db.execute(query + " LIMIT ?", (limit,)).fetchall()
+        return self.db.execute(query).fetchall()
+
+    def history_ids(self, test):
+        """historyIds of a test given its historyId, name or fullName"""
+        rows = self.db.execute(
+            "SELECT DISTINCT history_id FROM test_results WHERE history_id = ? OR name = ? "
+            "UNION SELECT DISTINCT history_id FROM test_results WHERE full_name = ?",
+            (test, test, test)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def test_history(self, test, limit=500):
+        """Last `limit` results of a test (historyId, name or fullName), newest first"""
+        ids = self.history_ids(test)
+        if not ids:
+            return []
+        placeholders = ", ".join("?" * len(ids))
+        return self.db.execute(
+            f"SELECT * FROM test_results WHERE history_id IN ({placeholders}) ORDER BY build_order DESC LIMIT ?",
+            ids + [limit]
+        ).fetchall()
+
+    def run_categories(self, build_order):
+        """{category: count} of one run"""
+        rows = self.db.execute("SELECT category, count FROM run_categories WHERE build_order = ?", (build_order,))
+        return {row['category']: row['count'] for row in rows}
+
+    def iter_durations(self):
+        """Cursor over (history_id, name, build_order, duration) of all tests, grouped by test, newest run first"""
+        return self.db.execute(
+            "SELECT history_id, name, build_order, duration FROM test_results "
+            "WHERE duration IS NOT NULL ORDER BY history_id, build_order DESC"
+        )
+
+    def write_allure_history(self, history_dir, trend_runs=10, history_items=20, current_build=None):
+        """
+        Write history-trend.json and history.json for `allure generate`.
+        - history-trend.json: the newest `trend_runs` runs, oldest first.
+        - history.json: up to `history_items` earlier results per test. The run being reported
+          (current_build) is left out, Allure adds it from allure-results itself.
+        """
+        history_dir = Path(history_dir)
+        history_dir.mkdir(parents=True, exist_ok=True)
+
+        trend = []
+        for run in reversed(self.runs(trend_runs)):
+            trend.append({
+                'buildOrder': run['build_order'],
+                'reportName': run['report_name'],
+                'reportUrl': run['report_url'],
+                'data': {**{status: run[status] for status in STATUSES}, 'total': run['total']}
+            })
+        with open(history_dir / 'history-trend.json', 'w', encoding='utf-8') as f:
+            json.dump(trend, f, indent=2, ensure_ascii=False)
+
+        history = {}
+        rows = self.db.execute(
+            "SELECT * FROM test_results WHERE build_order != ? ORDER BY history_id, build_order DESC",
+            (current_build or -1,)
+        )
+        for row in rows:
+            entry = history.setdefault(row['history_id'], {
+                'statistic': {**dict.fromkeys(STATUSES, 0), 'total': 0},
+                'items': []
+            })
+            if len(entry['items']) >= history_items:
+                continue
+            entry['statistic'][row['status'] if row['status'] in STATUSES else 'unknown'] += 1
+            entry['statistic']['total'] += 1
+            item = {
+                'uid': row['uid'],
+                'reportUrl': None,
+                'status': row['status'],
+                'time': {'start': row['start'], 'stop': row['stop'], 'duration': row['duration']}
+            }
+            if row['status_message']:
+                item['statusDetails'] = row['status_message']
+            entry['items'].append(item)
+        with open(history_dir / 'history.json', 'w', encoding='utf-8') as f:
+            json.dump(history, f, ensure_ascii=False)
+
+        log_message(f"Wrote Allure history to {history_dir}: {len(trend)} trend entries, {len(history)} tests", self.verbose)
+        return len(trend)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Query and export the Allure run history store')
+    parser.add_argument('--db', default=DEFAULT_DB, help='History database file')
+    parser.add_argument('--test', type=str, help='Show the history of one test (historyId, name or fullName)')
+    parser.add_argument('--limit', type=int, default=500, help='Number of runs to show')
+    parser.add_argument('--export', type=str, metavar='DIR', help='Write Allure history files into DIR')
+    parser.add_argument('--trend-runs', type=int, default=10, help='Runs in the exported history-trend.json')
+    args = parser.parse_args()
+
+    with HistoryStore(args.db, verbose=True) as store:
+        if args.test:
+            rows = store.test_history(args.test, args.limit)
+            print(f"{args.test}: {len(rows)} runs")
+            for row in rows:
+                duration = f"{row['duration'] / 1000:.2f}s" if row['duration'] is not None else "-"
+                print(f"  #{row['build_order']:<6} {row['status']:<8} {duration}")
+        if args.export:
+            store.write_allure_history(args.export, args.trend_runs)
+        if not args.test and not args.export:
+            for run in store.runs(args.limit):
+                print(f"#{run['build_order']:<6} {run['total']} tests, {run['passed']} passed, "
+                      f"{run['failed']} failed, {run['broken']} broken")
+    sys.exit(0)
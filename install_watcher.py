@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Install Watcher - Event-driven detection of finished package installs
+1. Streams adb logcat and wakes up whenever a line mentions one of the watched packages.
+2. Confirms with a single package snapshot instead of polling each package separately.
+3. A slow periodic check is kept as a safety net in case the log does not mention the package.
+"""
+
+import subprocess
+import threading
+import time
+from package_inventory import adb_command
+
+class InstallWatcher:
+    """Watches logcat for package install events and records time to installed"""
+
+    def __init__(self, inventory, serial=None, fallback_interval=10):
+        self.inventory = inventory
+        self.serial = serial
+        self.fallback_interval = fallback_interval
+        self.started = {}
+        self.installed = {}
+        # started/installed are read by the logcat thread while the main thread updates them
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._process = None
+
+    def start(self):
+        """Start streaming logcat from now on"""
+        # -T 1: only lines logged from now on, no history dump
+        self._process = subprocess.Popen(
+            adb_command(self.serial) + ["logcat", "-v", "brief", "-T", "1"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            errors="replace"
+        )
+        threading.Thread(target=self._read_log, daemon=True).start()
+        return self
+
+    def _read_log(self):
+        for line in self._process.stdout:
+            if any(package in line for package in self._waiting()):
+                self._event.set()
+
+    def _waiting(self):
+        with self._lock:
+            return [package for package in self.started if package not in self.installed]
+
+    def watch(self, package_name):
+        """Start the clock for a package whose install was just triggered"""
+        with self._lock:
+            self.started[package_name] = time.monotonic()
+
+    def _check(self):
+        """Refresh the snapshot once and record every package that appeared"""
+        self.inventory.invalidate()
+        snapshot = self.inventory.snapshot()
+        now = time.monotonic()
+        for package in self._waiting():
+            if package in snapshot:
+                with self._lock:
+                    self.installed[package] = round(now - self.started[package], 1)
+                print(f"{package} installed after {self.installed[package]}s")
+
+    def wait_all(self, timeout=300):
+        """Wait until every watched package is installed; returns {package: seconds} of installed ones"""
+        deadline = time.monotonic() + timeout
+        self._check()
+        while self._waiting():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._event.wait(min(self.fallback_interval, remaining))
+            self._event.clear()
+            self._check()
+        with self._lock:
+            return dict(self.installed)
+
+    def stop(self):
+        if self._process and self._process.poll() is None:
+            self._process.terminate()
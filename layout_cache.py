@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Layout Cache - Per-device tap targets instead of hard-coded coordinates
+1. Resolves each named target once per screen resolution and app versionCode.
+2. Stores the bounds on disk, one file per device (layout-cache-<serial>.json), so later runs tap straight from the cache.
+3. Re-resolves a target only when the tap fails validation and the target is still on the screen.
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from appium.webdriver.common.appiumby import AppiumBy
+from config import DEVICE_UDID
+from package_inventory import PackageInventory
+
+# One cache file per device, so suites running on other devices never write the same file
+CACHE_FILE = "layout-cache-{}.json".format(re.sub(r"[^\w.-]", "_", DEVICE_UDID)) if DEVICE_UDID else "layout-cache.json"
+APP_PACKAGE = "fi.sbweather.app"
+
+# Screen size the original hard-coded coordinates were taken on
+REFERENCE_SIZE = (1080, 2400)
+
+# Shown only after the search tap: the home screen search field is there before the tap but not focused
+SEARCH_FIELD_FOCUSED = (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().className("android.widget.EditText").focused(true)')
+
+# Named tap targets: locator used to resolve the bounds, reference point used when it cannot be found
+TARGETS = {
+    'search': {
+        'locator': (AppiumBy.CLASS_NAME, "android.widget.EditText"),
+        'reference': (400, 780)
+    },
+    'view_warmest': {
+        'locator': (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().descriptionContains("Lämpimimmät")'),
+        'reference': (300, 1150)
+    },
+    'view_coldest': {
+        'locator': (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().descriptionContains("Kylmimmät")'),
+        'reference': (790, 1150)
+    },
+    'view_rainiest': {
+        'locator': (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().descriptionContains("Sateisimmat")'),
+        'reference': (300, 1480)
+    },
+    'view_windiest': {
+        'locator': (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().descriptionContains("Tuulisimmat")'),
+        'reference': (790, 1480)
+    },
+}
+
+def log_message(message, verbose=True):
+    """Print message for GitHub Actions UI"""
+    if verbose:
+        print(f"[LAYOUT-CACHE] {message}")
+        sys.stdout.flush()
+
+class LayoutCache:
+    """Bounds of named tap targets, cached per resolution and app versionCode"""
+
+    def __init__(self, path=CACHE_FILE, targets=TARGETS, verbose=True):
+        self.path = path
+        self.targets = targets
+        self.verbose = verbose
+        self._keys = {}
+        self._data = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            log_message(f"Ignoring unreadable layout cache {self.path}: {e}", self.verbose)
+            return {}
+
+    def device_key(self, driver):
+        """Cache key of the driver's device: '<width>x<height>@<versionCode>'"""
+        if driver.session_id not in self._keys:
+            size = driver.get_window_size()
+            inventory = PackageInventory(DEVICE_UDID)
+            try:
+                version_code = inventory.version_code(APP_PACKAGE)
+            finally:
+                inventory.close()
+            self._keys[driver.session_id] = f"{size['width']}x{size['height']}@{version_code}"
+        return self._keys[driver.session_id]
+
+    def _save(self, key, name, entry):
+        """Write one entry over the latest file contents through a unique temp file"""
+        data = self._load()
+        data.setdefault(key, {})[name] = entry
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(prefix=".layout-cache-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._data = data
+
+    def resolve(self, driver, name, fallback=True):
+        """
+        Look the target up on the current screen and store its bounds.
+        - fallback: scale the reference point when the locator finds nothing; without it None is returned.
+        - A scaled point never replaces bounds that were resolved from the element.
+        """
+        target = self.targets[name]
+        key = self.device_key(driver)
+        start = time.monotonic()
+        elements = driver.find_elements(*target['locator'])
+        if elements:
+            rect = elements[0].rect
+            entry = {'bounds': [rect['x'], rect['y'], rect['width'], rect['height']], 'source': 'element'}
+        else:
+            if not fallback:
+                return None
+            cached = self._data.get(key, {}).get(name)
+            if cached and cached['source'] == 'element':
+                return cached
+            # Not resolvable by locator: scale the reference point to this screen
+            size = driver.get_window_size()
+            x = round(target['reference'][0] * size['width'] / REFERENCE_SIZE[0])
+            y = round(target['reference'][1] * size['height'] / REFERENCE_SIZE[1])
+            entry = {'bounds': [x, y, 0, 0], 'source': 'scaled'}
+        entry['resolved_at'] = time.strftime("%Y-%m-%d %H:%M:%S")
+        self._save(key, name, entry)
+        log_message(f"Resolved '{name}' from {entry['source']} in {time.monotonic() - start:.2f}s: {entry['bounds']}", self.verbose)
+        return entry
+
+    def point(self, driver, name):
+        """Center point of the target, from the cache when possible"""
+        entry = self._data.get(self.device_key(driver), {}).get(name) or self.resolve(driver, name)
+        x, y, width, height = entry['bounds']
+        return x + width // 2, y + height // 2
+
+    def tap(self, driver, name, validate=None):
+        """
+        Tap a named target.
+        - validate: optional callable returning True when the tap had the wanted effect; it is the caller's
+          check of the tap, so the result is returned instead of checking again.
+        - On failed validation the target is resolved again, only if it is still on the screen,
+          and tapped once more if its bounds changed.
+        """
+        point = self.point(driver, name)
+        driver.tap([point])
+        if validate is None or validate():
+            return True
+
+        entry = self.resolve(driver, name, fallback=False)
+        if entry is None:
+            log_message(f"Validation failed after tapping '{name}' at {point} and the target is not on the screen", self.verbose)
+            return False
+        log_message(f"Validation failed after tapping '{name}' at {point}, resolved again", self.verbose)
+        x, y, width, height = entry['bounds']
+        new_point = (x + width // 2, y + height // 2)
+        if new_point == point:
+            return False
+        driver.tap([new_point])
+        return bool(validate())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Locator Compiler - Turn common XPath shapes into native UiAutomator selectors
+1. XPath on UiAutomator2 makes the server serialize the whole hierarchy on every poll.
+2. Simple attribute predicates (=, contains, starts-with, joined with and/or) map to UiSelector.
+3. Anything else stays XPath; the chosen path is logged once per locator.
+Run with --benchmark to time XPath against the compiled selector on a device.
+"""
+
+import argparse
+import re
+import sys
+import time
+from functools import lru_cache
+from appium.webdriver.common.appiumby import AppiumBy
+
+# XPath attribute -> UiSelector methods for equals, contains, starts-with and regex match
+SELECTOR_METHODS = {
+    'text': ('text', 'textContains', 'textStartsWith', 'textMatches'),
+    'content-desc': ('description', 'descriptionContains', 'descriptionStartsWith', 'descriptionMatches'),
+    'resource-id': ('resourceId', None, None, 'resourceIdMatches'),
+    'class': ('className', None, None, 'classNameMatches'),
+}
+
+# DOTALL: accessibility ids of the app contain newlines ('KOTI\nTab 1 of 3')
+PATH_PATTERN = re.compile(r"^//(\*|[A-Za-z_][\w.]*)(?:\[(.+)\])?$", re.DOTALL)
+TERM_PATTERN = re.compile(
+    r"\s*(?:(contains|starts-with)\(\s*@([\w-]+)\s*,\s*(['\"])(.*?)\3\s*\)"
+    r"|@([\w-]+)\s*=\s*(['\"])(.*?)\6)\s*",
+    re.DOTALL
+)
+CONNECTOR_PATTERN = re.compile(r"(and|or)\b")
+REGEX_SPECIAL = set(".^$*+?{}[]\\|()")
+
+def log_message(message, verbose=True):
+    """Print message for GitHub Actions UI"""
+    if verbose:
+        print(f"[LOCATORS] {message}")
+        sys.stdout.flush()
+
+def java_string(value):
+    """Quote a value as a Java string literal for the UiSelector expression"""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def regex_literal(value):
+    """Escape regex special characters of a literal value"""
+    return "".join("\\" + char if char in REGEX_SPECIAL else char for char in value)
+
+def parse_predicate(predicate):
+    """Split a predicate into (connector, [(function, attribute, value)]); None if not supported"""
+    terms, connectors, position = [], set(), 0
+    while True:
+        match = TERM_PATTERN.match(predicate, position)
+        if not match:
+            return None
+        if match.group(2):
+            terms.append((match.group(1), match.group(2), match.group(4)))
+        else:
+            terms.append(('equals', match.group(5), match.group(7)))
+        position = match.end()
+        if position == len(predicate):
+            break
+        connector = CONNECTOR_PATTERN.match(predicate, position)
+        if not connector:
+            return None
+        connectors.add(connector.group(1))
+        position = connector.end()
+    if len(connectors) > 1:
+        return None
+    return (connectors.pop() if connectors else 'and'), terms
+
+def selector_call(function, attribute, value):
+    """UiSelector method call for one predicate term, or None if the attribute has no native method"""
+    methods = SELECTOR_METHODS.get(attribute)
+    if methods is None:
+        return None
+    equals, contains, starts_with, matches = methods
+    if function == 'equals':
+        return f".{equals}({java_string(value)})"
+    if function == 'contains':
+        if contains:
+            return f".{contains}({java_string(value)})"
+        return f".{matches}({java_string('(?s).*' + regex_literal(value) + '.*')})"
+    if starts_with:
+        return f".{starts_with}({java_string(value)})"
+    return f".{matches}({java_string('(?s)' + regex_literal(value) + '.*')})"
+
+def alternative_pattern(function, value):
+    """Regex alternative matching one term of an or-predicate"""
+    literal = regex_literal(value)
+    if function == 'contains':
+        return f".*{literal}.*"
+    if function == 'starts-with':
+        return f"{literal}.*"
+    return literal
+
+@lru_cache(maxsize=None)
+def compile_xpath(xpath):
+    """Return an equivalent UiSelector expression for simple XPath shapes, None otherwise"""
+    match = PATH_PATTERN.match(xpath.strip())
+    if not match:
+        return None
+    element_class, predicate = match.groups()
+    selector = "new UiSelector()"
+    if element_class != "*":
+        selector += f".className({java_string(element_class)})"
+    if predicate is None:
+        return selector if element_class != "*" else None
+
+    parsed = parse_predicate(predicate)
+    if parsed is None:
+        return None
+    connector, terms = parsed
+
+    if connector == 'and':
+        for function, attribute, value in terms:
+            call = selector_call(function, attribute, value)
+            if call is None:
+                return None
+            selector += call
+        return selector
+
+    # or: one regex over a single attribute, e.g. contains(@text,'Install') or contains(@text,'INSTALL')
+    attributes = {attribute for _, attribute, _ in terms}
+    if len(attributes) != 1 or attributes.pop() not in SELECTOR_METHODS:
+        return None
+    matches = SELECTOR_METHODS[terms[0][1]][3]
+    pattern = "(?s)(?:" + "|".join(alternative_pattern(function, value) for function, _, value in terms) + ")"
+    return selector + f".{matches}({java_string(pattern)})"
+
+@lru_cache(maxsize=None)
+def compile_locator(by, value, verbose=True):
+    """
+    Return the fastest equivalent (by, value) locator.
+    - XPath is compiled to -android uiautomator when the shape is supported.
+    - Accessibility id, class name and id are already native and returned as is.
+    """
+    if by != AppiumBy.XPATH:
+        return by, value
+    selector = compile_xpath(value)
+    if selector is None:
+        log_message(f"XPath kept (shape not supported): {value}", verbose)
+        return by, value
+    log_message(f"XPath compiled to UiSelector: {value} -> {selector}", verbose)
+    return AppiumBy.ANDROID_UIAUTOMATOR, selector
+
+# Locator shapes used by the suites, timed by --benchmark
+BENCHMARK_LOCATORS = [
+    "//*[contains(@text, 'Install') or contains(@text, 'INSTALL')]",
+    "//*[@content-desc='KOTI\nTab 1 of 3']",
+    "//*[contains(@content-desc, 'ENNÄTYKSET')]",
+    "//android.widget.ImageView",
+    "//android.widget.EditText[@text='Oulu']",
+]
+
+def benchmark(driver, samples=10):
+    """Time find_elements for each XPath shape and its compiled selector"""
+    results = []
+    for xpath in BENCHMARK_LOCATORS:
+        compiled = compile_locator(AppiumBy.XPATH, xpath, verbose=False)
+        timings = {}
+        for label, locator in (("xpath", (AppiumBy.XPATH, xpath)), ("native", compiled)):
+            if label == "native" and compiled[0] == AppiumBy.XPATH:
+                continue
+            start = time.monotonic()
+            for _ in range(samples):
+                driver.find_elements(*locator)
+            timings[label] = (time.monotonic() - start) / samples * 1000
+        results.append((xpath, timings))
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compile XPath locators into UiAutomator selectors')
+    parser.add_argument('xpath', nargs='*', help='XPath expressions to compile')
+    parser.add_argument('--benchmark', type=int, metavar='SAMPLES', help='Time XPath vs compiled selectors on a device')
+    args = parser.parse_args()
+
+    for xpath in args.xpath:
+        print(f"{xpath}\n  -> {compile_xpath(xpath) or 'not supported, stays XPath'}")
+
+    if args.benchmark:
+        from config import create_appium_driver
+        driver = create_appium_driver()
+        try:
+            for xpath, timings in benchmark(driver, args.benchmark):
+                native = timings.get('native')
+                speedup = f"{timings['xpath'] / native:.1f}x" if native else "n/a"
+                native_text = f"{native:.0f} ms" if native else "-"
+                print(f"{xpath!r}: xpath {timings['xpath']:.0f} ms, native {native_text}, speedup {speedup}")
+        finally:
+            driver.quit()
+    sys.exit(0)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Package Inventory - Installed packages and version codes from one adb round-trip
+1. Keeps one long-lived adb shell session instead of spawning adb for every query.
+2. Reads all installed packages with their versionCodes in a single pm call.
+3. Caches the snapshot until it is invalidated or older than max_age.
+"""
+
+import os
+import queue
+import shlex
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+def adb_command(serial=None):
+    """
+    Base adb command, optionally bound to one device (adb also honours ANDROID_SERIAL).
+    The ADB environment variable overrides the binary, e.g. the fake adb of the benchmarks.
+    """
+    adb = shlex.split(os.environ.get("ADB", "adb"), posix=(os.name != "nt"))
+    return adb + ["-s", serial] if serial else adb
+
+class AdbShell:
+    """Persistent adb shell; each command is framed by a unique end marker carrying its exit code"""
+
+    def __init__(self, serial=None):
+        self.serial = serial
+        self.process = None
+        self._lines = queue.Queue()
+
+    def _start(self):
+        self.process = subprocess.Popen(
+            adb_command(self.serial) + ["shell"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1
+        )
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read_output, args=(self.process, self._lines), daemon=True).start()
+
+    @staticmethod
+    def _read_output(process, lines):
+        for line in process.stdout:
+            lines.put(line.rstrip("\r\n"))
+        lines.put(None)
+
+    def run(self, command, timeout=30):
+        """Run a shell command in the session and return (exit_code, output_lines)"""
+        if self.process is None or self.process.poll() is not None:
+            self._start()
+        marker = f"__END_{uuid.uuid4().hex}__"
+        self.process.stdin.write(f"{command}; echo {marker} $?\n")
+        self.process.stdin.flush()
+
+        output = []
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                line = self._lines.get(timeout=max(remaining, 0.01))
+            except queue.Empty:
+                self.close()
+                raise TimeoutError(f"adb shell command timed out after {timeout}s: {command}")
+            if line is None:
+                raise RuntimeError(f"adb shell session ended while running: {command}")
+            if line.startswith(marker):
+                return int(line.split()[-1]), output
+            output.append(line)
+
+    def close(self):
+        """Stop the shell session"""
+        if self.process and self.process.poll() is None:
+            try:
+                self.process.stdin.write("exit\n")
+                self.process.stdin.flush()
+                self.process.wait(timeout=2)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+        self.process = None
+
+def parse_package_list(lines):
+    """Parse 'package:<name> versionCode:<n>' lines into {name: versionCode or None}"""
+    packages = {}
+    for line in lines:
+        if not line.startswith("package:"):
+            continue
+        parts = line[len("package:"):].split()
+        if not parts:
+            continue
+        version_code = None
+        for part in parts[1:]:
+            if part.startswith("versionCode:"):
+                version_code = int(part.split(":", 1)[1])
+        packages[parts[0]] = version_code
+    return packages
+
+class PackageInventory:
+    """Cached view of the packages installed on one device"""
+
+    def __init__(self, serial=None, max_age=None):
+        self.shell = AdbShell(serial)
+        self.max_age = max_age
+        self._packages = None
+        self._taken_at = 0.0
+
+    def snapshot(self, refresh=False):
+        """Return {package: versionCode} for all installed packages, from cache when possible"""
+        expired = self.max_age is not None and time.monotonic() - self._taken_at > self.max_age
+        if refresh or expired or self._packages is None:
+            # --show-versioncode needs Android 9+, older devices fall back to names only
+            exit_code, lines = self.shell.run("pm list packages --show-versioncode")
+            if exit_code != 0:
+                exit_code, lines = self.shell.run("pm list packages")
+            self._packages = parse_package_list(lines)
+            self._taken_at = time.monotonic()
+        return self._packages
+
+    def invalidate(self):
+        """Drop the cached snapshot, e.g. after an install or uninstall"""
+        self._packages = None
+
+    def is_installed(self, package_name, refresh=False):
+        return package_name in self.snapshot(refresh)
+
+    def version_code(self, package_name, refresh=False):
+        return self.snapshot(refresh).get(package_name)
+
+    def missing(self, package_names, refresh=False):
+        """Return the packages of the list that are not installed"""
+        installed = self.snapshot(refresh)
+        return [name for name in package_names if name not in installed]
+
+    def close(self):
+        self.shell.close()
+
+if __name__ == "__main__":
+    inventory = PackageInventory()
+    start = time.monotonic()
+    packages = inventory.snapshot()
+    print(f"{len(packages)} packages read in {time.monotonic() - start:.2f}s")
+    for name in sys.argv[1:]:
+        print(f"{name}: {'installed, versionCode ' + str(packages[name]) if name in packages else 'not installed'}")
+    inventory.close()
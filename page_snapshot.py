@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Page Snapshot - Answer many element checks from one UI hierarchy dump
+1. Fetches driver.page_source once per screen state and parses it locally.
+2. Indexes the nodes by accessibility id (content-desc), class, text and resource-id.
+3. Resolves a batch of locators against the index in one pass; re-fetches only after invalidate().
+"""
+
+import xml.etree.ElementTree as ET
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import WebDriverException
+from wait_utils import wait_until
+
+# Locator strategy -> UiAutomator2 page source attribute
+INDEXED_ATTRIBUTES = {
+    AppiumBy.ACCESSIBILITY_ID: 'content-desc',
+    AppiumBy.CLASS_NAME: 'class',
+    AppiumBy.ID: 'resource-id',
+    'text': 'text',
+}
+
+class PageSnapshot:
+    """Locally indexed copy of the current UI hierarchy"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._index = None
+        self.fetches = 0
+
+    def refresh(self):
+        """Fetch and index the current page source (one device round-trip)"""
+        root = ET.fromstring(self.driver.page_source.encode("utf-8"))
+        self.fetches += 1
+        index = {attribute: {} for attribute in INDEXED_ATTRIBUTES.values()}
+        for node in root.iter():
+            attributes = dict(node.attrib)
+            # Class is the tag name in UiAutomator2 sources; the attribute is not always present
+            attributes.setdefault('class', node.tag)
+            for attribute, values in index.items():
+                value = attributes.get(attribute)
+                if value:
+                    values.setdefault(value, []).append(attributes)
+        self._index = index
+        return self
+
+    def invalidate(self):
+        """Forget the snapshot after the screen has changed (tap, back, navigation)"""
+        self._index = None
+
+    def find(self, by, value):
+        """Return attribute dicts of all nodes matching the locator"""
+        if by not in INDEXED_ATTRIBUTES:
+            raise ValueError(f"Locator strategy '{by}' is not supported by PageSnapshot")
+        if self._index is None:
+            self.refresh()
+        return self._index[INDEXED_ATTRIBUTES[by]].get(value, [])
+
+    def contains(self, by, value):
+        return bool(self.find(by, value))
+
+    def resolve(self, locators):
+        """Resolve many (by, value) locators in one pass; returns {locator: found}"""
+        return {locator: self.contains(*locator) for locator in locators}
+
+def verify_elements(driver, locators, timeout=10, description=None):
+    """
+    Wait until all locators are present on the screen.
+    Each poll costs one page_source round-trip, however many locators are checked.
+    A page source that does not parse (e.g. cut off mid-transition) counts as a failed poll.
+    Returns {locator: found} from the last snapshot.
+    """
+    snapshot = PageSnapshot(driver)
+    results = {}
+
+    def _all_present():
+        snapshot.refresh()
+        results.update(snapshot.resolve(locators))
+        return all(results.values())
+
+    wait_until(_all_present, timeout, description or f"{len(locators)} elements in one snapshot",
+               ignored_exceptions=(WebDriverException, ET.ParseError))
+    return results
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Performance Statistics - Percentiles and summaries shared by the timing tools
+"""
+
+import math
+
+def percentile(values, percent):
+    """Nearest-rank percentile of the values (None for an empty list)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def summarize(values):
+    """Count, total, mean and p50/p95/p99 of a list of numbers"""
+    if not values:
+        return {'count': 0, 'total': 0, 'mean': None, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+    return {
+        'count': len(values),
+        'total': sum(values),
+        'mean': sum(values) / len(values),
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': max(values)
+    }
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Process Runner - Streaming subprocess execution with timeouts and bounded memory
+1. Streams stdout and stderr line by line as they arrive, prefixed with the command name.
+2. Enforces a wall-clock timeout and a no-output (idle) timeout; the whole process tree is stopped.
+3. Keeps only the last lines in a bounded tail buffer for error reports.
+4. Runs several independent commands at once and reports each command's runtime.
+"""
+
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+TAIL_LINES = 200
+
+def log_message(message, verbose=True):
+    """Print message for GitHub Actions UI"""
+    if verbose:
+        print(f"[PROCESS] {message}")
+        sys.stdout.flush()
+
+def _read_stream(stream, label, lines):
+    for line in stream:
+        lines.put((label, line.rstrip("\r\n")))
+    lines.put((label, None))
+
+def stop_process_tree(process):
+    """Terminate a process and its children (allure and robot start java/python children)"""
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            os.killpg(process.pid, signal.SIGTERM)
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+    except (OSError, ProcessLookupError):
+        process.kill()
+    process.wait()
+
+def run_process(command, name=None, timeout=None, idle_timeout=None, shell=False, cwd=None, env=None,
+                tail_lines=TAIL_LINES, echo=True, on_line=None):
+    """
+    Run one command, streaming its output.
+    - timeout: wall-clock seconds; idle_timeout: seconds without any output line.
+    - on_line(stream, line): optional callback for every line ('stdout' or 'stderr').
+    Returns a record with status (passed/failed/timeout/idle-timeout), return_code, duration and tail.
+    """
+    name = name or (command if isinstance(command, str) else os.path.basename(command[0]))
+    started = time.monotonic()
+    process = subprocess.Popen(
+        command,
+        shell=shell,
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        bufsize=1,
+        # Own process group on POSIX so a timeout can stop the children too
+        start_new_session=(os.name != "nt")
+    )
+    lines = queue.Queue()
+    for stream, label in ((process.stdout, "stdout"), (process.stderr, "stderr")):
+        threading.Thread(target=_read_stream, args=(stream, label, lines), daemon=True).start()
+
+    tail = deque(maxlen=tail_lines)
+    line_count, open_streams, status = 0, 2, None
+    last_output = started
+    while open_streams:
+        now = time.monotonic()
+        waits = [1.0]
+        if timeout is not None:
+            waits.append(started + timeout - now)
+        if idle_timeout is not None:
+            waits.append(last_output + idle_timeout - now)
+        try:
+            label, line = lines.get(timeout=max(min(waits), 0.01))
+        except queue.Empty:
+            now = time.monotonic()
+            if timeout is not None and now - started >= timeout:
+                status = "timeout"
+            elif idle_timeout is not None and now - last_output >= idle_timeout:
+                status = "idle-timeout"
+            if status:
+                tail.append(f"[{name}] {status}: stopped after {now - started:.1f}s "
+                            f"({now - last_output:.1f}s without output)")
+                stop_process_tree(process)
+                break
+            continue
+        if line is None:
+            open_streams -= 1
+            continue
+        last_output = time.monotonic()
+        line_count += 1
+        tail.append(line)
+        if echo:
+            print(f"[{name}]{' !' if label == 'stderr' else ''} {line}")
+            sys.stdout.flush()
+        if on_line:
+            on_line(label, line)
+
+    return_code = process.wait()
+    duration = time.monotonic() - started
+    if status is None:
+        status = "passed" if return_code == 0 else "failed"
+    return {
+        'name': name,
+        'command': command,
+        'status': status,
+        'return_code': return_code,
+        'duration': round(duration, 3),
+        'lines': line_count,
+        'tail': list(tail)
+    }
+
+def run_many(commands, max_workers=None, echo=True):
+    """
+    Run independent commands at the same time.
+    - commands: list of dicts with 'command' and optional run_process keyword arguments (name, timeout, ...).
+    Returns the result records in the order of the commands.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers or len(commands) or 1) as executor:
+        futures = [executor.submit(run_process, echo=echo, **spec) for spec in commands]
+        return [future.result() for future in futures]
+
+def print_runtimes(results, verbose=True):
+    """One line per command: status, exit code and runtime"""
+    for result in results:
+        log_message(f"{result['name']}: {result['status']} (exit code {result['return_code']}) "
+                    f"in {result['duration']:.1f}s, {result['lines']} output lines", verbose)
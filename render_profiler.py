@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Render Profiler - Per-view rendering jank and memory of fi.sbweather.app
+1. Resets dumpsys gfxinfo when a view is opened and collects frame stats and dumpsys meminfo when it is done.
+2. Every view gets total and janky frames, jank %, frame time p50/p90/p95/p99 and total PSS/RSS.
+3. All adb calls run on a background thread with its own adb shell, so the test only queues them.
+4. Each run is appended to a trend file (JSON lines); --trend prints how the views have changed.
+Optional: enabled with RENDER_PROFILE=1, otherwise every call is a no-op.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from package_inventory import AdbShell
+
+APP_PACKAGE = "fi.sbweather.app"
+TREND_FILE = "render-profile-trend.jsonl"
+ENABLED = os.environ.get("RENDER_PROFILE", "0") == "1"
+
+GFX_PATTERNS = {
+    'frames': re.compile(r"^\s*Total frames rendered:\s*(\d+)", re.MULTILINE),
+    'janky_frames': re.compile(r"^\s*Janky frames:\s*(\d+)", re.MULTILINE),
+    'jank_percent': re.compile(r"^\s*Janky frames:\s*\d+\s*\(([\d.]+)%\)", re.MULTILINE),
+    'p50_ms': re.compile(r"^\s*50th percentile:\s*(\d+)ms", re.MULTILINE),
+    'p90_ms': re.compile(r"^\s*90th percentile:\s*(\d+)ms", re.MULTILINE),
+    'p95_ms': re.compile(r"^\s*95th percentile:\s*(\d+)ms", re.MULTILINE),
+    'p99_ms': re.compile(r"^\s*99th percentile:\s*(\d+)ms", re.MULTILINE),
+}
+PSS_PATTERNS = (re.compile(r"TOTAL PSS:\s*(\d+)"), re.compile(r"^\s*TOTAL\s+(\d+)", re.MULTILINE))
+RSS_PATTERN = re.compile(r"TOTAL RSS:\s*(\d+)")
+
+def log_message(message, verbose=True):
+    """Print message for GitHub Actions UI"""
+    if verbose:
+        print(f"[RENDER-PROFILER] {message}")
+        sys.stdout.flush()
+
+def parse_gfxinfo(text):
+    """Frame stats of the first (app-wide) section of dumpsys gfxinfo"""
+    stats = {}
+    for name, pattern in GFX_PATTERNS.items():
+        match = pattern.search(text)
+        if match:
+            stats[name] = float(match.group(1)) if name == 'jank_percent' else int(match.group(1))
+    return stats
+
+def parse_meminfo(text):
+    """Total PSS and RSS (kB) from dumpsys meminfo"""
+    stats = {}
+    for pattern in PSS_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            stats['pss_kb'] = int(match.group(1))
+            break
+    match = RSS_PATTERN.search(text)
+    if match:
+        stats['rss_kb'] = int(match.group(1))
+    return stats
+
+class RenderProfiler:
+    """Queues gfxinfo/meminfo collection around views and keeps the results"""
+
+    def __init__(self, package=APP_PACKAGE, serial=None, enabled=None, verbose=True):
+        self.package = package
+        self.serial = serial
+        self.enabled = ENABLED if enabled is None else enabled
+        self.verbose = verbose
+        self.entries = []
+        self.wait_seconds = 0.0
+        self._pending = {}
+        self._executor = None
+        self._shell = None
+        if self.enabled:
+            self._shell = AdbShell(serial)
+            # One worker keeps reset and collect of a view in order
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render-profiler")
+
+    def _reset(self):
+        self._shell.run(f"dumpsys gfxinfo {self.package} reset")
+
+    def _collect(self, view, test):
+        _, gfx_lines = self._shell.run(f"dumpsys gfxinfo {self.package}")
+        _, mem_lines = self._shell.run(f"dumpsys meminfo {self.package}")
+        entry = {'view': view, 'test': test, 'collected_at': time.strftime("%Y-%m-%dT%H:%M:%S")}
+        entry.update(parse_gfxinfo("\n".join(gfx_lines)))
+        entry.update(parse_meminfo("\n".join(mem_lines)))
+        self.entries.append(entry)
+        return entry
+
+    def begin(self, view):
+        """Start a fresh frame window for the view (returns at once)"""
+        if self.enabled:
+            self._executor.submit(self._reset)
+
+    def end(self, view, test=None):
+        """Queue collection of the view's frames and memory; returns a future of the entry (None if disabled)"""
+        if not self.enabled:
+            return None
+        future = self._executor.submit(self._collect, view, test)
+        self._pending[view] = future
+        return future
+
+    @contextmanager
+    def profile(self, view, test=None):
+        """Profile the block as one view"""
+        self.begin(view)
+        try:
+            yield
+        finally:
+            self.end(view, test)
+
+    def result(self, view, timeout=30):
+        """Entry of the latest collection of the view, waiting for it if still queued (the wait is measured)"""
+        future = self._pending.pop(view, None)
+        if future is None:
+            return None
+        start = time.monotonic()
+        try:
+            return future.result(timeout)
+        except Exception as e:
+            log_message(f"Collecting {view} failed: {e}", self.verbose)
+            return None
+        finally:
+            waited = time.monotonic() - start
+            self.wait_seconds += waited
+            if waited >= 0.001:
+                log_message(f"Waited {waited * 1000:.0f} ms for the {view} collection", self.verbose)
+
+    def append_trend(self, path=TREND_FILE):
+        """Add this run's per-view results to the trend file"""
+        if not self.entries:
+            return
+        run = {
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'package': self.package,
+            'device': self.serial or os.environ.get("ANDROID_SERIAL") or "default",
+            'views': {entry['view']: {key: value for key, value in entry.items() if key not in ('view', 'collected_at')}
+                      for entry in self.entries}
+        }
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(run, ensure_ascii=False) + "\n")
+
+    def close(self, trend_path=TREND_FILE):
+        """Wait for queued collections, print the summary and append the trend"""
+        if not self.enabled:
+            return
+        self._executor.shutdown(wait=True)
+        self._shell.close()
+        self._pending.clear()
+        print("\n" + "="*70)
+        print("RENDERING AND MEMORY PER VIEW")
+        print("="*70)
+        print(format_entries(self.entries))
+        print(f"Time tests waited for collections: {self.wait_seconds:.2f}s")
+        print("="*70)
+        self.append_trend(trend_path)
+
+def format_entries(entries):
+    """Text table of per-view frame and memory stats"""
+    lines = [f"{'View':<28} {'Frames':>7} {'Jank %':>7} {'p50':>5} {'p90':>5} {'p99':>5} {'PSS MB':>7}"]
+    for entry in entries:
+        pss = entry.get('pss_kb')
+        lines.append(f"{entry['view'][:28]:<28} {entry.get('frames', 0):>7} {entry.get('jank_percent', 0):>7.2f} "
+                     f"{entry.get('p50_ms', 0):>5} {entry.get('p90_ms', 0):>5} {entry.get('p99_ms', 0):>5} "
+                     f"{pss / 1024 if pss else 0:>7.1f}")
+    return "\n".join(lines)
+
+def format_trend(path=TREND_FILE, runs=10):
+    """Jank %, p90 frame time and PSS of every view over the latest runs"""
+    if not os.path.exists(path):
+        return f"No trend file {path}"
+    with open(path, 'r', encoding='utf-8') as f:
+        history = [json.loads(line) for line in f if line.strip()][-runs:]
+    views = []
+    for run in history:
+        views += [view for view in run['views'] if view not in views]
+    lines = []
+    for view in views:
+        lines.append(view)
+        for run in history:
+            stats = run['views'].get(view)
+            if stats:
+                pss = stats.get('pss_kb')
+                lines.append(f"  {run['timestamp']}  jank {stats.get('jank_percent', 0):5.2f}%  "
+                             f"p90 {stats.get('p90_ms', 0):>3} ms  PSS {pss / 1024 if pss else 0:6.1f} MB")
+    return "\n".join(lines)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Per-view rendering and memory profile of the weather app')
+    parser.add_argument('--trend', action='store_true', help='Print the per-view trend')
+    parser.add_argument('--trend-file', default=TREND_FILE, help='Trend file (JSON lines)')
+    parser.add_argument('--runs', type=int, default=10, help='Runs shown in the trend')
+    parser.add_argument('--view', help='Profile the screen currently on the device for --seconds')
+    parser.add_argument('--seconds', type=float, default=5, help='Profiling window of --view')
+    args = parser.parse_args()
+
+    if args.view:
+        profiler = RenderProfiler(enabled=True)
+        with profiler.profile(args.view):
+            time.sleep(args.seconds)
+        profiler.close(args.trend_file)
+    if args.trend or not args.view:
+        print(format_trend(args.trend_file, args.runs))
+    sys.exit(0)
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Robot to Allure - Streaming conversion of Robot Framework results into allure-results
+1. Reads output.xml (Robot 6 and 7 formats) or an xunit file with an incremental XML parser;
+   every element is dropped as soon as it has been converted, so memory stays flat.
+2. Writes one Allure result per test with keywords as nested steps, suite setup/teardown as
+   fixture containers, and tags, documentation and failure messages.
+3. Screenshots logged by Capture Page Screenshot (the Save Screenshot keyword) become Allure
+   attachments, from files next to output.xml or embedded base64 images.
+Then one allure generate (or allure_operations.py --generate) covers pytest and Robot results.
+"""
+
+import argparse
+import base64
+import hashlib
+import html
+import json
+import mimetypes
+import os
+import re
+import shutil
+import socket
+import sys
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+# output.xml elements converted into Allure steps (<variable> is the VAR statement; <var> is a child of FOR/ITER/VAR)
+STEP_TAGS = {'kw', 'for', 'iter', 'if', 'branch', 'try', 'while', 'group', 'variable', 'return', 'break', 'continue'}
+STATUS_MAP = {'PASS': 'passed', 'FAIL': 'failed', 'SKIP': 'skipped', 'NOT RUN': 'skipped', 'NOT_RUN': 'skipped'}
+IMAGE_PATTERN = re.compile(r'<img[^>]+src="([^"]+)"', re.IGNORECASE)
+
+def log_message(message, verbose=True):
+    """Print message for GitHub Actions UI"""
+    if verbose:
+        print(f"[ROBOT-ALLURE] {message}")
+        sys.stdout.flush()
+
+def parse_timestamp(value):
+    """Epoch milliseconds of a Robot timestamp ('2024-01-31T12:00:00.123456' or '20240131 12:00:00.123')"""
+    if not value or value == 'N/A':
+        return None
+    for pattern in ('%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S', '%Y%m%d %H:%M:%S.%f', '%Y%m%d %H:%M:%S'):
+        try:
+            return int(datetime.strptime(value, pattern).timestamp() * 1000)
+        except ValueError:
+            continue
+    return None
+
+def status_times(element):
+    """(start, stop) in epoch ms from a <status> element of either output.xml format"""
+    if element.get('start') is not None:
+        start = parse_timestamp(element.get('start'))
+        elapsed = float(element.get('elapsed') or 0)
+        return start, start + int(elapsed * 1000) if start is not None else None
+    return parse_timestamp(element.get('starttime')), parse_timestamp(element.get('endtime'))
+
+def stable_id(*parts):
+    return hashlib.md5("\x00".join(parts).encode('utf-8')).hexdigest()
+
+class RobotToAllure:
+    """Converts one Robot result file into files in an allure-results directory"""
+
+    def __init__(self, source, results_dir="allure-results", verbose=True):
+        self.source = source
+        self.source_dir = os.path.dirname(os.path.abspath(source))
+        self.results_dir = results_dir
+        self.verbose = verbose
+        self.host = socket.gethostname()
+        self.tests = 0
+        self.attachments = 0
+        self.containers = 0
+        os.makedirs(results_dir, exist_ok=True)
+
+    # --- output files -----------------------------------------------------
+    def _write_json(self, name, data):
+        with open(os.path.join(self.results_dir, name), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def _attach_image(self, src, name):
+        """Copy or decode a logged screenshot into allure-results; returns the Allure attachment or None"""
+        if src.startswith('data:'):
+            header, _, payload = src.partition(',')
+            mime = header[5:].split(';')[0] or 'image/png'
+            target = f"{uuid.uuid4()}-attachment{mimetypes.guess_extension(mime) or '.png'}"
+            with open(os.path.join(self.results_dir, target), 'wb') as f:
+                f.write(base64.b64decode(payload))
+        else:
+            path = os.path.join(self.source_dir, html.unescape(src))
+            if not os.path.isfile(path):
+                return None
+            mime = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            target = f"{uuid.uuid4()}-attachment{os.path.splitext(path)[1]}"
+            shutil.copyfile(path, os.path.join(self.results_dir, target))
+        self.attachments += 1
+        return {'name': name, 'source': target, 'type': mime}
+
+    # --- frames -----------------------------------------------------------
+    @staticmethod
+    def _frame(name):
+        return {'name': name, 'status': 'unknown', 'statusDetails': {}, 'stage': 'finished',
+                'steps': [], 'attachments': [], 'parameters': []}
+
+    @staticmethod
+    def _step_name(element):
+        name = element.get('name')
+        owner = element.get('owner') or element.get('library')
+        if element.tag == 'variable':
+            return f"VAR {name}"
+        if name:
+            return f"{owner}.{name}" if owner else name
+        label = element.get('type') if element.tag == 'branch' and element.get('type') else element.tag.upper()
+        detail = element.get('condition') or element.get('flavor')
+        return f"{label} {detail}" if detail else label
+
+    def _apply_status(self, frame, element):
+        frame['status'] = STATUS_MAP.get(element.get('status'), 'broken')
+        frame['start'], frame['stop'] = status_times(element)
+        if element.text and element.text.strip():
+            frame['statusDetails'] = {'message': element.text.strip()}
+
+    # --- output.xml -------------------------------------------------------
+    def convert(self):
+        """Stream the file and write the Allure results; returns the number of tests converted"""
+        start = time.monotonic()
+        context = ET.iterparse(self.source, events=('start', 'end'))
+        _, root = next(context)
+        if root.tag in ('testsuite', 'testsuites'):
+            self._convert_xunit(context, root)
+        else:
+            self._convert_output(context, root)
+        log_message(f"{self.source}: {self.tests} tests, {self.containers} fixture containers and "
+                    f"{self.attachments} attachments written to {self.results_dir} in {time.monotonic() - start:.2f}s",
+                    self.verbose)
+        return self.tests
+
+    def _convert_output(self, context, root):
+        elements = [root]
+        suites = []   # {'name', 'longname', 'tests': [uuids], 'befores', 'afters'}
+        frames = []   # open test and step frames, innermost last
+        owners = []   # output.xml element of each open frame
+
+        for event, element in context:
+            if event == 'start':
+                elements.append(element)
+                if element.tag == 'suite':
+                    parent = suites[-1]['longname'] + "." if suites else ""
+                    suites.append({'name': element.get('name'), 'longname': parent + element.get('name', ''),
+                                   'tests': [], 'befores': [], 'afters': [], 'source': element.get('source')})
+                elif element.tag == 'test':
+                    frames = [self._frame(element.get('name'))]
+                    frames[0].update({'tags': [], 'doc': None})
+                    owners = [element]
+                elif element.tag in STEP_TAGS:
+                    frame = self._frame(self._step_name(element))
+                    frame['type'] = element.get('type')
+                    frames.append(frame)
+                    owners.append(element)
+                continue
+
+            elements.pop()
+            tag = element.tag
+            parent = elements[-1] if elements else None
+            owned = bool(owners) and parent is owners[-1]
+            if tag == 'status' and owned:
+                self._apply_status(frames[-1], element)
+            elif tag == 'status' and parent is not None and parent.tag == 'suite' and suites:
+                suites[-1]['start'], suites[-1]['stop'] = status_times(element)
+            elif tag == 'var' and owned and parent.tag == 'iter' and element.get('name'):
+                frames[-1]['name'] += f" {element.get('name')} = {element.text or ''}"
+            elif tag == 'var' and owned and parent.tag == 'variable':
+                frames[-1]['parameters'].append({'name': parent.get('name'), 'value': element.text or ""})
+            elif tag == 'arg' and frames:
+                frames[-1]['parameters'].append({'name': f"arg{len(frames[-1]['parameters']) + 1}",
+                                                 'value': element.text or ""})
+            elif tag == 'msg' and frames:
+                if element.get('html') in ('true', 'yes'):
+                    for src in IMAGE_PATTERN.findall(element.text or ""):
+                        attachment = self._attach_image(src, os.path.basename(src) if not src.startswith('data:') else "screenshot")
+                        if attachment:
+                            frames[-1]['attachments'].append(attachment)
+                elif element.get('level') in ('FAIL', 'ERROR') and not frames[-1]['statusDetails']:
+                    frames[-1]['statusDetails'] = {'message': element.text or ""}
+            elif tag == 'doc' and frames and 'tags' in frames[-1]:
+                frames[-1]['doc'] = element.text
+            elif tag == 'tag' and frames and 'tags' in frames[-1]:
+                frames[-1]['tags'].append(element.text)
+            elif tag in STEP_TAGS and frames:
+                step = frames.pop()
+                owners.pop()
+                step_type = step.pop('type', None)
+                if frames:
+                    frames[-1]['steps'].append(step)
+                elif step_type == 'SETUP' and suites:
+                    suites[-1]['befores'].append(step)
+                elif step_type == 'TEARDOWN' and suites:
+                    suites[-1]['afters'].append(step)
+            elif tag == 'test' and frames:
+                self._write_test(frames.pop(), suites)
+                frames, owners = [], []
+            elif tag == 'suite' and suites:
+                self._write_container(suites.pop())
+
+            # Converted: drop the element so the tree never grows
+            if elements:
+                elements[-1].remove(element)
+
+    def _write_test(self, test, suites):
+        suite = suites[-1] if suites else {'name': 'Robot', 'longname': 'Robot', 'tests': []}
+        test_uuid = str(uuid.uuid4())
+        full_name = f"{suite['longname']}.{test['name']}"
+        labels = [{'name': 'suite', 'value': suite['name']},
+                  {'name': 'framework', 'value': 'robotframework'},
+                  {'name': 'language', 'value': 'python'},
+                  {'name': 'host', 'value': self.host},
+                  {'name': 'package', 'value': suite['longname']}]
+        if len(suites) > 1:
+            labels.append({'name': 'parentSuite', 'value': suites[0]['name']})
+        labels += [{'name': 'tag', 'value': tag} for tag in test.pop('tags') if tag]
+        doc = test.pop('doc')
+        if doc:
+            test['description'] = doc
+        test.update({
+            'uuid': test_uuid,
+            'historyId': stable_id(full_name),
+            'testCaseId': stable_id(full_name),
+            'fullName': full_name,
+            'labels': labels
+        })
+        self._write_json(f"{test_uuid}-result.json", test)
+        suite['tests'].append(test_uuid)
+        self.tests += 1
+
+    def _write_container(self, suite):
+        if not suite['tests'] or not (suite['befores'] or suite['afters']):
+            return
+        container = {'uuid': str(uuid.uuid4()), 'name': suite['name'], 'children': suite['tests'],
+                     'befores': suite['befores'], 'afters': suite['afters'],
+                     'start': suite.get('start'), 'stop': suite.get('stop')}
+        self._write_json(f"{container['uuid']}-container.json", container)
+        self.containers += 1
+
+    # --- xunit ------------------------------------------------------------
+    def _convert_xunit(self, context, root):
+        elements = [root]
+        suite_names, clock = [], None
+        if root.tag == 'testsuite':
+            suite_names.append(root.get('name', 'Robot'))
+            clock = parse_timestamp(root.get('timestamp'))
+        failure = None
+
+        for event, element in context:
+            if event == 'start':
+                elements.append(element)
+                if element.tag == 'testsuite':
+                    suite_names.append(element.get('name', 'Robot'))
+                    clock = parse_timestamp(element.get('timestamp')) or clock
+                elif element.tag == 'testcase':
+                    failure = None
+                continue
+
+            elements.pop()
+            if element.tag in ('failure', 'error'):
+                failure = ('failed' if element.tag == 'failure' else 'broken',
+                           element.get('message') or (element.text or "").strip())
+            elif element.tag == 'skipped':
+                failure = ('skipped', element.get('message') or "")
+            elif element.tag == 'testcase':
+                suite = element.get('classname') or (suite_names[-1] if suite_names else 'Robot')
+                duration = int(float(element.get('time') or 0) * 1000)
+                start = clock if clock is not None else int(time.time() * 1000)
+                clock = start + duration
+                full_name = f"{suite}.{element.get('name')}"
+                test_uuid = str(uuid.uuid4())
+                self._write_json(f"{test_uuid}-result.json", {
+                    'uuid': test_uuid, 'historyId': stable_id(full_name), 'testCaseId': stable_id(full_name),
+                    'name': element.get('name'), 'fullName': full_name,
+                    'status': failure[0] if failure else 'passed',
+                    'statusDetails': {'message': failure[1]} if failure and failure[1] else {},
+                    'stage': 'finished', 'start': start, 'stop': start + duration,
+                    'steps': [], 'attachments': [], 'parameters': [],
+                    'labels': [{'name': 'suite', 'value': suite.split('.')[-1]}, {'name': 'package', 'value': suite},
+                               {'name': 'framework', 'value': 'robotframework'}, {'name': 'host', 'value': self.host}]
+                })
+                self.tests += 1
+            elif element.tag == 'testsuite' and suite_names:
+                suite_names.pop()
+            if elements:
+                elements[-1].remove(element)
+
+def convert(source, results_dir="allure-results", verbose=True):
+    """Convert a Robot output.xml or xunit file into allure-results; returns the number of tests"""
+    return RobotToAllure(source, results_dir, verbose).convert()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert Robot Framework results into Allure results')
+    parser.add_argument('sources', nargs='+', help='Robot output.xml or xunit files')
+    parser.add_argument('--results-dir', default='allure-results', help='Allure results directory')
+    args = parser.parse_args()
+
+    total = sum(convert(source, args.results_dir) for source in args.sources)
+    sys.exit(0 if total else 1)
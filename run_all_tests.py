@@ -1,27 +1,213 @@
+import argparse
+import json
+import os
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from package_inventory import PackageInventory
+from process_runner import stop_process_tree
 
-test_files = [
-    "Any_App_Installation_From_GP_automation.py",
-    "Test_features_automation.py",
+# Test suites and what they depend on; independent suites run at the same time.
+# depends_on: suites that must pass first. after: suites that must only have finished first.
+# requires_packages: packages that must be installed on the device when the suite starts.
+SUITES = [
+    {
+        "name": "install",
+        "command": [sys.executable, "Any_App_Installation_From_GP_automation.py"],
+        "depends_on": [],
+        "timeout": 900,
+    },
+    {
+        # Features for fi.sbweather.app need that package installed, not every install to succeed
+        "name": "features",
+        "command": [sys.executable, "Test_features_automation.py"],
+        "depends_on": [],
+        "after": ["install"],
+        "requires_packages": ["fi.sbweather.app"],
+        "timeout": 600,
+    },
 ]
 
-print("\n\n🚀 Starting all tests...\n")
-
-all_passed = True
-
-for test_file in test_files:
-    print(f"📋 Running {test_file}...")
-    try:
-        result = subprocess.run([sys.executable, test_file], check=True)
-        print(f"✅ {test_file} passed!\n")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {test_file} failed with exit code: {e.returncode}")
-        all_passed = False
-
-if all_passed:
-    print("🎉 All tests completed successfully!")
-    sys.exit(0)
-else:
-    print("💥 Some tests failed.")
-    sys.exit(1)
\ No newline at end of file
+def validate_suites(suites):
+    """Check that every dependency exists and that the dependencies contain no cycles"""
+    names = {suite["name"] for suite in suites}
+    depends = {suite["name"]: suite.get("depends_on", []) + suite.get("after", []) for suite in suites}
+    for name, deps in depends.items():
+        for dep in deps:
+            if dep not in names:
+                raise ValueError(f"Suite '{name}' depends on unknown suite '{dep}'")
+
+    visiting, done = set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle through suite '{name}'")
+        visiting.add(name)
+        for dep in depends[name]:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in depends:
+        visit(name)
+
+class SuiteScheduler:
+    """Runs suites as a dependency graph with a concurrency limit, timeouts and optional fail-fast"""
+
+    def __init__(self, suites, max_workers=2, fail_fast=False):
+        validate_suites(suites)
+        self.suites = {suite["name"]: suite for suite in suites}
+        self.max_workers = max_workers
+        self.fail_fast = fail_fast
+        self.results = {}
+        self._processes = {}
+        self._lock = threading.Lock()
+        self._inventory = None
+        self._inventory_lock = threading.Lock()
+        self._stopping = False
+        self._start = None
+
+    def _run_suite(self, suite):
+        """Run one suite process and return its result record"""
+        name = suite["name"]
+        started = time.monotonic()
+        status, return_code = "passed", 0
+        missing = self._missing_packages(suite)
+        if missing:
+            print(f"⏭️ Skipping {name}: {', '.join(missing)} not installed")
+            return self._record(name, "skipped", None, started, time.monotonic())
+        with self._lock:
+            if self._stopping:
+                return self._record(name, "skipped", None, started, started)
+            # Own session so that stop_process_tree also stops the adb and Appium children of the suite
+            process = subprocess.Popen(suite["command"], start_new_session=(os.name != "nt"))
+            self._processes[name] = process
+        print(f"📋 Running {name}: {' '.join(suite['command'][1:])}...")
+        try:
+            return_code = process.wait(timeout=suite.get("timeout"))
+            if return_code != 0:
+                status = "failed"
+        except subprocess.TimeoutExpired:
+            stop_process_tree(process)
+            status, return_code = "timeout", process.returncode
+        finally:
+            with self._lock:
+                self._processes.pop(name, None)
+        if self._stopping and status != "passed":
+            status = "cancelled"
+        return self._record(name, status, return_code, started, time.monotonic())
+
+    def _missing_packages(self, suite):
+        """Packages of requires_packages not installed right now; a failed check lets the suite run"""
+        packages = suite.get("requires_packages", [])
+        if not packages:
+            return []
+        with self._inventory_lock:
+            if self._inventory is None:
+                self._inventory = PackageInventory()
+            try:
+                return self._inventory.missing(packages, refresh=True)
+            except (OSError, RuntimeError, TimeoutError) as e:
+                print(f"⚠️ Could not check installed packages for {suite['name']}: {e}")
+                return []
+
+    def _record(self, name, status, return_code, started, finished):
+        return {
+            "name": name,
+            "status": status,
+            "return_code": return_code,
+            "depends_on": self.suites[name].get("depends_on", []),
+            "after": self.suites[name].get("after", []),
+            "start_offset": round(started - self._start, 3),
+            "duration": round(finished - started, 3),
+        }
+
+    def _stop_running(self):
+        """Stop all running suites and their child processes (fail-fast or interrupt)"""
+        with self._lock:
+            self._stopping = True
+            processes = list(self._processes.values())
+        for process in processes:
+            stop_process_tree(process)
+
+    def run(self):
+        """Run all suites and return the result records in completion order"""
+        self._start = time.monotonic()
+        pending = dict(self.suites)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                while pending or running:
+                    for name, suite in list(pending.items()):
+                        dep_results = [self.results.get(dep) for dep in suite.get("depends_on", [])]
+                        after_results = [self.results.get(dep) for dep in suite.get("after", [])]
+                        if self._stopping or any(r and r["status"] != "passed" for r in dep_results):
+                            # A dependency failed (or fail-fast triggered): this suite cannot run
+                            now = time.monotonic()
+                            self.results[name] = self._record(name, "skipped", None, now, now)
+                            print(f"⏭️ Skipping {name}")
+                            del pending[name]
+                        elif all(dep_results) and all(after_results):
+                            running[executor.submit(self._run_suite, suite)] = name
+                            del pending[name]
+
+                    if not running:
+                        continue
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        name = running.pop(future)
+                        result = future.result()
+                        self.results[name] = result
+                        if result["status"] == "passed":
+                            print(f"✅ {name} passed in {result['duration']:.1f}s!\n")
+                        else:
+                            print(f"❌ {name} {result['status']} (exit code: {result['return_code']})")
+                            if self.fail_fast and not self._stopping:
+                                print("🛑 Fail-fast: stopping remaining suites")
+                                self._stop_running()
+            except BaseException:
+                # e.g. Ctrl+C: suites run in their own sessions and would not get the signal
+                self._stop_running()
+                raise
+
+        if self._inventory:
+            self._inventory.close()
+        return list(self.results.values())
+
+def write_summary(results, path, wall_time):
+    """Write a machine-readable run summary"""
+    summary = {
+        "passed": all(result["status"] == "passed" for result in results),
+        "wall_time": round(wall_time, 3),
+        "suites": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    print(f"📄 Summary written to {path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run all test suites as a dependency graph")
+    parser.add_argument("--max-workers", type=int, default=2, help="Maximum number of suites running at once")
+    parser.add_argument("--fail-fast", action="store_true", help="Stop all suites after the first failure")
+    parser.add_argument("--summary", default="run-summary.json", help="Path of the JSON summary file")
+    args = parser.parse_args()
+
+    print("\n\n🚀 Starting all tests...\n")
+    start = time.monotonic()
+    results = SuiteScheduler(SUITES, args.max_workers, args.fail_fast).run()
+    write_summary(results, args.summary, time.monotonic() - start)
+
+    if all(result["status"] == "passed" for result in results):
+        print("🎉 All tests completed successfully!")
+        sys.exit(0)
+    else:
+        print("💥 Some tests failed.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
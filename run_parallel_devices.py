@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Parallel Device Runner - Split the feature suites across all attached Android devices
+1. Discovers devices with adb devices and gives each its own Appium port and systemPort.
+2. Splits the pytest tests and the Test_features_automation.py script into per-device shards.
+3. Runs the shards in parallel; all pytest shards write to one shared allure-results directory.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from devices import list_devices, assign_ports, device_env, start_appium_server
+from process_runner import stop_process_tree
+
+PYTEST_SUITE = "Test_features_automation_allure.py"
+SCRIPT_SUITE = "Test_features_automation.py"
+INSTALLER = "Any_App_Installation_From_GP_automation.py"
+
+# Rough relative cost of one unit, used to balance the shards
+SCRIPT_WEIGHT = 8
+PYTEST_TEST_WEIGHT = 1
+
+def log_message(message, verbose=True):
+    """Print message for GitHub Actions UI"""
+    if verbose:
+        print(f"[PARALLEL] {message}")
+        sys.stdout.flush()
+
+def collect_pytest_tests(suite=PYTEST_SUITE):
+    """Return pytest node ids of the suite without running it"""
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "--collect-only", "-q", suite],
+        capture_output=True, text=True
+    )
+    return [line.strip() for line in result.stdout.splitlines() if "::" in line]
+
+def build_shards(device_count, test_ids, include_script=True):
+    """
+    Split work units across devices, longest first onto the least loaded device.
+    Returns a list with one {'script': bool, 'tests': [...], 'load': n} per device.
+    """
+    shards = [{'script': False, 'tests': [], 'load': 0} for _ in range(device_count)]
+    units = [(PYTEST_TEST_WEIGHT, test_id) for test_id in test_ids]
+    if include_script:
+        units.append((SCRIPT_WEIGHT, None))
+    units.sort(key=lambda unit: unit[0], reverse=True)
+
+    for weight, test_id in units:
+        shard = min(shards, key=lambda s: s['load'])
+        if test_id is None:
+            shard['script'] = True
+        else:
+            shard['tests'].append(test_id)
+        shard['load'] += weight
+    return shards
+
+def run_shard(device, shard, results_dir, install, outcome, verbose):
+    """Run one device's shard sequentially and store its result in outcome"""
+    env = device_env(device, os.environ)
+    serial = device['serial']
+    start = time.monotonic()
+    return_codes = []
+
+    commands = []
+    if install:
+        commands.append([sys.executable, "-u", INSTALLER])
+    if shard['tests']:
+        commands.append([sys.executable, "-m", "pytest", "-v", f"--alluredir={results_dir}"] + shard['tests'])
+    if shard['script']:
+        commands.append([sys.executable, "-u", SCRIPT_SUITE])
+
+    for command in commands:
+        log_message(f"{serial}: {' '.join(command[1:4])}...", verbose)
+        return_codes.append(subprocess.run(command, env=env).returncode)
+
+    outcome[serial] = {
+        'return_codes': return_codes,
+        'passed': all(code == 0 for code in return_codes),
+        'seconds': round(time.monotonic() - start, 1),
+        'tests': len(shard['tests']),
+        'script': shard['script']
+    }
+
+def main():
+    """Main function to run the suites on all devices"""
+    parser = argparse.ArgumentParser(description='Run feature suites in parallel on all attached devices')
+    parser.add_argument('--devices', nargs='*', help='Device serials to use (default: all from adb devices)')
+    parser.add_argument('--start-appium', action='store_true', help='Start one Appium server per device')
+    parser.add_argument('--appium-command', default='appium', help='Command used to start Appium')
+    parser.add_argument('--install', action='store_true', help='Run the Play Store installer on every device first')
+    parser.add_argument('--no-script', action='store_true', help=f'Do not run {SCRIPT_SUITE}')
+    parser.add_argument('--results-dir', default='allure-results', help='Shared Allure results directory')
+    parser.add_argument('--verbose', action='store_true', help='Enable verbose output')
+    args = parser.parse_args()
+    verbose = args.verbose
+
+    serials = args.devices or list_devices()
+    if not serials:
+        print("No devices connected")
+        sys.exit(1)
+    devices = assign_ports(serials)
+    for device in devices:
+        log_message(f"Device {device['serial']}: Appium {device['server_url']}, systemPort {device['system_port']}", verbose)
+
+    appium_processes = []
+    if args.start_appium:
+        for device in devices:
+            appium_processes.append(start_appium_server(
+                device['appium_port'], args.appium_command, f"appium-{device['appium_port']}.log"
+            ))
+            log_message(f"Appium server ready on port {device['appium_port']}", verbose)
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    shards = build_shards(len(devices), collect_pytest_tests(), include_script=not args.no_script)
+
+    start = time.monotonic()
+    outcome = {}
+    threads = [
+        threading.Thread(target=run_shard, args=(device, shard, args.results_dir, args.install, outcome, verbose))
+        for device, shard in zip(devices, shards)
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        for process in appium_processes:
+            stop_process_tree(process)
+
+    print("\n" + "="*70)
+    print("PARALLEL RUN SUMMARY")
+    print("="*70)
+    for serial, result in outcome.items():
+        script = " + script" if result['script'] else ""
+        status = "PASSED" if result['passed'] else "FAILED"
+        print(f"{serial}: {result['tests']} tests{script} in {result['seconds']}s - {status}")
+    print(f"Total wall time: {time.monotonic() - start:.1f}s on {len(devices)} devices")
+    print(f"Allure results: {args.results_dir}")
+    print("="*70)
+
+    all_passed = len(outcome) == len(devices) and all(result['passed'] for result in outcome.values())
+    sys.exit(0 if all_passed else 1)
+
+if __name__ == '__main__':
+    main()
@@ -1,28 +1,157 @@
 # run_robot_tests.py
-import subprocess
+import argparse
 import sys
 import os
+from devices import list_devices, assign_ports, device_env, start_appium_server
+from process_runner import run_process, run_many, print_runtimes, stop_process_tree
+from robot_to_allure import convert
 
-def run_robot_tests():
+ROBOT_SUITE = "weather_app_tests.robot"
+ROBOT_NAME = "Weather App Tests"
+
+# Seconds before a hung robot run is stopped: in total and without any output
+ROBOT_TIMEOUT = 1800
+ROBOT_IDLE_TIMEOUT = 300
+
+# Testit, joilla on sama group:-tagi, jakavat tilan (esim. haku -> säätiedot) ja ajetaan samassa workerissa
+GROUP_TAG_PREFIX = "group:"
+
+def report_result(result):
+    print(f"{result['name']} {result['status']} (exit code {result['return_code']}) in {result['duration']:.1f}s")
+    if result['status'] not in ("passed", "failed"):
+        print("Last output:")
+        print("\n".join(result['tail']))
+
+def run_robot_tests(timeout=ROBOT_TIMEOUT, idle_timeout=ROBOT_IDLE_TIMEOUT, allure_results="allure-results"):
     # Luo output-kansio raporteille
     output_dir = "robot-reports"
     os.makedirs(output_dir, exist_ok=True)
-    
-    # Aja Robot Framework -testit
-    result = subprocess.run([
-        "robot", 
+
+    # Aja Robot Framework -testit, tuloste näkyy rivi kerrallaan
+    result = run_process([
+        "robot",
         "--outputdir", output_dir,
         "--log", "robot-log.html",
         "--report", "robot-report.html",
         "--xunit", "robot-xunit.xml",
-        "weather_app_tests.robot"
-    ], capture_output=True, text=True)
-    
-    print("STDOUT:", result.stdout)
-    if result.stderr:
-        print("STDERR:", result.stderr)
-    
-    return result.returncode
+        ROBOT_SUITE
+    ], name="robot", timeout=timeout, idle_timeout=idle_timeout)
+    report_result(result)
+
+    # Muunna tulokset allure-results-kansioon, jotta sama Allure-raportti kattaa myös pytestin
+    output_xml = os.path.join(output_dir, "output.xml")
+    if allure_results and os.path.exists(output_xml):
+        convert(output_xml, allure_results)
+
+    return result['return_code']
+
+def collect_test_groups(suite=ROBOT_SUITE):
+    """Testit ryhmiin: group:-tagin testit pysyvät yhdessä, muut ovat omia ryhmiään (tiedoston järjestyksessä)"""
+    from robot.api import TestSuiteBuilder
+    groups = {}
+    for test in TestSuiteBuilder().build(suite).all_tests:
+        key = next((tag for tag in test.tags if tag.startswith(GROUP_TAG_PREFIX)), test.name)
+        groups.setdefault(key, []).append(test.name)
+    return list(groups.values())
+
+def split_groups(groups, worker_count):
+    """Jaa ryhmät workereille, suurin ensin vähiten kuormitetulle"""
+    shards = [[] for _ in range(min(worker_count, len(groups)))]
+    for group in sorted(groups, key=len, reverse=True):
+        min(shards, key=len).extend(group)
+    return shards
+
+def run_robot_tests_parallel(devices, timeout=ROBOT_TIMEOUT, idle_timeout=ROBOT_IDLE_TIMEOUT,
+                             allure_results="allure-results"):
+    """Aja testit rinnakkain, yksi robot-prosessi laitetta kohden, ja yhdistä tulokset rebotilla"""
+    output_dir = "robot-reports"
+    os.makedirs(output_dir, exist_ok=True)
+
+    shards = split_groups(collect_test_groups(), len(devices))
+    commands, outputs = [], []
+    for index, (device, tests) in enumerate(zip(devices, shards), start=1):
+        output = f"worker-{index}.xml"
+        outputs.append(os.path.join(output_dir, output))
+        if os.path.exists(outputs[-1]):
+            os.remove(outputs[-1])
+        command = [
+            "robot",
+            # Yhteinen outputdir: kuvakaappaukset ja niiden linkit osuvat yhdistettyyn lokiin
+            "--outputdir", output_dir,
+            "--output", output,
+            "--log", "NONE",
+            "--report", "NONE",
+            "--variable", f"APPIUM_SERVER:{device['server_url']}",
+            "--variable", f"DEVICE_UDID:{device['serial']}",
+            "--variable", f"SYSTEM_PORT:{device['system_port']}"
+        ]
+        for test in tests:
+            command += ["--test", test]
+        command.append(ROBOT_SUITE)
+        print(f"worker-{index} ({device['serial']}): {len(tests)} tests")
+        commands.append({
+            'command': command,
+            'name': f"robot-{device['serial']}",
+            'timeout': timeout,
+            'idle_timeout': idle_timeout,
+            'env': device_env(device, os.environ)
+        })
+
+    results = run_many(commands)
+    for result in results:
+        report_result(result)
+    print_runtimes(results)
+
+    outputs = [output for output in outputs if os.path.exists(output)]
+    if not outputs:
+        return 1
+
+    # Yksi loki, raportti ja xunit kaikista workereista
+    merge = run_process([
+        "rebot",
+        "--outputdir", output_dir,
+        "--name", ROBOT_NAME,
+        "--output", "output.xml",
+        "--log", "robot-log.html",
+        "--report", "robot-report.html",
+        "--xunit", "robot-xunit.xml"
+    ] + outputs, name="rebot", timeout=timeout)
+    report_result(merge)
+
+    # Workerien omat tulokset Alluren puolelle: samat historyId:t kuin peräkkäisessä ajossa
+    if allure_results:
+        for output in outputs:
+            convert(output, allure_results)
+
+    failed = any(result['return_code'] != 0 for result in results) or len(outputs) < len(commands)
+    return 1 if failed else merge['return_code']
 
 if __name__ == "__main__":
-    sys.exit(run_robot_tests())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Run the Robot Framework weather app tests')
+    parser.add_argument('--parallel', action='store_true', help='Split the tests across all attached devices')
+    parser.add_argument('--devices', nargs='*', help='Device serials to use (default: all from adb devices)')
+    parser.add_argument('--start-appium', action='store_true', help='Start one Appium server per device')
+    parser.add_argument('--appium-command', default='appium', help='Command used to start Appium')
+    args = parser.parse_args()
+
+    if not args.parallel:
+        sys.exit(run_robot_tests())
+
+    serials = args.devices or list_devices()
+    if not serials:
+        print("No devices connected")
+        sys.exit(1)
+    devices = assign_ports(serials)
+
+    appium_processes = []
+    try:
+        if args.start_appium:
+            for device in devices:
+                appium_processes.append(start_appium_server(
+                    device['appium_port'], args.appium_command, f"appium-{device['appium_port']}.log"
+                ))
+        exit_code = run_robot_tests_parallel(devices)
+    finally:
+        for process in appium_processes:
+            stop_process_tree(process)
+    sys.exit(exit_code)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Screenshot Capture Backends - Where screenshot pixels come from
+1. appium: driver.get_screenshot_as_base64() (PNG encoded on the device, base64 over HTTP).
+2. adb: raw frames streamed through a persistent adb exec-out shell, PNG encoded on the host
+   in the ScreenshotService worker threads instead of on the test thread.
+Select per run with SCREENSHOT_BACKEND=appium|adb, compare with --benchmark.
+"""
+
+import argparse
+import os
+import queue
+import struct
+import subprocess
+import sys
+import threading
+import time
+import uuid
+import zlib
+from package_inventory import adb_command
+
+SCREENSHOT_BACKENDS = ("appium", "adb")
+
+# screencap pixel formats (android PixelFormat) that are 4 bytes per pixel in RGBA order
+RGBA_FORMATS = {1: "RGBA_8888", 2: "RGBX_8888"}
+# Formats whose fourth byte is undefined (may be 0) instead of alpha
+OPAQUE_FORMATS = {2}
+
+class RawFrame:
+    """Uncompressed 4 bytes per pixel frame from screencap; converted to PNG off the test thread"""
+
+    def __init__(self, width, height, pixels, opaque=False):
+        self.width = width
+        self.height = height
+        self.pixels = pixels
+        self.opaque = opaque
+
+    def __len__(self):
+        return len(self.pixels)
+
+    def to_png(self, compression_level=1):
+        """Encode the frame as an RGBA PNG, or RGB when the fourth byte is not alpha"""
+        pixels, channels, color_type = self.pixels, 4, 6
+        if self.opaque:
+            # Drop the X byte: encoded as alpha it could make the screenshot transparent
+            pixels = bytearray(self.pixels)
+            del pixels[3::4]
+            channels, color_type = 3, 2
+        stride = self.width * channels
+        rows = b"".join(
+            b"\x00" + pixels[y * stride:(y + 1) * stride] for y in range(self.height)
+        )
+
+        def chunk(kind, data):
+            return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, color_type, 0, 0, 0)
+        return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+                + chunk(b"IDAT", zlib.compress(rows, compression_level)) + chunk(b"IEND", b""))
+
+class AppiumScreenshotBackend:
+    """Screenshots through the Appium screenshot endpoint"""
+    name = "appium"
+
+    def capture(self, driver):
+        return driver.get_screenshot_as_base64()
+
+    def close(self):
+        pass
+
+class AdbScreencapBackend:
+    """Raw screencap frames through one long-lived adb exec-out shell"""
+    name = "adb"
+
+    def __init__(self, serial=None, timeout=15):
+        self.serial = serial or os.environ.get("ANDROID_SERIAL")
+        self.timeout = timeout
+        self.process = None
+        self._chunks = queue.Queue()
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+
+    def _start(self):
+        # exec-out gives a binary-safe channel without a pty, stdin stays open for more commands
+        self.process = subprocess.Popen(
+            adb_command(self.serial) + ["exec-out", "sh"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        self._chunks = queue.Queue()
+        self._buffer = bytearray()
+        threading.Thread(target=self._read_output, args=(self.process, self._chunks), daemon=True).start()
+
+    @staticmethod
+    def _read_output(process, chunks):
+        # read1 returns what is available, so the queue gets data as soon as adb writes it
+        while True:
+            chunk = process.stdout.read1(1024 * 1024)
+            if not chunk:
+                break
+            chunks.put(chunk)
+        chunks.put(None)
+
+    def _read_exact(self, size, deadline):
+        """Read size bytes from the channel; a silent channel is closed and raises TimeoutError at the deadline"""
+        while len(self._buffer) < size:
+            try:
+                chunk = self._chunks.get(timeout=max(deadline - time.monotonic(), 0.01))
+            except queue.Empty:
+                self._abort()
+                raise TimeoutError(f"screencap gave no frame within {self.timeout}s")
+            if chunk is None:
+                self._abort()
+                raise RuntimeError("adb exec-out channel closed while reading screencap frame")
+            self._buffer += chunk
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def capture(self, driver=None):
+        """Return a RawFrame of the current screen (driver is not needed, kept for the common interface)"""
+        with self._lock:
+            if self.process is None or self.process.poll() is not None:
+                self._start()
+            marker = f"__END_{uuid.uuid4().hex}__\n".encode()
+            self.process.stdin.write(b"screencap; echo " + marker.strip() + b"\n")
+            self.process.stdin.flush()
+            deadline = time.monotonic() + self.timeout
+
+            # Header: width, height, pixel format (+ color space on Android 10+, 4 more bytes)
+            width, height, pixel_format = struct.unpack("<III", self._read_exact(12, deadline))
+            if pixel_format not in RGBA_FORMATS:
+                # The frame size is unknown, so the rest of the output cannot be skipped reliably
+                self._abort()
+                raise ValueError(f"Unsupported screencap pixel format {pixel_format}, "
+                                 f"expected one of {sorted(RGBA_FORMATS.values())}")
+            frame_size = width * height * 4
+            data = self._read_exact(frame_size + len(marker), deadline)
+            while not data.endswith(marker):
+                data += self._read_exact(1, deadline)
+            pixels = data[len(data) - len(marker) - frame_size:len(data) - len(marker)]
+        return RawFrame(width, height, pixels, opaque=pixel_format in OPAQUE_FORMATS)
+
+    def _abort(self):
+        """Kill a stuck or out-of-sync channel; the next capture starts a new one"""
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+        self._buffer = bytearray()
+
+    def close(self):
+        if self.process and self.process.poll() is None:
+            try:
+                self.process.stdin.write(b"exit\n")
+                self.process.stdin.flush()
+                self.process.wait(timeout=2)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+        self.process = None
+        self._buffer = bytearray()
+
+def create_backend(name=None):
+    """Create the capture backend selected by name or SCREENSHOT_BACKEND (default appium)"""
+    name = name or os.environ.get("SCREENSHOT_BACKEND", "appium")
+    if name == "adb":
+        return AdbScreencapBackend()
+    if name == "appium":
+        return AppiumScreenshotBackend()
+    raise ValueError(f"Unknown screenshot backend '{name}', use one of {SCREENSHOT_BACKENDS}")
+
+def benchmark(driver, samples=10):
+    """Time capture (test thread) and PNG encoding (background) for every backend"""
+    import base64
+    results = {}
+    for name in SCREENSHOT_BACKENDS:
+        backend = create_backend(name)
+        capture_times, encode_times = [], []
+        try:
+            backend.capture(driver)  # warm-up, e.g. starting the adb channel
+            for _ in range(samples):
+                start = time.monotonic()
+                frame = backend.capture(driver)
+                capture_times.append(time.monotonic() - start)
+                start = time.monotonic()
+                frame.to_png() if isinstance(frame, RawFrame) else base64.b64decode(frame)
+                encode_times.append(time.monotonic() - start)
+        finally:
+            backend.close()
+        capture_times.sort()
+        results[name] = {
+            'capture_avg_ms': round(sum(capture_times) / samples * 1000, 1),
+            'capture_p50_ms': round(capture_times[samples // 2] * 1000, 1),
+            'capture_max_ms': round(capture_times[-1] * 1000, 1),
+            'encode_avg_ms': round(sum(encode_times) / samples * 1000, 1)
+        }
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Screenshot capture backends')
+    parser.add_argument('--benchmark', type=int, metavar='SAMPLES', default=10, help='Screenshots per backend')
+    args = parser.parse_args()
+
+    from config import create_appium_driver
+    driver = create_appium_driver()
+    try:
+        for name, result in benchmark(driver, args.benchmark).items():
+            print(f"{name:<7} capture avg {result['capture_avg_ms']} ms, p50 {result['capture_p50_ms']} ms, "
+                  f"max {result['capture_max_ms']} ms (test thread) | decode/encode avg {result['encode_avg_ms']} ms (background)")
+    finally:
+        driver.quit()
+    sys.exit(0)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Screenshot Service - Take screenshot encoding and disk writes off the test thread
+1. The test thread only fetches the screenshot (backend chosen with SCREENSHOT_BACKEND, see screencap_backend.py).
+2. A background worker pool decodes, optionally recompresses and writes the image.
+3. Allure attachments are collected and attached on flush() in the test thread.
+4. Queue depth and per-image cost are tracked and printed with summary().
+5. ScreenshotRingBuffer keeps the latest screenshots in memory and persists them only on failure.
+"""
+
+import base64
+import io
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from screencap_backend import RawFrame, create_backend
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Output formats: png = as received, png-optimized = lossless recompression, webp = lossless WebP
+IMAGE_FORMATS = ("png", "png-optimized", "webp")
+
+def log_message(message, verbose=True):
+    """Print message for GitHub Actions UI"""
+    if verbose:
+        print(f"[SCREENSHOTS] {message}")
+        sys.stdout.flush()
+
+def encode_image(png_bytes, image_format="png"):
+    """Return (bytes, extension, mime type) of the image in the wanted format"""
+    if image_format == "png" or Image is None:
+        return png_bytes, "png", "image/png"
+    image = Image.open(io.BytesIO(png_bytes))
+    output = io.BytesIO()
+    if image_format == "webp":
+        image.save(output, format="WEBP", lossless=True, quality=80, method=4)
+        return output.getvalue(), "webp", "image/webp"
+    image.save(output, format="PNG", optimize=True)
+    return output.getvalue(), "png", "image/png"
+
+class ScreenshotService:
+    """Background writer for screenshots; call flush() at teardown"""
+
+    def __init__(self, workers=2, image_format=None, backend=None, verbose=True):
+        self.image_format = image_format or os.environ.get("SCREENSHOT_FORMAT", "png")
+        if self.image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown screenshot format '{self.image_format}', use one of {IMAGE_FORMATS}")
+        if self.image_format != "png" and Image is None:
+            log_message(f"Pillow not installed, saving PNG instead of {self.image_format}", verbose)
+        self.verbose = verbose
+        self.backend = create_backend(backend)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="screenshot")
+        self._pending = []
+        self._lock = threading.Lock()
+        self.stats = {
+            'images': 0,
+            'max_queue_depth': 0,
+            'capture_seconds': 0.0,
+            'encode_seconds': 0.0,
+            'bytes_in': 0,
+            'bytes_out': 0
+        }
+
+    def queue_depth(self):
+        """Number of screenshots not yet written"""
+        with self._lock:
+            return sum(1 for _, future in self._pending if not future.done())
+
+    def grab(self, driver):
+        """Fetch one screenshot with the selected backend (the only part run on the test thread)"""
+        start = time.monotonic()
+        frame = self.backend.capture(driver)
+        with self._lock:
+            self.stats['capture_seconds'] += time.monotonic() - start
+        return frame
+
+    def submit(self, frame, name, dirname=None, attach=False):
+        """Queue an already captured screenshot for background processing"""
+        future = self._executor.submit(self._process, frame, name, dirname, attach)
+        with self._lock:
+            self._pending.append((name, future))
+            depth = sum(1 for _, f in self._pending if not f.done())
+            self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], depth)
+        return future
+
+    def capture(self, driver, name, dirname=None, attach=False):
+        """
+        Fetch a screenshot from the driver and hand it to the worker pool.
+        - dirname: write the image into this directory.
+        - attach: attach the image to the Allure report on flush().
+        """
+        return self.submit(self.grab(driver), name, dirname, attach)
+
+    def _process(self, frame, name, dirname, attach):
+        """Worker: decode, recompress and write one screenshot"""
+        start = time.monotonic()
+        if isinstance(frame, RawFrame):
+            png = frame.to_png()
+        elif isinstance(frame, str):
+            png = base64.b64decode(frame)
+        else:
+            png = frame
+        data, extension, mime_type = encode_image(png, self.image_format)
+        filepath = None
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+            filepath = os.path.join(dirname, f"{name}.{extension}")
+            with open(filepath, "wb") as f:
+                f.write(data)
+            log_message(f"Screenshot saved: {filepath}", self.verbose)
+        with self._lock:
+            self.stats['images'] += 1
+            self.stats['encode_seconds'] += time.monotonic() - start
+            self.stats['bytes_in'] += len(frame)
+            self.stats['bytes_out'] += len(data)
+        return {
+            'name': name,
+            'filepath': filepath,
+            'data': data if attach else None,
+            'extension': extension,
+            'mime_type': mime_type
+        }
+
+    def flush(self):
+        """
+        Wait for all queued screenshots and attach the Allure ones in the calling thread.
+        A screenshot that failed to process is logged and left out; the rest are still attached.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        results = []
+        for name, future in pending:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                log_message(f"Screenshot {name} failed: {e}", self.verbose)
+        attachments = [result for result in results if result['data'] is not None]
+        if attachments:
+            import allure
+            for result in attachments:
+                allure.attach(result['data'], name=result['name'],
+                              attachment_type=result['mime_type'], extension=result['extension'])
+        return results
+
+    def summary(self):
+        """Return a one-line summary of screenshot cost"""
+        images = self.stats['images'] or 1
+        return (f"{self.stats['images']} screenshots, "
+                f"capture {self.stats['capture_seconds'] / images * 1000:.0f} ms/image on test thread, "
+                f"encode+write {self.stats['encode_seconds'] / images * 1000:.0f} ms/image in background, "
+                f"max queue depth {self.stats['max_queue_depth']}, "
+                f"{self.stats['bytes_in'] / 1024:.0f} KB in -> {self.stats['bytes_out'] / 1024:.0f} KB out")
+
+    def close(self):
+        """Flush pending screenshots and stop the workers"""
+        results = self.flush()
+        self._executor.shutdown(wait=True)
+        self.backend.close()
+        log_message(self.summary(), self.verbose)
+        return results
+
+class ScreenshotRingBuffer:
+    """
+    Bounded in-memory buffer of the latest screenshots of one test.
+    - Oldest screenshots are dropped when max_items or max_bytes is exceeded.
+    - persist() writes the buffered lead-up to a failure; clear() forgets it when the test passed.
+    """
+
+    def __init__(self, service, max_items=5, max_bytes=25 * 1024 * 1024):
+        self.service = service
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._items = deque()
+        self._bytes = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, name, frame):
+        """Buffer a captured screenshot (PNG bytes, base64 string or RawFrame)"""
+        self._items.append((name, frame))
+        self._bytes += len(frame)
+        while self._items and (len(self._items) > self.max_items or self._bytes > self.max_bytes):
+            _, dropped = self._items.popleft()
+            self._bytes -= len(dropped)
+            self.dropped += 1
+
+    def capture(self, driver, name):
+        """Fetch a screenshot with the service's backend into the buffer"""
+        self.add(name, self.service.grab(driver))
+
+    def persist(self, dirname=None, attach=False):
+        """Hand all buffered screenshots to the ScreenshotService and empty the buffer"""
+        futures = [self.service.submit(frame, name, dirname, attach) for name, frame in self._items]
+        self.clear()
+        return futures
+
+    def clear(self):
+        self._items.clear()
+        self._bytes = 0
@@ -0,0 +1,29 @@
+from app_perf import find_regressions, parse_am_start
+
+AM_START_W = """Starting: Intent { cmp=fi.sbweather.app/.MainActivity }
+Status: ok
+LaunchState: COLD
+Activity: fi.sbweather.app/.MainActivity
+TotalTime: 812
+WaitTime: 830
+Complete"""
+
+def test_parse_am_start():
+    assert parse_am_start(AM_START_W.splitlines()) == {'LaunchState': "COLD", 'TotalTime': 812, 'WaitTime': 830}
+
+def test_parse_am_start_without_wait():
+    assert parse_am_start(["Starting: Intent { cmp=fi.sbweather.app/.MainActivity }"]) == {}
+    assert parse_am_start(["Error: Activity class {fi.sbweather.app/.Missing} does not exist."]) == {}
+
+def run(p50, device="emulator-5554", screen="1080x2400", metric="cold_start_total_time"):
+    return {'device': device, 'screen': screen, 'metrics': {metric: {'p50': p50}}}
+
+def test_find_regressions_against_median_of_same_device():
+    history = [run(800), run(820), run(790), run(2000, device="other")]
+    assert find_regressions(run(830), history) == []
+    assert find_regressions(run(1100), history) == [
+        {'metric': "cold_start_total_time", 'p50': 1100, 'baselineP50': 800}]
+
+def test_find_regressions_needs_history():
+    assert find_regressions(run(5000), []) == []
+    assert find_regressions(run(5000), [run(800, screen="720x1600")]) == []
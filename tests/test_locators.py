@@ -0,0 +1,36 @@
+import pytest
+from appium.webdriver.common.appiumby import AppiumBy
+from locators import compile_locator, compile_xpath
+
+@pytest.mark.parametrize("xpath, selector", [
+    ("//android.widget.ImageView", 'new UiSelector().className("android.widget.ImageView")'),
+    ("//*[@content-desc='KOTI\nTab 1 of 3']", 'new UiSelector().description("KOTI\nTab 1 of 3")'),
+    ("//*[contains(@content-desc, 'ENNÄTYKSET')]", 'new UiSelector().descriptionContains("ENNÄTYKSET")'),
+    ("//*[starts-with(@text, 'Oulu')]", 'new UiSelector().textStartsWith("Oulu")'),
+    ("//android.widget.EditText[@text='Oulu']",
+     'new UiSelector().className("android.widget.EditText").text("Oulu")'),
+    ("//*[@text='Asenna' and @resource-id='com.android.vending:id/button']",
+     'new UiSelector().text("Asenna").resourceId("com.android.vending:id/button")'),
+    ("//*[contains(@text, 'Install') or contains(@text, 'INSTALL')]",
+     'new UiSelector().textMatches("(?s)(?:.*Install.*|.*INSTALL.*)")'),
+    ("//*[@text='a.b' or starts-with(@text, 'c')]", 'new UiSelector().textMatches("(?s)(?:a\\\\.b|c.*)")'),
+    ("//*[contains(@resource-id, 'button')]", 'new UiSelector().resourceIdMatches("(?s).*button.*")'),
+    ('//*[@text="say \\"hi\\""]', None),
+    ("//*[@text='a' and @text='b' or @text='c']", None),
+    ("//*[contains(@text, 'a') or @content-desc='b']", None),
+    ("//*[@index='1']", None),
+    ("//*[@text='a']/..", None),
+    ("//*", None),
+    ("(//android.widget.Button)[2]", None),
+])
+def test_compile_xpath(xpath, selector):
+    assert compile_xpath(xpath) == selector
+
+def test_quotes_and_backslashes_are_escaped():
+    assert compile_xpath("//*[@text='say \"hi\" \\ bye']") == 'new UiSelector().text("say \\"hi\\" \\\\ bye")'
+
+def test_compile_locator_keeps_native_strategies():
+    assert compile_locator(AppiumBy.ACCESSIBILITY_ID, "KOTI", verbose=False) == (AppiumBy.ACCESSIBILITY_ID, "KOTI")
+    assert compile_locator(AppiumBy.XPATH, "//*[@index='1']", verbose=False) == (AppiumBy.XPATH, "//*[@index='1']")
+    assert compile_locator(AppiumBy.XPATH, "//android.widget.ImageView", verbose=False) == (
+        AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().className("android.widget.ImageView")')
@@ -0,0 +1,50 @@
+from render_profiler import parse_gfxinfo, parse_meminfo
+
+GFXINFO = """Applications Graphics Acceleration Info:
+Uptime: 1234567 Realtime: 1234567
+
+** Graphics info for pid 4321 [fi.sbweather.app] **
+
+Stats since: 1234000000ns
+Total frames rendered: 348
+Janky frames: 27 (7.76%)
+Janky frames (legacy): 31 (8.91%)
+50th percentile: 9ms
+90th percentile: 17ms
+95th percentile: 23ms
+99th percentile: 61ms
+Number Missed Vsync: 3
+
+Window: fi.sbweather.app/fi.sbweather.app.MainActivity
+Total frames rendered: 12
+Janky frames: 1 (8.33%)
+50th percentile: 40ms"""
+
+MEMINFO_SUMMARY = """Applications Memory Usage (in Kilobytes):
+Uptime: 1234567 Realtime: 1234567
+
+** MEMINFO in pid 4321 [fi.sbweather.app] **
+                   Pss  Private  Private  SwapPss      Rss     Heap     Heap     Heap
+                 Total    Dirty    Clean    Dirty    Total     Size    Alloc     Free
+                ------   ------   ------   ------   ------   ------   ------   ------
+  Native Heap    21340    21280        0        0    23100    30720    25112     5607
+        TOTAL    96512    62340    18004        0   171240    52312    41200    11112
+
+ App Summary
+           TOTAL PSS:    96512            TOTAL RSS:   171240       TOTAL SWAP PSS:        0"""
+
+MEMINFO_OLD = """** MEMINFO in pid 4321 [fi.sbweather.app] **
+                   Pss  Private  Private  Swapped     Heap     Heap     Heap
+                 Total    Dirty    Clean    Dirty     Size    Alloc     Free
+        TOTAL    88120    60312    17204        0    50100    40012    10088"""
+
+def test_parse_gfxinfo_reads_the_app_wide_section():
+    assert parse_gfxinfo(GFXINFO) == {'frames': 348, 'janky_frames': 27, 'jank_percent': 7.76,
+                                      'p50_ms': 9, 'p90_ms': 17, 'p95_ms': 23, 'p99_ms': 61}
+
+def test_parse_gfxinfo_without_frames():
+    assert parse_gfxinfo("No process found for: fi.sbweather.app") == {}
+
+def test_parse_meminfo():
+    assert parse_meminfo(MEMINFO_SUMMARY) == {'pss_kb': 96512, 'rss_kb': 171240}
+    assert parse_meminfo(MEMINFO_OLD) == {'pss_kb': 88120}
@@ -0,0 +1,116 @@
+import glob
+import json
+import os
+import pytest
+from robot_to_allure import convert, parse_timestamp
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def load_results(results_dir, kind):
+    results = []
+    for path in glob.glob(os.path.join(results_dir, f"*-{kind}.json")):
+        with open(path, 'r', encoding='utf-8') as f:
+            results.append(json.load(f))
+    return results
+
+def all_steps(frame):
+    for step in frame['steps']:
+        yield step
+        yield from all_steps(step)
+
+@pytest.fixture(params=["robot6_output.xml", "robot7_output.xml"])
+def converted(request, tmp_path):
+    results_dir = str(tmp_path / "allure-results")
+    assert convert(os.path.join(FIXTURES, request.param), results_dir, verbose=False) == 2
+    tests = {result['name']: result for result in load_results(results_dir, "result")}
+    return request.param, results_dir, tests
+
+def test_statuses_and_failure_message(converted):
+    _, _, tests = converted
+    assert tests["Loop And Variable"]['status'] == "passed"
+    assert tests["Failing Test"]['status'] == "failed"
+    assert tests["Failing Test"]['statusDetails'] == {'message': "values differ: 1 != 2"}
+
+def test_test_times_come_from_the_test_status(converted):
+    source, _, tests = converted
+    test = tests["Loop And Variable"]
+    steps = test['steps']
+    assert test['start'] <= steps[0]['start']
+    assert test['stop'] >= steps[-1]['stop']
+    if source == "robot6_output.xml":
+        assert test['start'] == parse_timestamp("20240131 12:00:00.015")
+        assert test['stop'] == parse_timestamp("20240131 12:00:00.050")
+
+def test_keyword_steps_have_owner_and_arguments(converted):
+    _, _, tests = converted
+    steps = tests["Failing Test"]['steps']
+    assert [step['name'] for step in steps] == ["TRY", "BuiltIn.Should Be Equal"]
+    assert [p['value'] for p in steps[1]['parameters']] == ["1", "2", "values differ"]
+    branches = steps[0]['steps']
+    assert [(branch['name'], branch['status']) for branch in branches] == [("TRY", "failed"), ("EXCEPT", "passed")]
+
+def test_control_structures_and_assignments(converted):
+    _, _, tests = converted
+    names = [step['name'] for step in tests["Loop And Variable"]['steps']]
+    assert "BuiltIn.Set Variable" in names
+    assert "FOR IN RANGE" in names
+    loop = next(step for step in tests["Loop And Variable"]['steps'] if step['name'] == "FOR IN RANGE")
+    assert [step['name'] for step in loop['steps']] == ["ITER ${i} = 0", "ITER ${i} = 1"]
+    condition = next(step for step in tests["Loop And Variable"]['steps'] if step['name'] == "IF")
+    assert [(branch['name'], branch['status']) for branch in condition['steps']] == [
+        ("IF ${True}", "passed"), ("ELSE", "skipped")]
+
+def test_variable_children_are_not_steps(converted):
+    _, _, tests = converted
+    for test in tests.values():
+        for step in all_steps(test):
+            assert step['status'] != "unknown", step['name']
+            assert not step['name'].startswith("${"), step['name']
+            assert step['name'] != "VAR"
+
+def test_var_statement_is_a_step(converted):
+    source, _, tests = converted
+    steps = tests["Loop And Variable"]['steps']
+    var_steps = [step for step in steps if step['name'].startswith("VAR ")]
+    if source == "robot6_output.xml":
+        assert var_steps == []
+        return
+    assert len(var_steps) == 1
+    assert var_steps[0]['name'] == "VAR ${greeting}"
+    assert var_steps[0]['status'] == "passed"
+    assert var_steps[0]['parameters'] == [{'name': "${greeting}", 'value': "hello"}]
+
+def test_tags_documentation_and_screenshot(converted):
+    _, results_dir, tests = converted
+    test = tests["Loop And Variable"]
+    assert [label['value'] for label in test['labels'] if label['name'] == "tag"] == ["smoke", "views"]
+    assert test['description'].startswith("FOR")
+    attachments = [attachment for step in all_steps(test) for attachment in step['attachments']]
+    assert [attachment['name'] for attachment in attachments] == ["shot.png"]
+    assert os.path.isfile(os.path.join(results_dir, attachments[0]['source']))
+
+def test_suite_setup_and_teardown_container(converted):
+    _, results_dir, tests = converted
+    containers = load_results(results_dir, "container")
+    assert len(containers) == 1
+    container = containers[0]
+    assert sorted(container['children']) == sorted(test['uuid'] for test in tests.values())
+    assert [step['name'] for step in container['befores']] == ["BuiltIn.Log"]
+    assert [step['name'] for step in container['afters']] == ["BuiltIn.Log"]
+    assert container['start'] is not None and container['stop'] > container['start']
+
+def test_xunit(tmp_path):
+    source = tmp_path / "xunit.xml"
+    source.write_text(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<testsuite name="Sample" tests="2" failures="1" timestamp="2024-01-31T12:00:00.000">'
+        '<testcase classname="Sample" name="Passing" time="0.5"/>'
+        '<testcase classname="Sample" name="Failing" time="1.25"><failure message="boom">trace</failure></testcase>'
+        '</testsuite>', encoding='utf-8')
+    results_dir = str(tmp_path / "allure-results")
+    assert convert(str(source), results_dir, verbose=False) == 2
+    tests = {result['name']: result for result in load_results(results_dir, "result")}
+    assert tests["Passing"]['status'] == "passed"
+    assert tests["Failing"]['status'] == "failed"
+    assert tests["Failing"]['statusDetails'] == {'message': "boom"}
+    assert tests["Failing"]['stop'] - tests["Failing"]['start'] == 1250
@@ -0,0 +1,24 @@
+import struct
+import zlib
+from screencap_backend import RawFrame
+
+def decode_png(png):
+    """(color type, unfiltered rows) of a PNG written by RawFrame.to_png"""
+    assert png[:8] == b"\x89PNG\r\n\x1a\n"
+    chunks, offset = {}, 8
+    while offset < len(png):
+        length, = struct.unpack(">I", png[offset:offset + 4])
+        chunks[png[offset + 4:offset + 8]] = png[offset + 8:offset + 8 + length]
+        offset += 12 + length
+    width, height, _, color_type = struct.unpack(">IIBB", chunks[b"IHDR"][:10])
+    data = zlib.decompress(chunks[b"IDAT"])
+    stride = len(data) // height
+    return color_type, [data[y * stride + 1:(y + 1) * stride] for y in range(height)]
+
+def test_rgba_frame_keeps_alpha():
+    frame = RawFrame(2, 1, b"\x10\x20\x30\x80" + b"\x40\x50\x60\xff")
+    assert decode_png(frame.to_png()) == (6, [b"\x10\x20\x30\x80\x40\x50\x60\xff"])
+
+def test_rgbx_frame_is_written_without_the_x_byte():
+    frame = RawFrame(2, 2, b"\x10\x20\x30\x00\x40\x50\x60\x00" + b"\x70\x80\x90\x00\xa0\xb0\xc0\x00", opaque=True)
+    assert decode_png(frame.to_png()) == (2, [b"\x10\x20\x30\x40\x50\x60", b"\x70\x80\x90\xa0\xb0\xc0"])
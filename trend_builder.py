@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Allure Trend Builder - Duration and category trends and per-test latency percentiles
+1. Builds duration-trend.json (suite duration per run) and categories-trend.json from the history store.
+2. Computes p50/p95 of every test's duration over the retained history.
+3. Flags tests whose recent median duration has grown beyond a threshold over their earlier median.
+Tests are streamed from the store one at a time, so thousands of runs never sit in memory together.
+"""
+
+import argparse
+import itertools
+import json
+import sys
+from pathlib import Path
+from history_store import DEFAULT_DB, HistoryStore
+from perf_stats import percentile, summarize
+
+TREND_REPORT = "test-duration-trends.json"
+
+# A test is regressed when the median of its RECENT_RUNS newest durations exceeds the median of
+# its earlier runs by more than REGRESSION_THRESHOLD and MIN_REGRESSION_MS (noise floor)
+RECENT_RUNS = 5
+MIN_BASELINE_RUNS = 5
+REGRESSION_THRESHOLD = 0.25
+MIN_REGRESSION_MS = 200
+
+def log_message(message, verbose=True):
+    """Print message for GitHub Actions UI"""
+    if verbose:
+        print(f"[TREND-BUILDER] {message}")
+        sys.stdout.flush()
+
+def trend_entry(run, data):
+    return {
+        'buildOrder': run['build_order'],
+        'reportName': run['report_name'],
+        'reportUrl': run['report_url'],
+        'data': data
+    }
+
+def duration_trend(store, trend_runs=10, exclude_build=None):
+    """duration-trend.json entries, oldest first; runs without timing (e.g. imported ones) are skipped"""
+    return [trend_entry(run, {'duration': run['stop'] - run['start']})
+            for run in reversed(store.runs(trend_runs))
+            if run['start'] is not None and run['stop'] is not None and run['build_order'] != exclude_build]
+
+def categories_trend(store, trend_runs=10, exclude_build=None):
+    """categories-trend.json entries, oldest first"""
+    return [trend_entry(run, store.run_categories(run['build_order']))
+            for run in reversed(store.runs(trend_runs))
+            if run['build_order'] != exclude_build]
+
+def test_trends(store, recent_runs=RECENT_RUNS, threshold=REGRESSION_THRESHOLD,
+                min_regression_ms=MIN_REGRESSION_MS, min_baseline_runs=MIN_BASELINE_RUNS):
+    """Yield one duration summary per test; only one test's durations are held at a time"""
+    for history_id, rows in itertools.groupby(store.iter_durations(), key=lambda row: row['history_id']):
+        name, last_build, durations = None, None, []
+        for row in rows:
+            name = name or row['name']
+            last_build = last_build or row['build_order']
+            durations.append(row['duration'])
+
+        stats = summarize(durations)
+        recent, baseline = durations[:recent_runs], durations[recent_runs:]
+        recent_p50 = percentile(recent, 50)
+        baseline_p50 = percentile(baseline, 50)
+        regressed = (
+            len(baseline) >= min_baseline_runs
+            and recent_p50 > baseline_p50 * (1 + threshold)
+            and recent_p50 - baseline_p50 > min_regression_ms
+        )
+        yield {
+            'historyId': history_id,
+            'name': name,
+            'runs': stats['count'],
+            'lastBuildOrder': last_build,
+            'last': durations[0],
+            'p50': stats['p50'],
+            'p95': stats['p95'],
+            'recentP50': recent_p50,
+            'baselineP50': baseline_p50,
+            'regressed': regressed
+        }
+
+def build_trends(store, history_dir, trend_runs=10, report_path=TREND_REPORT, exclude_build=None,
+                 threshold=REGRESSION_THRESHOLD, verbose=True):
+    """
+    Write duration-trend.json and categories-trend.json into history_dir and the per-test report.
+    - exclude_build: run left out of the trend files because Allure adds it from allure-results itself.
+    Returns the list of regressed tests.
+    """
+    history_dir = Path(history_dir)
+    history_dir.mkdir(parents=True, exist_ok=True)
+    with open(history_dir / 'duration-trend.json', 'w', encoding='utf-8') as f:
+        json.dump(duration_trend(store, trend_runs, exclude_build), f, indent=2, ensure_ascii=False)
+    with open(history_dir / 'categories-trend.json', 'w', encoding='utf-8') as f:
+        json.dump(categories_trend(store, trend_runs, exclude_build), f, indent=2, ensure_ascii=False)
+
+    regressions, tests = [], 0
+    with open(report_path, 'w', encoding='utf-8') as f:
+        # Written one test at a time to keep memory flat
+        f.write('[\n')
+        for trend in test_trends(store, threshold=threshold):
+            f.write((',\n' if tests else '') + json.dumps(trend, ensure_ascii=False))
+            tests += 1
+            if trend['regressed']:
+                regressions.append(trend)
+        f.write('\n]\n')
+
+    log_message(f"Duration and category trends written to {history_dir}, {tests} tests in {report_path}", verbose)
+    for trend in regressions:
+        log_message(f"REGRESSION {trend['name']}: recent p50 {trend['recentP50'] / 1000:.2f}s vs "
+                    f"{trend['baselineP50'] / 1000:.2f}s before ({trend['runs']} runs, p95 {trend['p95'] / 1000:.2f}s)", True)
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build Allure duration/category trends and per-test duration percentiles')
+    parser.add_argument('--db', default=DEFAULT_DB, help='History database file')
+    parser.add_argument('--history-dir', default='allure-results/history', help='Where to write the trend files')
+    parser.add_argument('--trend-runs', type=int, default=10, help='Runs in the trend files')
+    parser.add_argument('--report', default=TREND_REPORT, help='Per-test duration report (JSON)')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help='Relative growth counted as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit 1 when a test has regressed')
+    parser.add_argument('--verbose', action='store_true', help='Enable verbose output')
+    args = parser.parse_args()
+
+    with HistoryStore(args.db, verbose=args.verbose) as store:
+        regressions = build_trends(store, args.history_dir, args.trend_runs, args.report,
+                                   threshold=args.threshold, verbose=args.verbose)
+    sys.exit(1 if regressions and args.fail_on_regression else 0)
@@ -5,6 +5,7 @@ Allure History Manager - Complete with Post-Generation Cleanup
 2. Checks if previous history was downloaded successfully from the artifact.
 3. Manages history-trend.json buildOrder incrementation.
 4. Cleans up malformed data that Allure adds during report generation.
+5. With --history-db, keeps the full run history in a SQLite store and generates the history files from it.
 """
 
 import json
@@ -12,6 +13,8 @@ import os
 import sys
 import argparse
 from pathlib import Path
+from history_store import DEFAULT_RETENTION, HistoryStore
+from trend_builder import build_trends
 
 def log_message(message, verbose=True):
     """Print message for GitHub Actions UI"""
@@ -100,7 +103,22 @@ def clean_post_allure_generation(verbose=True):
         traceback.print_exc()
         return 0
 
-def manage_allure_history(verbose=True):
+def record_run_in_store(history_db, history_dir, report_url, retention=DEFAULT_RETENTION, trend_runs=10, verbose=True):
+    """
+    Record this run from allure-results in the history store and write the Allure history and trend files from it.
+    Returns (buildOrder, trend entries written).
+    """
+    with HistoryStore(history_db, verbose) as store:
+        # First run with a store: keep the trend that was downloaded so far
+        store.import_trend(history_dir / 'history-trend.json')
+        new_order = store.record_run(history_dir.parent, report_url=report_url)
+        store.prune(retention)
+        trend_count = store.write_allure_history(history_dir, trend_runs, current_build=new_order)
+        build_trends(store, history_dir, trend_runs, exclude_build=new_order, verbose=verbose)
+        log_message(f"History store {history_db}: {store.run_count()} runs retained (retention {retention or 'unlimited'})", verbose)
+    return new_order, trend_count
+
+def manage_allure_history(verbose=True, history_db=None, retention=DEFAULT_RETENTION, trend_runs=10):
     log_message("Starting complete Allure history management...", verbose)
     
     # Path to history files
@@ -123,61 +141,68 @@ def manage_allure_history(verbose=True):
     else:
         log_message("INFO: No history files found. This is expected on the first run.", verbose)
     
-    # 3. Initialize or load history-trend.json
-    if trend_file.exists():
-        try:
-            with open(trend_file, 'r', encoding='utf-8') as f:
-                raw_history = json.load(f)
-            
-            # Clean the history data
-            history_trend = clean_history_trend(raw_history)
-            
-            if history_trend:
-                # Find max buildOrder from valid entries
-                max_order = max(item.get('buildOrder', 0) for item in history_trend)
-                log_message(f"Loaded and cleaned history trend with {len(history_trend)} valid entries. Max buildOrder: {max_order}", verbose)
-                if len(raw_history) != len(history_trend):
-                    log_message(f"Removed {len(raw_history) - len(history_trend)} invalid entries.", verbose)
-            else:
-                # No valid entries found
+    report_url = f'https://github.com/{os.environ.get("GITHUB_REPOSITORY", "user/repo")}/actions/runs/{os.environ.get("GITHUB_RUN_ID", "1")}'
+
+    if history_db:
+        # 3-5. Record this run in the store and generate the trend from it
+        new_order, history_length = record_run_in_store(history_db, history_dir, report_url, retention, trend_runs, verbose)
+    else:
+        # 3. Initialize or load history-trend.json
+        if trend_file.exists():
+            try:
+                with open(trend_file, 'r', encoding='utf-8') as f:
+                    raw_history = json.load(f)
+                
+                # Clean the history data
+                history_trend = clean_history_trend(raw_history)
+                
+                if history_trend:
+                    # Find max buildOrder from valid entries
+                    max_order = max(item.get('buildOrder', 0) for item in history_trend)
+                    log_message(f"Loaded and cleaned history trend with {len(history_trend)} valid entries. Max buildOrder: {max_order}", verbose)
+                    if len(raw_history) != len(history_trend):
+                        log_message(f"Removed {len(raw_history) - len(history_trend)} invalid entries.", verbose)
+                else:
+                    # No valid entries found
+                    history_trend = []
+                    max_order = 0
+                    log_message("No valid entries found in existing history. Starting fresh.", verbose)
+                    
+            except (json.JSONDecodeError, Exception) as e:
+                log_message(f"Error loading {trend_file}: {e}. Creating new history.", verbose)
                 history_trend = []
                 max_order = 0
-                log_message("No valid entries found in existing history. Starting fresh.", verbose)
-                
-        except (json.JSONDecodeError, Exception) as e:
-            log_message(f"Error loading {trend_file}: {e}. Creating new history.", verbose)
+        else:
+            # No trend file exists (first run or download failed)
+            log_message("No history-trend.json file found. Creating new history.", verbose)
             history_trend = []
             max_order = 0
-    else:
-        # No trend file exists (first run or download failed)
-        log_message("No history-trend.json file found. Creating new history.", verbose)
-        history_trend = []
-        max_order = 0
-    
-    # 4. Create new entry for THIS run
-    new_order = max_order + 1
-    new_entry = {
-        'buildOrder': new_order,
-        'reportName': f'Run #{new_order}',
-        'reportUrl': f'https://github.com/{os.environ.get("GITHUB_REPOSITORY", "user/repo")}/actions/runs/{os.environ.get("GITHUB_RUN_ID", "1")}',
-        'data': { 
-            # Placeholder data - Allure will fill this with real data during report generation
-            'failed': 0, 'broken': 0, 'skipped': 0, 
-            'passed': 0, 'unknown': 0, 'total': 0
+        
+        # 4. Create new entry for THIS run
+        new_order = max_order + 1
+        new_entry = {
+            'buildOrder': new_order,
+            'reportName': f'Run #{new_order}',
+            'reportUrl': report_url,
+            'data': { 
+                # Placeholder data - Allure will fill this with real data during report generation
+                'failed': 0, 'broken': 0, 'skipped': 0, 
+                'passed': 0, 'unknown': 0, 'total': 0
+            }
         }
-    }
-    
-    log_message(f"Creating new trend entry with buildOrder: {new_order}", verbose)
-    
-    # Add new entry and keep only recent history (last 10 runs)
-    history_trend.append(new_entry)
-    history_trend = history_trend[-10:]  # Keep only last 10 runs
-    log_message(f"History trend now contains {len(history_trend)} entries.", verbose)
-    
-    # 5. Save the updated and cleaned trend file
-    with open(trend_file, 'w', encoding='utf-8') as f:
-        json.dump(history_trend, f, indent=2, ensure_ascii=False)
-    log_message(f"Saved cleaned and updated history trend to: {trend_file}", verbose)
+        
+        log_message(f"Creating new trend entry with buildOrder: {new_order}", verbose)
+        
+        # Add new entry and keep only recent history (last 10 runs)
+        history_trend.append(new_entry)
+        history_trend = history_trend[-10:]  # Keep only last 10 runs
+        log_message(f"History trend now contains {len(history_trend)} entries.", verbose)
+        
+        # 5. Save the updated and cleaned trend file
+        with open(trend_file, 'w', encoding='utf-8') as f:
+            json.dump(history_trend, f, indent=2, ensure_ascii=False)
+        log_message(f"Saved cleaned and updated history trend to: {trend_file}", verbose)
+        history_length = len(history_trend)
     
     # 6. Create other required Allure history files
     duration_trend_file = history_dir / 'duration-trend.json'
@@ -209,7 +234,7 @@ def manage_allure_history(verbose=True):
     print("="*70)
     print(f"Status: {'HISTORY DOWNLOADED & CLEANED' if history_downloaded else 'FRESH START (No previous history)'}")
     print(f"New Build Order: {new_order}")
-    print(f"Total Valid History Entries: {len(history_trend)}")
+    print(f"Total Valid History Entries: {history_length}")
     print(f"Files in ./allure-results/history/:")
     for file in history_dir.iterdir():
         if file.is_file():
@@ -224,6 +249,9 @@ if __name__ == '__main__':
     parser.add_argument('-s', '--silent', action='store_true', help='Enable silent mode (overrides verbose)')
     parser.add_argument('--clean', action='store_true', help='Clean invalid entries from existing history')
     parser.add_argument('--post-cleanup', action='store_true', help='Run post-Allure generation cleanup')
+    parser.add_argument('--history-db', type=str, help='SQLite run history store; history files are generated from it')
+    parser.add_argument('--retention', type=int, default=DEFAULT_RETENTION, help='Runs kept in the history store (0 keeps all)')
+    parser.add_argument('--trend-runs', type=int, default=10, help='Runs shown in the generated history trend')
     
     args = parser.parse_args()
     verbose = args.verbose and not args.silent
@@ -235,7 +263,8 @@ if __name__ == '__main__':
             log_message(f"Post-generation cleanup completed. {entries_count} entries processed.", verbose)
         else:
             # Run normal history management
-            manage_allure_history(verbose=verbose)
+            manage_allure_history(verbose=verbose, history_db=args.history_db,
+                                  retention=args.retention, trend_runs=args.trend_runs)
             log_message("Allure history management completed successfully.", verbose)
         
         sys.exit(0)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Wait Utilities - Condition-driven waits to replace fixed time.sleep calls
+1. Polls a condition with a tunable interval and exponential backoff.
+2. Returns as soon as the screen is ready instead of paying a fixed delay.
+3. Records how long every wait actually took so screen transition latency is visible.
+"""
+
+import time
+from selenium.common.exceptions import WebDriverException
+
+# Default polling settings - tune with configure()
+POLL_INTERVAL = 0.2
+BACKOFF = 1.5
+MAX_INTERVAL = 1.0
+VERBOSE = True
+
+# App state returned by query_app_state (Appium ApplicationState)
+APP_NOT_RUNNING = 1
+APP_RUNNING_IN_FOREGROUND = 4
+
+# Every finished wait is recorded here: dicts with description, seconds, success, polls
+WAIT_LOG = []
+
+def configure(poll_interval=None, backoff=None, max_interval=None, verbose=None):
+    """Change the default polling settings for all following waits"""
+    global POLL_INTERVAL, BACKOFF, MAX_INTERVAL, VERBOSE
+    if poll_interval is not None:
+        POLL_INTERVAL = poll_interval
+    if backoff is not None:
+        BACKOFF = backoff
+    if max_interval is not None:
+        MAX_INTERVAL = max_interval
+    if verbose is not None:
+        VERBOSE = verbose
+
+def record_wait(description, seconds, success, polls):
+    """Store the measured duration of a finished wait"""
+    entry = {
+        'description': description,
+        'seconds': round(seconds, 3),
+        'success': success,
+        'polls': polls
+    }
+    WAIT_LOG.append(entry)
+    if VERBOSE:
+        status = "ready" if success else "TIMEOUT"
+        print(f"[WAIT] {description}: {status} after {seconds:.2f}s ({polls} polls)")
+    return entry
+
+def wait_until(condition, timeout=10, description="condition", poll_interval=None,
+               backoff=None, max_interval=None, ignored_exceptions=(WebDriverException,)):
+    """
+    Poll condition() until it returns a truthy value or the timeout expires.
+    - The delay between polls starts at poll_interval and grows by backoff up to max_interval.
+    - Returns the truthy value, or None on timeout.
+    """
+    delay = POLL_INTERVAL if poll_interval is None else poll_interval
+    backoff = BACKOFF if backoff is None else backoff
+    max_interval = MAX_INTERVAL if max_interval is None else max_interval
+
+    start = time.monotonic()
+    deadline = start + timeout
+    polls = 0
+    result = None
+
+    while True:
+        polls += 1
+        try:
+            result = condition()
+        except ignored_exceptions:
+            result = None
+        if result:
+            break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(delay, remaining))
+        delay = min(delay * backoff, max_interval)
+
+    record_wait(description, time.monotonic() - start, bool(result), polls)
+    return result if result else None
+
+def wait_for_element(driver, by, value, timeout=10, description=None):
+    """Wait until element is present and return it (None on timeout)"""
+    def _find():
+        elements = driver.find_elements(by, value)
+        return elements[0] if elements else None
+    return wait_until(_find, timeout, description or f"element '{value}'")
+
+def wait_for_clickable(driver, by, value, timeout=10, description=None):
+    """Wait until element is displayed and enabled and return it (None on timeout)"""
+    def _find_clickable():
+        for element in driver.find_elements(by, value):
+            if element.is_displayed() and element.is_enabled():
+                return element
+        return None
+    return wait_until(_find_clickable, timeout, description or f"clickable '{value}'")
+
+def wait_for_app_state(driver, package_name, state, timeout=10, description=None):
+    """Wait until query_app_state reports the wanted application state"""
+    return wait_until(
+        lambda: driver.query_app_state(package_name) == state,
+        timeout,
+        description or f"{package_name} state {state}"
+    )
+
+def wait_for_stable_screen(driver, timeout=5, description="screen settled"):
+    """
+    Wait until two consecutive page sources are identical.
+    Used where there is no single element that tells the screen is ready.
+    """
+    previous = {'source': None}
+
+    def _is_stable():
+        source = driver.page_source
+        stable = source == previous['source']
+        previous['source'] = source
+        return stable
+
+    return wait_until(_is_stable, timeout, description)
+
+def wait_timings(since=0):
+    """Return recorded waits, optionally only those after the given WAIT_LOG index"""
+    return WAIT_LOG[since:]
+
+def format_wait_summary(entries=None):
+    """Format recorded waits as a readable text table"""
+    entries = WAIT_LOG if entries is None else entries
+    lines = [f"{'Wait':<50} {'Seconds':>8} {'Polls':>6}  Status"]
+    for entry in entries:
+        status = "ok" if entry['success'] else "timeout"
+        lines.append(f"{entry['description'][:50]:<50} {entry['seconds']:>8.2f} {entry['polls']:>6}  {status}")
+    total = sum(entry['seconds'] for entry in entries)
+    lines.append(f"Total wait time: {total:.2f}s in {len(entries)} waits")
+    return "\n".join(lines)
+
+def print_wait_summary(entries=None):
+    """Print recorded waits for the CI log"""
+    print("\n" + "="*70)
+    print("WAIT TIMINGS")
+    print("="*70)
+    print(format_wait_summary(entries))
+    print("="*70)
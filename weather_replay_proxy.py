@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Weather Replay Proxy - Record the app's weather API responses once and replay them from disk
+1. Runs a local HTTP proxy on 127.0.0.1 (--bind to change); the device reaches it through adb reverse
+   and the global http_proxy setting, so emulators and devices on a private network need no outside services.
+2. record: forwards requests upstream and stores every response in a cassette directory.
+   replay: serves the stored responses with a configurable latency and never touches the network.
+   A request without an exact match gets the latest response of the same path, logged and counted
+   as a fuzzy hit; --no-fuzzy turns that off so such requests are misses.
+3. HTTPS is recorded and replayed when --tls-cert/--tls-key hold a certificate the app trusts
+   (debug builds with a network security config allowing user CAs); otherwise it is only tunnelled.
+4. Runs an optional command while the proxy is up, with WEATHER_DATA_TIMEOUT set for the tests.
+Example: python weather_replay_proxy.py --mode replay --configure-device --data-timeout 5 -- python -m pytest
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import select
+import socket
+import ssl
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from package_inventory import adb_command
+from process_runner import run_process
+
+CASSETTE_DIR = "weather-cassette"
+DEFAULT_PORT = 8899
+# adb reverse connects to the host loopback; other interfaces would expose an open proxy to the network
+DEFAULT_BIND = "127.0.0.1"
+UPSTREAM_TIMEOUT = 30
+
+# Query parameters that change on every request (time windows, cache busters) and are left out of the match
+IGNORED_PARAMS = ("starttime", "endtime", "_", "timestamp")
+
+HOP_BY_HOP = {'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'proxy-connection',
+              'te', 'trailers', 'transfer-encoding', 'upgrade', 'content-length'}
+
+def log_message(message, verbose=True):
+    """Print message for GitHub Actions UI"""
+    if verbose:
+        print(f"[REPLAY-PROXY] {message}")
+        sys.stdout.flush()
+
+class Cassette:
+    """Recorded responses on disk: index.json plus one body file per response"""
+
+    def __init__(self, directory=CASSETTE_DIR, ignored_params=IGNORED_PARAMS, fuzzy=True):
+        self.directory = directory
+        self.ignored_params = set(ignored_params)
+        self.fuzzy = fuzzy
+        self.index_path = os.path.join(directory, "index.json")
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def keys(self, method, url, body=b""):
+        """(exact key, path key) of a request; the path key ignores the query"""
+        parts = urlsplit(url)
+        query = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                       if name.lower() not in self.ignored_params)
+        path_key = f"{method} {parts.scheme}://{parts.netloc}{parts.path}"
+        exact = f"{path_key}?{urlencode(query)}"
+        if body:
+            exact += f" body:{hashlib.sha1(body).hexdigest()}"
+        return exact, path_key
+
+    def lookup(self, method, url, body=b""):
+        """
+        (entry, fuzzy) of the request: exact match first, then (if enabled) the latest one of the same path.
+        entry is None when nothing matches; fuzzy is True when only the path matched.
+        """
+        exact, path_key = self.keys(method, url, body)
+        entry = self.entries.get(exact)
+        if entry is not None or not self.fuzzy:
+            return entry, False
+        candidates = [entry for entry in self.entries.values() if entry['path_key'] == path_key]
+        if not candidates:
+            return None, False
+        return max(candidates, key=lambda e: e['recorded_at']), True
+
+    def body(self, entry):
+        with open(os.path.join(self.directory, entry['body']), 'rb') as f:
+            return f.read()
+
+    def save(self, method, url, request_body, status, headers, body, upstream_ms):
+        exact, path_key = self.keys(method, url, request_body)
+        body_file = hashlib.sha1(exact.encode('utf-8')).hexdigest() + ".body"
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, body_file), 'wb') as f:
+                f.write(body)
+            self.entries[exact] = {
+                'method': method,
+                'url': url,
+                'path_key': path_key,
+                'status': status,
+                'headers': headers,
+                'body': body_file,
+                'upstream_ms': round(upstream_ms, 1),
+                'recorded_at': time.strftime("%Y-%m-%dT%H:%M:%S")
+            }
+            temp_path = f"{self.index_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, self.index_path)
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    tls_host = None
+
+    def log_message(self, format, *args):
+        pass
+
+    # --- HTTPS ------------------------------------------------------------
+    def do_CONNECT(self):
+        host, _, port = self.path.partition(":")
+        port = int(port or 443)
+        if self.server.tls_context is None:
+            if self.server.mode == "replay":
+                self.server.count('misses')
+                log_message(f"HTTPS to {host} cannot be replayed without --tls-cert, refused", self.server.verbose)
+                self.send_error(502, "HTTPS replay needs --tls-cert")
+                return
+            log_message(f"HTTPS to {host} tunnelled, not recorded (no --tls-cert)", self.server.verbose)
+            self._tunnel(host, port)
+            return
+
+        # Terminate TLS here so the requests inside can be recorded and replayed
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        self.wfile.flush()
+        try:
+            self.connection = self.server.tls_context.wrap_socket(self.connection, server_side=True)
+        except (ssl.SSLError, OSError) as e:
+            log_message(f"TLS handshake for {host} failed (is the certificate trusted by the app?): {e}", self.server.verbose)
+            self.close_connection = True
+            return
+        self.rfile = self.connection.makefile('rb')
+        self.wfile = self.connection.makefile('wb')
+        self.tls_host = host if port == 443 else f"{host}:{port}"
+        self.close_connection = False
+        while not self.close_connection:
+            self.handle_one_request()
+            self.wfile.flush()
+
+    def _tunnel(self, host, port):
+        try:
+            upstream = socket.create_connection((host, port), timeout=UPSTREAM_TIMEOUT)
+        except OSError as e:
+            self.send_error(502, f"Cannot reach {host}:{port}: {e}")
+            return
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        self.wfile.flush()
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, failed = select.select(sockets, [], sockets, UPSTREAM_TIMEOUT)
+                if failed or not readable:
+                    break
+                for sock in readable:
+                    data = sock.recv(65536)
+                    if not data:
+                        return
+                    (upstream if sock is self.connection else self.connection).sendall(data)
+        finally:
+            upstream.close()
+            self.close_connection = True
+
+    # --- HTTP -------------------------------------------------------------
+    def _url(self):
+        if self.tls_host:
+            return f"https://{self.tls_host}{self.path}"
+        return self.path
+
+    def _proxy(self):
+        url = self._url()
+        length = int(self.headers.get('Content-Length') or 0)
+        request_body = self.rfile.read(length) if length else b""
+        server = self.server
+
+        if server.mode == "replay":
+            entry, fuzzy = server.cassette.lookup(self.command, url, request_body)
+            if entry is None:
+                server.count('misses')
+                log_message(f"MISS {self.command} {url}", server.verbose)
+                self._respond(504, [('Content-Type', 'text/plain')], b"Not in cassette\n")
+                return
+            if fuzzy:
+                # Not recorded with this query (e.g. another station); answered with the same path's response
+                server.count('fuzzy')
+                log_message(f"FUZZY {self.command} {url} answered with {entry['url']}", server.verbose)
+            else:
+                server.count('hits')
+            delay_ms = entry['upstream_ms'] if server.recorded_latency else server.latency_ms
+            if delay_ms:
+                time.sleep(delay_ms / 1000)
+            self._respond(entry['status'], entry['headers'], server.cassette.body(entry))
+            return
+
+        parts = urlsplit(url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        headers = {name: value for name, value in self.headers.items() if name.lower() not in HOP_BY_HOP}
+        start = time.perf_counter()
+        try:
+            connection = connection_class(parts.netloc, timeout=UPSTREAM_TIMEOUT)
+            connection.request(self.command, parts.path + (f"?{parts.query}" if parts.query else ""),
+                               request_body or None, headers)
+            response = connection.getresponse()
+            body = response.read()
+            response_headers = [[name, value] for name, value in response.getheaders()
+                                if name.lower() not in HOP_BY_HOP]
+            connection.close()
+        except (OSError, http.client.HTTPException) as e:
+            log_message(f"Upstream error {self.command} {url}: {e}", server.verbose)
+            self._respond(502, [('Content-Type', 'text/plain')], f"Upstream error: {e}\n".encode())
+            return
+        upstream_ms = (time.perf_counter() - start) * 1000
+        server.cassette.save(self.command, url, request_body, response.status, response_headers, body, upstream_ms)
+        server.count('recorded')
+        log_message(f"RECORDED {self.command} {url} -> {response.status}, {len(body)} bytes in {upstream_ms:.0f} ms",
+                    server.verbose)
+        self._respond(response.status, response_headers, body)
+
+    def _respond(self, status, headers, body):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = do_PATCH = _proxy
+
+class ReplayProxy(ThreadingHTTPServer):
+    """Recording/replaying proxy server; serve_forever runs in a background thread after start()"""
+
+    daemon_threads = True
+
+    def __init__(self, port=DEFAULT_PORT, mode="replay", cassette=None, latency_ms=0.0, recorded_latency=False,
+                 tls_cert=None, tls_key=None, verbose=True, bind=DEFAULT_BIND):
+        super().__init__((bind, port), ProxyHandler)
+        self.mode = mode
+        self.cassette = cassette or Cassette()
+        self.latency_ms = latency_ms
+        self.recorded_latency = recorded_latency
+        self.verbose = verbose
+        self.stats = {'hits': 0, 'fuzzy': 0, 'misses': 0, 'recorded': 0}
+        self._stats_lock = threading.Lock()
+        self.tls_context = None
+        if tls_cert:
+            self.tls_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            self.tls_context.load_cert_chain(tls_cert, tls_key)
+
+    def count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        log_message(f"{self.mode} proxy on {self.server_address[0]}:{self.server_address[1]}, cassette {self.cassette.directory} "
+                    f"({len(self.cassette.entries)} responses)", self.verbose)
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        log_message(f"Stopped: {self.stats['hits']} replayed, {self.stats['fuzzy']} fuzzy, "
+                    f"{self.stats['misses']} missed, {self.stats['recorded']} recorded", self.verbose)
+
+def configure_device(port, serial=None, verbose=True):
+    """Route the device's HTTP traffic to the proxy on this host"""
+    subprocess.run(adb_command(serial) + ["reverse", f"tcp:{port}", f"tcp:{port}"], check=True, capture_output=True)
+    subprocess.run(adb_command(serial) + ["shell", "settings", "put", "global", "http_proxy", f"127.0.0.1:{port}"],
+                   check=True, capture_output=True)
+    log_message(f"Device proxy set to 127.0.0.1:{port} (adb reverse)", verbose)
+
+def restore_device(port, serial=None, verbose=True):
+    """Remove the proxy setting and the reverse port"""
+    subprocess.run(adb_command(serial) + ["shell", "settings", "put", "global", "http_proxy", ":0"], capture_output=True)
+    subprocess.run(adb_command(serial) + ["reverse", "--remove", f"tcp:{port}"], capture_output=True)
+    log_message("Device proxy removed", verbose)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Record and replay the weather app backend through a local proxy')
+    parser.add_argument('--mode', choices=['record', 'replay'], default='replay', help='Record from upstream or replay from disk')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Proxy port (also used on the device)')
+    parser.add_argument('--bind', default=DEFAULT_BIND, help='Listen address; 0.0.0.0 exposes the proxy to the whole network')
+    parser.add_argument('--cassette', default=CASSETTE_DIR, help='Directory of recorded responses')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Added delay for every replayed response')
+    parser.add_argument('--recorded-latency', action='store_true', help='Replay with the recorded upstream delay')
+    parser.add_argument('--ignore-param', action='append', help=f'Query parameter left out of matching (default: {", ".join(IGNORED_PARAMS)})')
+    parser.add_argument('--no-fuzzy', action='store_true', help='Only replay exact matches; other queries of a recorded path are misses')
+    parser.add_argument('--tls-cert', help='Certificate (PEM) for recording/replaying HTTPS')
+    parser.add_argument('--tls-key', help='Private key (PEM) of --tls-cert')
+    parser.add_argument('--configure-device', action='store_true', help='Set adb reverse and the device http_proxy')
+    parser.add_argument('--device', help='Device serial (default: ANDROID_SERIAL / the only device)')
+    parser.add_argument('--data-timeout', type=float, help='WEATHER_DATA_TIMEOUT given to the command')
+    parser.add_argument('command', nargs=argparse.REMAINDER, help='Command to run while the proxy is up (after --)')
+    args = parser.parse_args()
+
+    command = args.command[1:] if args.command[:1] == ['--'] else args.command
+    cassette = Cassette(args.cassette, args.ignore_param or IGNORED_PARAMS, fuzzy=not args.no_fuzzy)
+    if args.mode == 'replay' and not cassette.entries:
+        print(f"No recorded responses in {args.cassette}, run with --mode record first")
+        sys.exit(1)
+
+    proxy = ReplayProxy(args.port, args.mode, cassette, args.latency_ms, args.recorded_latency,
+                        args.tls_cert, args.tls_key, bind=args.bind).start()
+    exit_code = 0
+    try:
+        if args.configure_device:
+            configure_device(args.port, args.device)
+        if command:
+            env = dict(os.environ)
+            if args.data_timeout is not None:
+                env["WEATHER_DATA_TIMEOUT"] = str(args.data_timeout)
+            exit_code = run_process(command, name=os.path.basename(command[0]), env=env)['return_code']
+        else:
+            log_message("Press Ctrl+C to stop")
+            while True:
+                time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.configure_device:
+            restore_device(args.port, args.device)
+        proxy.stop()
+    sys.exit(exit_code)